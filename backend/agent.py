@@ -1,14 +1,17 @@
 # backend/agent.py - Updated for frontend-driven analysis
 
 import asyncio
+import threading
 import time
-from typing import Optional
+from typing import Dict, List, Optional
 
 # Fixed imports for backend/ directory
 from backend.feed.fake_feed import generate_fake_post
-from backend.detection.pipeline import analyze_post
+from backend.detection.pipeline import analyze_post, analyze_posts, analyze_post_with_cross_modal
 from backend.logs.logger import log_detection, log_system_event
 from backend.config import DEBUG
+from backend.id_allocator import next_post_id, next_post_ids
+from backend.metrics import timed
 
 class AutonomousAgent:
     """
@@ -19,8 +22,15 @@ class AutonomousAgent:
     def __init__(self):
         """Initialize the agent with required components."""
         self.posts_processed = 0
-        self._post_id_counter = 1
+        # Analyses run concurrently on the inference executor's threads
+        self._stats_lock = threading.Lock()
     
+    def _count_processed(self, count: int = 1) -> None:
+        """Add to the processed-post counter."""
+        with self._stats_lock:
+            self.posts_processed += count
+    
+    @timed("agent.analyze_content")
     def analyze_content(self, content: str, content_type: str = "text") -> dict:
         """
         Analyze content sent from frontend and return detection results.
@@ -34,7 +44,7 @@ class AutonomousAgent:
         """
         # Create a post object for the detection pipeline
         post = {
-            "id": self._post_id_counter,
+            "id": next_post_id(),
             "author": "frontend_user",
             "content_type": content_type,
             "language": "en",  # Default to English
@@ -42,22 +52,91 @@ class AutonomousAgent:
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
         }
         
-        # Increment counter for next post
-        self._post_id_counter += 1
-        
         # Process through detection pipeline
         detection_result = analyze_post(post)
         
         # Log the detection result
         log_detection(detection_result)
         
-        self.posts_processed += 1
+        self._count_processed()
         
         if DEBUG:
             content_preview = content[:50] + "..." if len(content) > 50 else content
             log_system_event("ANALYSIS", f"📝 Analyzed content: {content_preview}")
         
         return detection_result
+    
+    @timed("agent.analyze_batch")
+    def analyze_batch(self, items: List[Dict]) -> List[dict]:
+        """
+        Analyze a batch of content items in one pass through the detection pipeline.
+        
+        Args:
+            items (List[Dict]): Items with 'content' and 'content_type'
+            
+        Returns:
+            List[dict]: Analysis results, in input order
+        """
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+        posts = []
+        for post_id, item in zip(next_post_ids(len(items)), items):
+            posts.append({
+                "id": post_id,
+                "author": "bulk_ingest",
+                "content_type": item.get("content_type", "text"),
+                "language": "en",
+                "content": item["content"],
+                "timestamp": timestamp
+            })
+        
+        # Process the whole batch through the detection pipeline
+        results = analyze_posts(posts)
+        
+        # Log every detection result
+        for result in results:
+            log_detection(result)
+        
+        self._count_processed(len(results))
+        
+        if DEBUG:
+            log_system_event("BATCH_ANALYSIS", f"📦 Analyzed batch of {len(results)} items")
+        
+        return results
+    
+    @timed("agent.analyze_cross_modal")
+    def analyze_cross_modal(self, text: str, image=None, audio=None) -> dict:
+        """
+        Analyze text together with an optional image and audio file.
+        
+        Args:
+            text (str): The text content to analyze
+            image (str, bytes or MediaInput, optional): Image file path or contents
+            audio (str, bytes or MediaInput, optional): Audio file path or contents
+            
+        Returns:
+            dict: Analysis result including cross-modal consistency scores
+        """
+        post = {
+            "id": next_post_id(),
+            "author": "frontend_user",
+            "content_type": "multimodal",
+            "language": "en",
+            "content": text,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+        }
+        
+        # Analyze with cross-modal detection
+        result = analyze_post_with_cross_modal(post, image, audio)
+        
+        # Log the detection result
+        log_detection(result)
+        
+        self._count_processed()
+        
+        if DEBUG:
+            log_system_event("CROSS_MODAL_ANALYSIS", f"📊 Cross-modal analysis completed for text: {text[:50]}...")
+        
+        return result
 
 if __name__ == "__main__":
     # Test the agent
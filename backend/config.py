@@ -14,13 +14,103 @@ class Settings(BaseSettings):
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
 
+    # Production Serving
+    SERVER_MODE: str = "development"   # development (single reloading process) or production (preforked)
+    SERVER_WORKERS: int = 2            # worker processes forked in production mode
+    PRELOAD_MODELS: str = "bart,clip,whisper"  # loaded once in the parent before forking
+    TORCH_NUM_THREADS: int = 0         # intra-op threads per worker (0 = CPU cores / workers)
+    TORCH_INTEROP_THREADS: int = 1     # inter-op threads per worker
+    METRICS_PORT_BASE: int = 0         # production: worker N also serves /metrics on this port + N (0 = off)
+
+    # Startup Warm-up
+    WARMUP_ENABLED: bool = True        # load models in the background once the app has started
+    WARMUP_MODELS: str = "bart"        # comma-separated; other models load on first use
+    WARMUP_POLICY: str = "fallback"    # requests during warm-up: queue, fallback (pre-screen verdicts) or reject
+    WARMUP_QUEUE_TIMEOUT_SECONDS: float = 30.0  # longest a queued request waits before a 503
+
+    # Request Tracing
+    TRACE_HEADER: str = "X-Profile"    # request header that turns on profiling (as does ?profile=1)
+    TRACE_HISTORY_SIZE: int = 100      # recent profiled requests kept for Chrome trace export
+
     # Detection Pipeline Settings
     MIN_TRUST_SCORE: float = 0.5
     MAX_TRUST_SCORE: float = 1.0
 
+    # Model Registry
+    TEXT_MODEL_NAME: str = "facebook/bart-large-mnli"
+    TEXT_CLASSIFIER_BACKEND: str = "torch"    # torch, torch-int8 or onnx
+    TEXT_ONNX_MODEL_DIR: str = "models/onnx"  # where ONNX exports are cached
+    CLIP_MODEL_NAME: str = "openai/clip-vit-base-patch32"
+    WHISPER_MODEL_SIZE: str = "base"
+    MODEL_REGISTRY_MAX_LOADED: int = 0        # max models kept in memory (0 = unlimited)
+    MODEL_IDLE_TIMEOUT_SECONDS: float = 0     # unload models idle this long (0 = never)
+
+    # CLIP Embeddings
+    EMBEDDING_CACHE_SIZE: int = 4096          # cached embeddings per modality
+    CLIP_SIMILARITY_FLOOR: float = 0.15       # raw cosine mapped to similarity 0
+    CLIP_SIMILARITY_CEILING: float = 0.35     # raw cosine mapped to similarity 1
+    CLIP_BATCH_MAX_SIZE: int = 8              # max (text, image) pairs scored per CLIP batch
+    CLIP_BATCH_MAX_WAIT_MS: float = 5.0       # max time to wait for a pair batch to fill
+
+    # Audio Transcription
+    TRANSCRIPT_CACHE_PATH: str = "data/transcripts.db"  # persistent transcript cache
+    TRANSCRIPTION_WORKERS: int = -1           # Whisper worker processes (0 = in-process; -1 = in-process
+                                              # in production, sharing the preloaded Whisper, else 1)
+    TRANSCRIPTION_TIMEOUT_SECONDS: float = 300
+
+    # Text Classifier Batching
+    TEXT_BATCH_MAX_SIZE: int = 8        # max texts per zero-shot forward pass
+    TEXT_BATCH_MAX_WAIT_MS: float = 10.0  # max time to wait for a batch to fill
+    TEXT_WINDOW_TOKENS: int = 0           # tokens per window for long texts (0 = model limit)
+    TEXT_WINDOW_OVERLAP: int = 128        # tokens shared by consecutive windows
+
+    # Bulk Analysis
+    BULK_BATCH_SIZE: int = 16                 # posts per pipeline batch in /analyze/batch
+    BULK_MAX_ITEM_BYTES: int = 1_000_000      # largest single item accepted in a bulk upload
+
+    # Media Uploads
+    MEDIA_SPOOL_THRESHOLD_BYTES: int = 16_000_000  # larger uploads are spooled to a temp file
+    MEDIA_IMAGE_MAX_BYTES: int = 10_000_000   # largest accepted image upload
+    MEDIA_AUDIO_MAX_BYTES: int = 25_000_000   # largest accepted audio upload
+    MEDIA_AUDIO_MAX_SECONDS: float = 600.0    # longest accepted (or decoded) audio clip
+    MEDIA_TEXT_MAX_BYTES: int = 100_000       # largest accepted text form field
+
+    # Verdict Cache
+    VERDICT_CACHE_SIZE: int = 10000           # cached verdicts for repeated posts (0 = disabled)
+    VERDICT_CACHE_TTL_SECONDS: float = 3600   # how long a cached verdict stays valid
+
+    # Detection Cascade
+    CASCADE_ENABLED: bool = False             # pre-screen posts before running bart-large-mnli
+    CASCADE_UNCERTAIN_LOW: float = 0.15       # pre-screen misinformation probabilities inside
+    CASCADE_UNCERTAIN_HIGH: float = 0.85      # [LOW, HIGH] are escalated to the zero-shot model
+
+    # Inference Executor
+    INFERENCE_WORKERS: int = 16         # threads for blocking calls, incl. texts waiting on the batcher
+    INFERENCE_MAX_CONCURRENCY: int = 4  # model calls allowed to run at once
+    INFERENCE_MAX_QUEUE: int = 64       # calls allowed to wait for a slot (0 = unbounded)
+
+    # ID Allocation
+    ID_ALLOCATOR_PATH: str = "data/ids.db"    # shared by all worker processes
+    ID_BLOCK_SIZE: int = 1000    # IDs reserved per process at a time
+
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_BUFFER_CAPACITY: int = 100    # detection logs kept in memory (up to 10,000,000)
+    LOG_STORE_ENABLED: bool = True    # persist detection logs to embedded SQLite
+    LOG_STORE_PATH: str = "data/detection_logs.db"
+    LOG_STORE_BATCH_SIZE: int = 50    # pending entries written per transaction
+    LOG_STORE_FLUSH_INTERVAL_SECONDS: float = 1.0
+    LOG_SINKS: str = "console"    # comma-separated: console, file (the store is added when enabled)
+    LOG_FILE_PATH: str = "data/logs/detections.jsonl"
+    LOG_FILE_MAX_BYTES: int = 10_000_000    # rotate the JSON-lines file at this size
+    LOG_FILE_BACKUP_COUNT: int = 5
+    LOG_QUEUE_MAX_SIZE: int = 10000    # queued log records before new ones are dropped
+    LOG_WRITER_BATCH_SIZE: int = 256
+    LOG_STREAM_REPLAY_SIZE: int = 1000    # recent events kept for Last-Event-ID resumes
+    LOG_STREAM_SUBSCRIBER_BUFFER: int = 256    # undelivered events per /logs/stream client
+    LOG_STREAM_MAX_SUBSCRIBERS: int = 100
+    LOG_STREAM_SUMMARY_INTERVAL_SECONDS: float = 5.0
 
     # Content Types
     SUPPORTED_CONTENT_TYPES: List[str] = ["text", "image", "video", "audio"]
@@ -36,3 +126,66 @@ settings = Settings()
 DEBUG = settings.DEBUG
 API_HOST = settings.API_HOST
 API_PORT = settings.API_PORT
+SERVER_MODE = settings.SERVER_MODE
+SERVER_WORKERS = settings.SERVER_WORKERS
+PRELOAD_MODELS = settings.PRELOAD_MODELS
+TORCH_NUM_THREADS = settings.TORCH_NUM_THREADS
+TORCH_INTEROP_THREADS = settings.TORCH_INTEROP_THREADS
+METRICS_PORT_BASE = settings.METRICS_PORT_BASE
+WARMUP_ENABLED = settings.WARMUP_ENABLED
+WARMUP_MODELS = settings.WARMUP_MODELS
+WARMUP_POLICY = settings.WARMUP_POLICY
+WARMUP_QUEUE_TIMEOUT_SECONDS = settings.WARMUP_QUEUE_TIMEOUT_SECONDS
+TRACE_HEADER = settings.TRACE_HEADER
+TRACE_HISTORY_SIZE = settings.TRACE_HISTORY_SIZE
+TEXT_BATCH_MAX_SIZE = settings.TEXT_BATCH_MAX_SIZE
+TEXT_BATCH_MAX_WAIT_MS = settings.TEXT_BATCH_MAX_WAIT_MS
+INFERENCE_WORKERS = settings.INFERENCE_WORKERS
+INFERENCE_MAX_CONCURRENCY = settings.INFERENCE_MAX_CONCURRENCY
+INFERENCE_MAX_QUEUE = settings.INFERENCE_MAX_QUEUE
+TEXT_MODEL_NAME = settings.TEXT_MODEL_NAME
+TEXT_CLASSIFIER_BACKEND = settings.TEXT_CLASSIFIER_BACKEND
+TEXT_ONNX_MODEL_DIR = settings.TEXT_ONNX_MODEL_DIR
+CLIP_MODEL_NAME = settings.CLIP_MODEL_NAME
+WHISPER_MODEL_SIZE = settings.WHISPER_MODEL_SIZE
+MODEL_REGISTRY_MAX_LOADED = settings.MODEL_REGISTRY_MAX_LOADED
+MODEL_IDLE_TIMEOUT_SECONDS = settings.MODEL_IDLE_TIMEOUT_SECONDS
+VERDICT_CACHE_SIZE = settings.VERDICT_CACHE_SIZE
+VERDICT_CACHE_TTL_SECONDS = settings.VERDICT_CACHE_TTL_SECONDS
+CASCADE_ENABLED = settings.CASCADE_ENABLED
+CASCADE_UNCERTAIN_LOW = settings.CASCADE_UNCERTAIN_LOW
+CASCADE_UNCERTAIN_HIGH = settings.CASCADE_UNCERTAIN_HIGH
+BULK_BATCH_SIZE = settings.BULK_BATCH_SIZE
+BULK_MAX_ITEM_BYTES = settings.BULK_MAX_ITEM_BYTES
+TEXT_WINDOW_TOKENS = settings.TEXT_WINDOW_TOKENS
+TEXT_WINDOW_OVERLAP = settings.TEXT_WINDOW_OVERLAP
+EMBEDDING_CACHE_SIZE = settings.EMBEDDING_CACHE_SIZE
+CLIP_SIMILARITY_FLOOR = settings.CLIP_SIMILARITY_FLOOR
+CLIP_SIMILARITY_CEILING = settings.CLIP_SIMILARITY_CEILING
+CLIP_BATCH_MAX_SIZE = settings.CLIP_BATCH_MAX_SIZE
+CLIP_BATCH_MAX_WAIT_MS = settings.CLIP_BATCH_MAX_WAIT_MS
+TRANSCRIPT_CACHE_PATH = settings.TRANSCRIPT_CACHE_PATH
+TRANSCRIPTION_WORKERS = settings.TRANSCRIPTION_WORKERS
+TRANSCRIPTION_TIMEOUT_SECONDS = settings.TRANSCRIPTION_TIMEOUT_SECONDS
+LOG_BUFFER_CAPACITY = settings.LOG_BUFFER_CAPACITY
+LOG_STORE_ENABLED = settings.LOG_STORE_ENABLED
+LOG_STORE_PATH = settings.LOG_STORE_PATH
+LOG_STORE_BATCH_SIZE = settings.LOG_STORE_BATCH_SIZE
+LOG_STORE_FLUSH_INTERVAL_SECONDS = settings.LOG_STORE_FLUSH_INTERVAL_SECONDS
+LOG_SINKS = settings.LOG_SINKS
+LOG_FILE_PATH = settings.LOG_FILE_PATH
+LOG_FILE_MAX_BYTES = settings.LOG_FILE_MAX_BYTES
+LOG_FILE_BACKUP_COUNT = settings.LOG_FILE_BACKUP_COUNT
+LOG_QUEUE_MAX_SIZE = settings.LOG_QUEUE_MAX_SIZE
+LOG_WRITER_BATCH_SIZE = settings.LOG_WRITER_BATCH_SIZE
+LOG_STREAM_REPLAY_SIZE = settings.LOG_STREAM_REPLAY_SIZE
+LOG_STREAM_SUBSCRIBER_BUFFER = settings.LOG_STREAM_SUBSCRIBER_BUFFER
+LOG_STREAM_MAX_SUBSCRIBERS = settings.LOG_STREAM_MAX_SUBSCRIBERS
+LOG_STREAM_SUMMARY_INTERVAL_SECONDS = settings.LOG_STREAM_SUMMARY_INTERVAL_SECONDS
+ID_ALLOCATOR_PATH = settings.ID_ALLOCATOR_PATH
+ID_BLOCK_SIZE = settings.ID_BLOCK_SIZE
+MEDIA_SPOOL_THRESHOLD_BYTES = settings.MEDIA_SPOOL_THRESHOLD_BYTES
+MEDIA_IMAGE_MAX_BYTES = settings.MEDIA_IMAGE_MAX_BYTES
+MEDIA_AUDIO_MAX_BYTES = settings.MEDIA_AUDIO_MAX_BYTES
+MEDIA_AUDIO_MAX_SECONDS = settings.MEDIA_AUDIO_MAX_SECONDS
+MEDIA_TEXT_MAX_BYTES = settings.MEDIA_TEXT_MAX_BYTES
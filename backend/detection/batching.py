@@ -0,0 +1,207 @@
+# detection/batching.py
+"""
+Micro-batching queue for model inference.
+Collects concurrent single-item requests for a few milliseconds and runs
+them through the model as one batch, handing each caller its own result.
+Each item carries its caller's context, so profiled requests get a span for
+their wait in the queue, the batch itself and every stage timed inside it.
+"""
+
+import contextvars
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.tracing import batch_trace, record_span
+
+class MicroBatcher:
+    """
+    Groups concurrent calls into batches for a batch-capable inference function.
+
+    A single background worker waits for the first queued item, then keeps
+    collecting until either `max_batch_size` items are waiting or `max_wait_ms`
+    has passed, and calls `batch_fn` once with the whole batch.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 8, max_wait_ms: float = 10.0, name: str = "batcher"):
+        """
+        Initialize the batcher.
+
+        Args:
+            batch_fn (Callable): Function mapping a list of inputs to a list of results
+            max_batch_size (int): Maximum number of items per batch
+            max_wait_ms (float): Maximum time to wait for a batch to fill, in milliseconds
+            name (str): Name used for the worker thread
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        # Batch fill statistics
+        self._batches = 0
+        self._items = 0
+        self._last_batch_size = 0
+        self._size_histogram = [0] * (self.max_batch_size + 1)
+
+        _batchers.add(self)
+
+    def submit(self, item: Any) -> Any:
+        """
+        Submit one item and block until its result is available.
+
+        Args:
+            item (Any): Input for the batch function
+
+        Returns:
+            Any: The result for this item
+        """
+        return self.submit_async(item).result()
+
+    def submit_async(self, item: Any) -> Future:
+        """
+        Submit one item and return a future for its result.
+
+        Args:
+            item (Any): Input for the batch function
+
+        Returns:
+            Future: Resolves to the result for this item
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((item, future, contextvars.copy_context(), time.perf_counter()))
+        return future
+
+    def queue_depth(self) -> int:
+        """Return the number of items waiting to be batched."""
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict:
+        """
+        Get batch fill statistics.
+
+        Returns:
+            Dict: Batch counts, average fill and a histogram of batch sizes
+        """
+        with self._stats_lock:
+            avg_size = self._items / self._batches if self._batches else 0.0
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait * 1000, 1),
+                "batches_processed": self._batches,
+                "items_processed": self._items,
+                "last_batch_size": self._last_batch_size,
+                "avg_batch_size": round(avg_size, 2),
+                "avg_batch_fill": round(avg_size / self.max_batch_size, 3),
+                "batch_size_histogram": {
+                    str(size): count for size, count in enumerate(self._size_histogram) if size and count
+                },
+                "queue_depth": self.queue_depth()
+            }
+
+    def _ensure_worker(self) -> None:
+        """Start the background worker thread on first use."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _reset_after_fork(self) -> None:
+        """
+        Give a forked child an empty queue, fresh locks and no worker. The
+        parent's worker thread does not exist in the child, and items queued
+        in the parent belong to the parent's callers.
+        """
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def _collect_batch(self) -> List[tuple]:
+        """Block for the first item, then collect more until full or the wait expires."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        """Worker loop: collect batches and resolve their futures."""
+        while True:
+            # Drop items whose caller already cancelled; the rest can no longer be cancelled
+            batch = [entry for entry in self._collect_batch() if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            items = [item for item, _, _, _ in batch]
+            futures = [future for _, future, _, _ in batch]
+            started = time.perf_counter()
+
+            # Spans are added to the trace of every profiled caller, before any caller is released
+            error: Optional[Exception] = None
+            with batch_trace(context for _, _, context, _ in batch) as traces:
+                if traces:
+                    for _, _, context, submitted in batch:
+                        context.run(record_span, f"{self.name}.queue_wait", submitted, started)
+                try:
+                    results = self.batch_fn(items)
+                    if len(results) != len(items):
+                        raise RuntimeError(f"Batch function returned {len(results)} results for {len(items)} inputs")
+                except Exception as e:
+                    error = e
+                record_span(f"{self.name}.batch", started, time.perf_counter(), error is not None)
+
+            if error is not None:
+                for future in futures:
+                    _resolve(future.set_exception, error)
+            else:
+                for future, result in zip(futures, results):
+                    _resolve(future.set_result, result)
+
+            self._record_batch(len(batch))
+
+    def _record_batch(self, size: int) -> None:
+        """Update batch fill statistics."""
+        with self._stats_lock:
+            self._batches += 1
+            self._items += size
+            self._last_batch_size = size
+            self._size_histogram[size] += 1
+
+def _resolve(setter: Callable[[Any], None], value: Any) -> None:
+    """Resolve one future without letting a future in a bad state stop the worker loop."""
+    try:
+        setter(value)
+    except InvalidStateError:
+        pass
+
+# Every batcher in the process, reset in forked children
+_batchers: "weakref.WeakSet[MicroBatcher]" = weakref.WeakSet()
+
+def _reset_after_fork() -> None:
+    for batcher in list(_batchers):
+        batcher._reset_after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
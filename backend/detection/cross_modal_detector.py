@@ -1,17 +1,26 @@
 """
 Cross-modal inconsistency detection using CLIP and Whisper.
 Detects inconsistencies between text, image, and audio content.
+The CLIP embedding engine and the transcriber (and with them numpy, torch
+and PIL) are imported on first use, so importing this module stays cheap.
 """
 
+import math
 import os
-import tempfile
 import logging
-from typing import Dict, List, Optional, Tuple
-import numpy as np
-from PIL import Image
-import torch
-from transformers import CLIPProcessor, CLIPModel
-import whisper
+from typing import Dict, List, Optional, Tuple, Union
+
+from backend.detection.model_registry import get_model_registry, ModelLoadError
+from backend.metrics import timed
+
+# A media file: path, raw bytes, or an object with 'source' and 'sha256' (backend.media.MediaInput)
+Media = Union[str, bytes, object]
+
+def _media_source(media: Media) -> Tuple[Union[str, bytes], Optional[str]]:
+    """Return (path or bytes, known content hash or None) for a media argument."""
+    if isinstance(media, (str, bytes)):
+        return media, None
+    return media.source, getattr(media, "sha256", None)
 
 class CrossModalDetector:
     """
@@ -19,46 +28,57 @@ class CrossModalDetector:
     """
     
     def __init__(self):
-        """Initialize the cross-modal detector with CLIP and Whisper models."""
-        self.clip_model = None
-        self.clip_processor = None
-        self.whisper_model = None
-        self._load_models()
+        """
+        Initialize the cross-modal detector.
+        CLIP and Whisper come from the shared model registry and are loaded
+        the first time an image or audio file is analyzed.
+        """
+        self._registry = get_model_registry()
+    
+    @property
+    def clip_model(self):
+        """The shared CLIP model, or None if it failed to load."""
+        clip = self._get_model("clip")
+        return clip[0] if clip else None
+    
+    @property
+    def clip_processor(self):
+        """The shared CLIP processor, or None if it failed to load."""
+        clip = self._get_model("clip")
+        return clip[1] if clip else None
+    
+    @property
+    def whisper_model(self):
+        """The shared Whisper model, or None if it failed to load."""
+        return self._get_model("whisper")
     
-    def _load_models(self):
-        """Load CLIP and Whisper models."""
+    def _get_model(self, name: str):
+        """Fetch a model from the registry, returning None if it cannot be loaded."""
         try:
-            print("🔄 Loading CLIP model for cross-modal detection...")
-            self.clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-            self.clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-            print("✅ CLIP model loaded successfully!")
-            
-            print("🔄 Loading Whisper model for audio transcription...")
-            self.whisper_model = whisper.load_model("base")
-            print("✅ Whisper model loaded successfully!")
-            
-        except Exception as e:
+            return self._registry.get(name)
+        except ModelLoadError as e:
             print(f"❌ Error loading models: {e}")
-            self.clip_model = None
-            self.clip_processor = None
-            self.whisper_model = None
+            return None
     
-    def analyze(self, text: str, image_path: Optional[str] = None, audio_path: Optional[str] = None) -> Dict:
+    @timed("cross_modal.analyze")
+    def analyze(self, text: str, image: Optional[Media] = None, audio: Optional[Media] = None) -> Dict:
         """
         Analyze cross-modal consistency between text, image, and audio.
+        Media can be given as a file path, raw file bytes, or a MediaInput
+        (whose precomputed content hash is reused).
         
         Args:
             text (str): Text content to analyze
-            image_path (str, optional): Path to image file
-            audio_path (str, optional): Path to audio file
+            image (str, bytes or MediaInput, optional): Image file
+            audio (str, bytes or MediaInput, optional): Audio file
             
         Returns:
             Dict: Analysis results with similarity scores and consistency assessment
         """
         results = {
             "text": text,
-            "has_image": image_path is not None,
-            "has_audio": audio_path is not None,
+            "has_image": image is not None,
+            "has_audio": audio is not None,
             "similarity_scores": {},
             "consistency_assessment": "unknown",
             "overall_trust_score": 50,
@@ -67,14 +87,14 @@ class CrossModalDetector:
         
         try:
             # Process text-image similarity if image is provided
-            if image_path and self.clip_model:
-                text_image_similarity = self._analyze_text_image_similarity(text, image_path)
+            if image is not None and self.clip_model:
+                text_image_similarity = self._analyze_text_image_similarity(text, image)
                 results["similarity_scores"]["text_image"] = text_image_similarity
                 results["details"]["text_image_analysis"] = f"Text-image similarity: {text_image_similarity:.2f}"
             
             # Process text-audio similarity if audio is provided
-            if audio_path and self.whisper_model:
-                text_audio_similarity = self._analyze_text_audio_similarity(text, audio_path)
+            if audio is not None:
+                text_audio_similarity = self._analyze_text_audio_similarity(text, audio)
                 results["similarity_scores"]["text_audio"] = text_audio_similarity
                 results["details"]["text_audio_analysis"] = f"Text-audio similarity: {text_audio_similarity:.2f}"
             
@@ -94,59 +114,61 @@ class CrossModalDetector:
         
         return results
     
-    def _analyze_text_image_similarity(self, text: str, image_path: str) -> float:
+    def _analyze_text_image_similarity(self, text: str, image: Media) -> float:
         """
         Analyze similarity between text and image using CLIP.
         
         Args:
             text (str): Text content
-            image_path (str): Path to image file
+            image (str, bytes or MediaInput): Image file
             
         Returns:
             float: Similarity score between 0 and 1
         """
         try:
-            # Load and preprocess image
-            image = Image.open(image_path).convert('RGB')
+            source, image_hash = _media_source(image)
+            if isinstance(source, str):
+                with open(source, "rb") as image_file:
+                    source = image_file.read()
             
-            # Prepare inputs for CLIP
-            inputs = self.clip_processor(
-                text=[text],
-                images=image,
-                return_tensors="pt",
-                padding=True,
-                truncation=True
-            )
+            # Cosine similarity between separately encoded (and cached) text and image embeddings,
+            # scored in one vectorized batch with concurrent requests; the image is decoded from memory
+            from backend.detection.embedding_engine import get_embedding_engine, get_pair_batcher
+            from backend.executor import release_inference_slot
+
+            engine = get_embedding_engine()
+            future = get_pair_batcher().submit_async((text, source, image_hash))
+            # The pair batcher bounds CLIP work itself; free the executor slot so other requests can join
+            release_inference_slot()
+            cosine = future.result()
+            if math.isnan(cosine):
+                raise ValueError("Image could not be decoded")
             
-            # Get embeddings
-            with torch.no_grad():
-                outputs = self.clip_model(**inputs)
-                logits_per_image = outputs.logits_per_image
-                probs = logits_per_image.softmax(dim=-1)
-                
-            # Return similarity score (probability of text matching image)
-            similarity_score = probs[0][0].item()
-            return similarity_score
+            # Calibrate the raw cosine into a 0-1 consistency score
+            return engine.calibrate(cosine)
             
         except Exception as e:
             logging.error(f"Error in text-image similarity analysis: {e}")
             return 0.5  # Neutral score on error
     
-    def _analyze_text_audio_similarity(self, text: str, audio_path: str) -> float:
+    def _analyze_text_audio_similarity(self, text: str, audio: Media) -> float:
         """
         Analyze similarity between text and audio using Whisper transcription.
         
         Args:
             text (str): Text content
-            audio_path (str): Path to audio file
+            audio (str, bytes or MediaInput): Audio file
             
         Returns:
             float: Similarity score between 0 and 1
         """
         try:
-            # Transcribe audio
-            result = self.whisper_model.transcribe(audio_path)
-            audio_text = result["text"].strip().lower()
+            # Transcribe audio (cached by content hash, run in the transcription pool);
+            # in-memory audio is decoded through an ffmpeg pipe, not a temp file
+            from backend.detection.transcription import get_transcriber
+
+            source, audio_hash = _media_source(audio)
+            audio_text = get_transcriber().transcribe(source, audio_hash=audio_hash).lower()
             
             # Simple text similarity using word overlap
             text_words = set(text.lower().split())
@@ -181,7 +203,7 @@ class CrossModalDetector:
             return "no_multimodal_content", 50
         
         # Calculate average similarity score
-        avg_similarity = np.mean(list(similarity_scores.values()))
+        avg_similarity = sum(similarity_scores.values()) / len(similarity_scores)
         
         # Determine consistency assessment
         if avg_similarity >= 0.7:
@@ -233,6 +255,16 @@ class CrossModalDetector:
         else:
             return "Cross-modal analysis could not be completed due to technical issues."
 
+# Global instance for reuse
+_cross_modal_instance = None
+
+def get_cross_modal_detector() -> CrossModalDetector:
+    """Get or create the global cross-modal detector instance."""
+    global _cross_modal_instance
+    if _cross_modal_instance is None:
+        _cross_modal_instance = CrossModalDetector()
+    return _cross_modal_instance
+
 def test_cross_modal_detector():
     """Test the cross-modal detector with sample content."""
     print("🧪 Testing Cross-Modal Detector...\n")
@@ -0,0 +1,292 @@
+# detection/embedding_engine.py
+"""
+Vectorized CLIP embedding engine.
+Encodes images and texts separately, caches their normalized embeddings by
+content hash, and scores many (text, image) pairs with a single matrix product.
+Concurrent cross-modal requests are micro-batched into one pair batch.
+"""
+
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.config import (
+    EMBEDDING_CACHE_SIZE, CLIP_SIMILARITY_FLOOR, CLIP_SIMILARITY_CEILING, CLIP_BATCH_MAX_SIZE, CLIP_BATCH_MAX_WAIT_MS
+)
+from backend.detection.batching import MicroBatcher
+from backend.detection.model_registry import get_model_registry
+from backend.metrics import observe_stage, timed
+
+def content_hash(data: bytes) -> str:
+    """Return the hex SHA-256 digest of raw content bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache of normalized embedding vectors.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of cached embeddings (0 disables caching)
+        """
+        self.max_size = max(0, max_size)
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a key, or None."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Cache an embedding, evicting the least recently used one if full."""
+        if not self.max_size:
+            return
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_stats(self) -> Dict:
+        """Get cache size, hit, miss and eviction counts."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+class ClipEmbeddingEngine:
+    """
+    Encodes texts and images with CLIP and computes cosine similarities in bulk.
+    """
+
+    def __init__(self, cache_size: int = EMBEDDING_CACHE_SIZE):
+        """
+        Initialize the engine. CLIP itself comes from the shared model registry.
+
+        Args:
+            cache_size (int): Maximum cached embeddings per modality
+        """
+        self.text_cache = EmbeddingCache(cache_size)
+        self.image_cache = EmbeddingCache(cache_size)
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Encode texts into L2-normalized CLIP embeddings, reusing cached ones.
+
+        Args:
+            texts (Sequence[str]): Texts to encode
+
+        Returns:
+            np.ndarray: Array of shape (len(texts), embedding_dim)
+        """
+        keys = [content_hash(text.encode("utf-8")) for text in texts]
+        return self._encode(keys, list(texts), self.text_cache, self._embed_texts)
+
+    def encode_images(self, images: Sequence[bytes], keys: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Encode encoded image files (PNG, JPEG, ...) into L2-normalized CLIP embeddings.
+
+        Args:
+            images (Sequence[bytes]): Raw image file contents
+            keys (Sequence[str], optional): Precomputed content hashes of the images
+
+        Returns:
+            np.ndarray: Array of shape (len(images), embedding_dim); rows of
+                        images that cannot be decoded are NaN
+        """
+        keys = list(keys) if keys is not None else [content_hash(data) for data in images]
+        return self._encode(keys, list(images), self.image_cache, self._embed_images)
+
+    def similarity_matrix(self, texts: Sequence[str], images: Sequence[bytes]) -> np.ndarray:
+        """
+        Cosine similarity between every text and every image.
+
+        Args:
+            texts (Sequence[str]): Texts
+            images (Sequence[bytes]): Raw image file contents
+
+        Returns:
+            np.ndarray: Array of shape (len(texts), len(images))
+        """
+        return self.encode_texts(texts) @ self.encode_images(images).T
+
+    def pair_similarities(self, pairs: Sequence[Tuple[str, bytes]],
+                          image_keys: Optional[Sequence[Optional[str]]] = None) -> np.ndarray:
+        """
+        Cosine similarity for each (text, image) pair.
+        Repeated texts or images in the batch are encoded only once.
+
+        Args:
+            pairs (Sequence[Tuple[str, bytes]]): (text, raw image bytes) pairs
+            image_keys (Sequence[str], optional): Precomputed content hash per pair (None entries are hashed)
+
+        Returns:
+            np.ndarray: One cosine similarity per pair (NaN where the image cannot be decoded)
+        """
+        if not pairs:
+            return np.zeros(0, dtype=np.float32)
+
+        text_index: Dict[str, int] = {}
+        image_index: Dict[str, int] = {}
+        unique_images: List[bytes] = []
+        rows, cols = [], []
+        image_keys = image_keys or [None] * len(pairs)
+
+        for (text, image), image_key in zip(pairs, image_keys):
+            rows.append(text_index.setdefault(text, len(text_index)))
+            image_key = image_key or content_hash(image)
+            if image_key not in image_index:
+                image_index[image_key] = len(unique_images)
+                unique_images.append(image)
+            cols.append(image_index[image_key])
+
+        text_embeddings = self.encode_texts(list(text_index))
+        image_embeddings = self.encode_images(unique_images, keys=list(image_index))
+
+        return np.einsum("ij,ij->i", text_embeddings[rows], image_embeddings[cols])
+
+    def calibrate(self, cosine: float) -> float:
+        """
+        Map a raw CLIP cosine similarity onto a 0-1 consistency score.
+        CLIP cosines for matching pairs cluster in a narrow band, so the
+        configured floor and ceiling are stretched linearly to 0 and 1.
+
+        Args:
+            cosine (float): Raw cosine similarity
+
+        Returns:
+            float: Calibrated similarity between 0 and 1
+        """
+        span = max(CLIP_SIMILARITY_CEILING - CLIP_SIMILARITY_FLOOR, 1e-6)
+        return float(min(1.0, max(0.0, (cosine - CLIP_SIMILARITY_FLOOR) / span)))
+
+    def get_stats(self) -> Dict:
+        """Get embedding cache statistics for both modalities, and pair batch fill."""
+        return {
+            "text_cache": self.text_cache.get_stats(),
+            "image_cache": self.image_cache.get_stats(),
+            "pair_batching": _pair_batcher_instance.get_stats() if _pair_batcher_instance else {}
+        }
+
+    def _encode(self, keys: List[str], items: List, cache: EmbeddingCache, embed_fn) -> np.ndarray:
+        """Look up cached embeddings and encode only the misses in one batch."""
+        vectors: List[Optional[np.ndarray]] = [cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing:
+            embedded = embed_fn([items[i] for i in missing])
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+                # Failed items come back as NaN rows; they are not cached so a retry re-encodes them
+                if not np.isnan(vector).any():
+                    cache.put(keys[i], vector)
+
+        return np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+    @timed("cross_modal.clip_text")
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Run the CLIP text tower on a batch of texts."""
+        import torch
+
+        model, processor = get_model_registry().get("clip")
+        inputs = processor(text=texts, return_tensors="pt", padding=True, truncation=True)
+        with torch.no_grad():
+            features = model.get_text_features(**inputs)
+        return _normalize(features.cpu().numpy())
+
+    def _embed_images(self, images: List[bytes]) -> np.ndarray:
+        """
+        Decode and run the CLIP image tower on a batch of images.
+        Each image is decoded on its own, so one corrupt upload only yields a
+        NaN row for its own pair instead of failing every request in the batch.
+        """
+        import torch
+        from PIL import Image
+
+        decoded, valid = [], []
+        with observe_stage("cross_modal.image_decode"):
+            for index, data in enumerate(images):
+                try:
+                    decoded.append(Image.open(io.BytesIO(data)).convert("RGB"))
+                    valid.append(index)
+                except Exception as e:
+                    logging.warning(f"Skipping undecodable image in CLIP batch: {e}")
+        with observe_stage("cross_modal.clip_image"):
+            model, processor = get_model_registry().get("clip")
+            embeddings = np.full((len(images), model.config.projection_dim), np.nan, dtype=np.float32)
+            if decoded:
+                inputs = processor(images=decoded, return_tensors="pt")
+                with torch.no_grad():
+                    features = model.get_image_features(**inputs)
+                embeddings[valid] = _normalize(features.cpu().numpy())
+            return embeddings
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row, as float32."""
+    vectors = vectors.astype(np.float32, copy=False)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+# Global instances for reuse; first created from concurrent executor threads
+_engine_instance = None
+_pair_batcher_instance = None
+_instance_lock = threading.Lock()
+
+def get_embedding_engine() -> ClipEmbeddingEngine:
+    """Get or create the global CLIP embedding engine."""
+    global _engine_instance
+    if _engine_instance is None:
+        with _instance_lock:
+            if _engine_instance is None:
+                _engine_instance = ClipEmbeddingEngine()
+    return _engine_instance
+
+def _score_pairs(items: List[Tuple[str, bytes, Optional[str]]]) -> List[float]:
+    """Batch function for the pair batcher: (text, image bytes, image hash) -> raw cosine (NaN if undecodable)."""
+    similarities = get_embedding_engine().pair_similarities(
+        [(text, image) for text, image, _ in items], image_keys=[key for _, _, key in items]
+    )
+    return [float(value) for value in similarities]
+
+def get_pair_batcher() -> MicroBatcher:
+    """
+    Get or create the global micro-batcher in front of pair_similarities().
+    Concurrent cross-modal requests share one vectorized CLIP batch.
+    """
+    global _pair_batcher_instance
+    if _pair_batcher_instance is None:
+        with _instance_lock:
+            if _pair_batcher_instance is None:
+                _pair_batcher_instance = MicroBatcher(
+                    _score_pairs,
+                    max_batch_size=CLIP_BATCH_MAX_SIZE,
+                    max_wait_ms=CLIP_BATCH_MAX_WAIT_MS,
+                    name="clip-pair-batcher"
+                )
+    return _pair_batcher_instance
@@ -3,11 +3,35 @@ Hugging Face-based misinformation detection using zero-shot classification.
 Uses facebook/bart-large-mnli model for real-time content analysis.
 """
 
-from transformers import pipeline
+import hashlib
 import logging
+import threading
 from typing import Dict, List, Optional
 import time
 
+from backend.config import TEXT_BATCH_MAX_SIZE, TEXT_BATCH_MAX_WAIT_MS, TEXT_WINDOW_TOKENS, TEXT_WINDOW_OVERLAP
+from backend.detection.batching import MicroBatcher
+from backend.detection.model_registry import get_model_registry, ModelLoadError
+from backend.detection.prescreen import count_indicators
+from backend.executor import release_inference_slot
+from backend.metrics import timed
+
+# Candidate labels for zero-shot classification
+DEFAULT_LABELS = [
+    "misinformation",
+    "credible information", 
+    "satire or humor",
+    "clickbait",
+    "conspiracy theory",
+    "factual news"
+]
+
+# Changes whenever the label set changes, so cached verdicts are not reused across label sets
+LABEL_SET_VERSION = hashlib.sha256("|".join(DEFAULT_LABELS).encode("utf-8")).hexdigest()[:12]
+
+# Tokens reserved for the NLI hypothesis ("This example is ...") and special tokens
+_HYPOTHESIS_TOKEN_MARGIN = 32
+
 class HuggingFaceDetector:
     """
     Real misinformation detection using Hugging Face zero-shot classification.
@@ -15,32 +39,26 @@ class HuggingFaceDetector:
     
     def __init__(self):
         """Initialize the Hugging Face zero-shot classifier."""
-        self.classifier = None
-        self.labels = [
-            "misinformation",
-            "credible information", 
-            "satire or humor",
-            "clickbait",
-            "conspiracy theory",
-            "factual news"
-        ]
+        self.labels = list(DEFAULT_LABELS)
         self._load_model()
     
+    @property
+    def classifier(self):
+        """The shared zero-shot pipeline from the model registry, or None if it failed to load."""
+        try:
+            return get_model_registry().get("bart")
+        except ModelLoadError:
+            return None
+    
     def _load_model(self):
-        """Load the zero-shot classification model."""
+        """Load the zero-shot classification model through the shared model registry."""
         try:
-            print("🔄 Loading Hugging Face zero-shot classifier...")
-            self.classifier = pipeline(
-                "zero-shot-classification",
-                model="facebook/bart-large-mnli",
-                device=-1  # Use CPU (-1), change to 0 for GPU
-            )
-            print("✅ Hugging Face model loaded successfully!")
-        except Exception as e:
+            get_model_registry().get("bart")
+        except ModelLoadError as e:
             print(f"❌ Error loading Hugging Face model: {e}")
             print("💡 Make sure to install: pip install transformers torch")
-            self.classifier = None
     
+    @timed("text.analyze_text")
     def analyze_text(self, text: str) -> Dict:
         """
         Analyze text for misinformation using zero-shot classification.
@@ -51,34 +69,160 @@ class HuggingFaceDetector:
         Returns:
             Dict: Analysis result with trust score and classification
         """
-        if not self.classifier:
-            return self._fallback_analysis(text)
+        return self.analyze_texts([text])[0]
+    
+    @timed("text.zero_shot_batch")
+    def analyze_texts(self, texts: List[str]) -> List[Dict]:
+        """
+        Analyze several texts with batched zero-shot classification.
+        
+        Texts longer than the model limit are split into overlapping windows.
+        All windows are sorted by token length and classified in buckets of
+        similar length, so short posts are not padded up to long articles.
+        Window scores are then averaged back into one verdict per text.
+        
+        Args:
+            texts (List[str]): Text contents to analyze
+            
+        Returns:
+            List[Dict]: One analysis result per input text, in input order,
+                        including 'window_count' and 'padding_efficiency'
+        """
+        if not texts:
+            return []
+        
+        classifier = self.classifier
+        if not classifier:
+            return [self._fallback_analysis(text) for text in texts]
         
         try:
-            # Run zero-shot classification
-            result = self.classifier(text, self.labels)
+            segments = self._split_into_windows(classifier.tokenizer, texts)
+            
+            # Length bucketing: sort windows by token count and batch neighbours together
+            order = sorted(range(len(segments)), key=lambda i: segments[i][2])
+            outputs: List[Optional[Dict]] = [None] * len(segments)
+            real_tokens = 0
+            padded_tokens = 0
             
-            # Extract the most likely label and its confidence
-            top_label = result['labels'][0]
-            top_score = result['scores'][0]
+            for start in range(0, len(order), TEXT_BATCH_MAX_SIZE):
+                bucket = order[start:start + TEXT_BATCH_MAX_SIZE]
+                results = classifier([segments[i][1] for i in bucket], self.labels, batch_size=len(bucket))
+                
+                # The pipeline returns a bare dict when given a single sequence
+                if isinstance(results, dict):
+                    results = [results]
+                
+                lengths = [segments[i][2] for i in bucket]
+                real_tokens += sum(lengths)
+                padded_tokens += max(lengths) * len(lengths)
+                
+                for i, result in zip(bucket, results):
+                    outputs[i] = result
             
-            # Calculate trust score based on classification
-            trust_score = self._calculate_trust_score(top_label, top_score)
+            padding_efficiency = round(real_tokens / padded_tokens, 3) if padded_tokens else 1.0
             
-            # Generate detailed reason
-            reason = self._generate_reason(top_label, top_score, result)
+            # Group window outputs back by source text
+            windows: List[List[tuple]] = [[] for _ in texts]
+            for (text_index, _, token_count), result in zip(segments, outputs):
+                windows[text_index].append((token_count, result))
             
-            return {
-                "trust_score": trust_score,
-                "classification": top_label,
-                "confidence": round(top_score * 100, 1),
-                "reason": reason,
-                "all_scores": dict(zip(result['labels'], [round(s * 100, 1) for s in result['scores']]))
-            }
+            analyses = []
+            for text_windows in windows:
+                analysis = self._build_result(self._aggregate_windows(text_windows))
+                analysis["window_count"] = len(text_windows)
+                analysis["padding_efficiency"] = padding_efficiency
+                analyses.append(analysis)
+            
+            return analyses
             
         except Exception as e:
-            print(f"❌ Error in Hugging Face analysis: {e}")
-            return self._fallback_analysis(text)
+            print(f"❌ Error in batched Hugging Face analysis: {e}")
+            return [self._fallback_analysis(text) for text in texts]
+    
+    def _split_into_windows(self, tokenizer, texts: List[str]) -> List[tuple]:
+        """
+        Split texts that exceed the model limit into overlapping token windows.
+        
+        Args:
+            tokenizer: The classifier's tokenizer
+            texts (List[str]): Texts to split
+            
+        Returns:
+            List[tuple]: (text index, window text, token count) for every window
+        """
+        window_size = TEXT_WINDOW_TOKENS or (tokenizer.model_max_length - _HYPOTHESIS_TOKEN_MARGIN)
+        window_size = max(16, min(window_size, tokenizer.model_max_length - _HYPOTHESIS_TOKEN_MARGIN))
+        # Overlap is capped at half a window so very long texts never explode into tiny steps
+        stride = max(window_size // 2, window_size - max(0, TEXT_WINDOW_OVERLAP))
+        
+        encodings = tokenizer(texts, add_special_tokens=False)["input_ids"]
+        segments = []
+        
+        for text_index, (text, token_ids) in enumerate(zip(texts, encodings)):
+            if len(token_ids) <= window_size:
+                segments.append((text_index, text, max(1, len(token_ids))))
+                continue
+            
+            for start in range(0, len(token_ids), stride):
+                window_ids = token_ids[start:start + window_size]
+                segments.append((text_index, tokenizer.decode(window_ids, skip_special_tokens=True), len(window_ids)))
+                if start + window_size >= len(token_ids):
+                    break
+        
+        return segments
+    
+    def _aggregate_windows(self, windows: List[tuple]) -> Dict:
+        """
+        Combine per-window classifications into one, weighting each window by its token count.
+        
+        Args:
+            windows (List[tuple]): (token count, pipeline output) for each window
+            
+        Returns:
+            Dict: Pipeline-style output with 'labels' and 'scores' sorted by score
+        """
+        if len(windows) == 1:
+            return windows[0][1]
+        
+        total_tokens = sum(token_count for token_count, _ in windows)
+        combined = {label: 0.0 for label in self.labels}
+        for token_count, result in windows:
+            for label, score in zip(result['labels'], result['scores']):
+                combined[label] += score * token_count / total_tokens
+        
+        ranked = sorted(combined.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "labels": [label for label, _ in ranked],
+            "scores": [score for _, score in ranked]
+        }
+    
+    def _build_result(self, result: Dict) -> Dict:
+        """
+        Convert a raw zero-shot classification output into an analysis result.
+        
+        Args:
+            result (Dict): Pipeline output with 'labels' and 'scores'
+            
+        Returns:
+            Dict: Analysis result with trust score and classification
+        """
+        # Extract the most likely label and its confidence
+        top_label = result['labels'][0]
+        top_score = result['scores'][0]
+        
+        # Calculate trust score based on classification
+        trust_score = self._calculate_trust_score(top_label, top_score)
+        
+        # Generate detailed reason
+        reason = self._generate_reason(top_label, top_score, result)
+        
+        return {
+            "trust_score": trust_score,
+            "classification": top_label,
+            "confidence": round(top_score * 100, 1),
+            "reason": reason,
+            "all_scores": dict(zip(result['labels'], [round(s * 100, 1) for s in result['scores']]))
+        }
     
     def _calculate_trust_score(self, label: str, confidence: float) -> int:
         """
@@ -159,23 +303,9 @@ class HuggingFaceDetector:
             Dict: Basic analysis result
         """
         # Simple keyword-based fallback
-        text_lower = text.lower()
-        
-        # Misinformation indicators
-        misinformation_keywords = [
-            "conspiracy", "fake news", "hoax", "cover up", "they don't want you to know",
-            "miracle cure", "secret", "hidden truth", "government hiding", "mainstream media lies"
-        ]
-        
-        # Credible indicators
-        credible_keywords = [
-            "study shows", "research indicates", "according to", "scientists say",
-            "peer-reviewed", "evidence suggests", "data shows"
-        ]
-        
-        # Count indicators
-        misinfo_count = sum(1 for keyword in misinformation_keywords if keyword in text_lower)
-        credible_count = sum(1 for keyword in credible_keywords if keyword in text_lower)
+        counts = count_indicators(text)
+        misinfo_count = counts["misinformation"]
+        credible_count = counts["credible"]
         
         # Calculate basic trust score
         if misinfo_count > credible_count:
@@ -199,19 +329,52 @@ class HuggingFaceDetector:
             "all_scores": {"fallback": 100.0}
         }
 
-# Global instance for reuse
+# Global instances for reuse; first created from concurrent executor threads
 _detector_instance = None
+_batcher_instance = None
+_detector_lock = threading.Lock()
+_batcher_lock = threading.Lock()
 
 def get_detector() -> HuggingFaceDetector:
     """Get or create the global detector instance."""
     global _detector_instance
     if _detector_instance is None:
-        _detector_instance = HuggingFaceDetector()
+        with _detector_lock:
+            if _detector_instance is None:
+                _detector_instance = HuggingFaceDetector()
     return _detector_instance
 
+def get_batcher() -> MicroBatcher:
+    """
+    Get or create the global micro-batcher in front of the detector.
+    Concurrent callers are grouped into one batched forward pass.
+    """
+    global _batcher_instance
+    if _batcher_instance is None:
+        with _batcher_lock:
+            if _batcher_instance is None:
+                _batcher_instance = MicroBatcher(
+                    lambda texts: get_detector().analyze_texts(texts),
+                    max_batch_size=TEXT_BATCH_MAX_SIZE,
+                    max_wait_ms=TEXT_BATCH_MAX_WAIT_MS,
+                    name="hf-text-batcher"
+                )
+    return _batcher_instance
+
+def get_batching_stats() -> Dict:
+    """
+    Get fill statistics for the text classification batcher.
+    
+    Returns:
+        Dict: Batch statistics, or an empty dict if no batcher has been created yet
+    """
+    return _batcher_instance.get_stats() if _batcher_instance else {}
+
+@timed("text.batched_classify")
 def analyze_text_with_huggingface(text: str) -> Dict:
     """
     Analyze text using Hugging Face model.
+    Requests are micro-batched with other concurrent callers.
     
     Args:
         text (str): Text to analyze
@@ -219,8 +382,22 @@ def analyze_text_with_huggingface(text: str) -> Dict:
     Returns:
         Dict: Analysis result
     """
-    detector = get_detector()
-    return detector.analyze_text(text)
+    future = get_batcher().submit_async(text)
+    # The batcher bounds model work itself; free the executor slot so other texts can join the batch
+    release_inference_slot()
+    return future.result()
+
+def analyze_texts_with_huggingface(texts: List[str]) -> List[Dict]:
+    """
+    Analyze an already-collected batch of texts in one model call.
+    
+    Args:
+        texts (List[str]): Texts to analyze
+        
+    Returns:
+        List[Dict]: One analysis result per text, in input order
+    """
+    return get_detector().analyze_texts(texts)
 
 # Test function
 def test_huggingface_detector():
@@ -0,0 +1,199 @@
+# detection/inference_backends.py
+"""
+Pluggable inference backends for the zero-shot text classifier.
+Every backend returns a transformers zero-shot pipeline, so labels and scores
+come back in the same format regardless of how the model is executed:
+
+- "torch":      PyTorch fp32 (the original behaviour)
+- "torch-int8": PyTorch with dynamic int8 quantization of Linear layers
+- "onnx":       ONNX Runtime through optimum (exported once, then reused)
+
+The onnx backend falls back to torch when optimum or onnxruntime is not installed.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+from backend.config import TEXT_MODEL_NAME, TEXT_CLASSIFIER_BACKEND, TEXT_ONNX_MODEL_DIR
+
+SUPPORTED_BACKENDS = ("torch", "torch-int8", "onnx")
+
+# Sample texts used by the parity check
+PARITY_SAMPLE_TEXTS = [
+    "COVID-19 vaccines are completely safe and effective for everyone.",
+    "5G towers are causing coronavirus! Stay away from them!",
+    "New study shows that exercise improves mental health.",
+    "The government is hiding the truth about aliens!",
+    "Scientists discover new species in the Amazon rainforest.",
+    "This miracle cure will solve all your problems!"
+]
+
+# Packages each backend needs beyond transformers and torch
+BACKEND_REQUIREMENTS = {"onnx": ("optimum", "onnxruntime")}
+
+def resolve_backend(backend: str, warn: bool = True) -> str:
+    """
+    Pick the backend to actually load: the requested one, or torch when its
+    optional packages are missing.
+
+    Args:
+        backend (str): Requested backend
+        warn (bool): Print a warning when falling back to torch
+
+    Returns:
+        str: Backend to load
+
+    Raises:
+        ValueError: If the backend name is not supported
+    """
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unsupported text classifier backend '{backend}'. Choose one of: {', '.join(SUPPORTED_BACKENDS)}")
+    missing = [name for name in BACKEND_REQUIREMENTS.get(backend, ()) if importlib.util.find_spec(name) is None]
+    if missing:
+        if warn:
+            print(f"⚠️ {backend} backend needs {', '.join(missing)}; falling back to torch fp32")
+        return "torch"
+    return backend
+
+def load_zero_shot_classifier(backend: str = TEXT_CLASSIFIER_BACKEND, model_name: str = TEXT_MODEL_NAME):
+    """
+    Load a zero-shot classification pipeline on the requested backend.
+
+    Args:
+        backend (str): One of SUPPORTED_BACKENDS
+        model_name (str): Hugging Face model name
+
+    Returns:
+        Pipeline: A transformers zero-shot-classification pipeline
+
+    Raises:
+        ValueError: If the backend name is not supported
+    """
+    loaders = {"torch": _load_torch, "torch-int8": _load_torch_int8, "onnx": _load_onnx}
+    return loaders[resolve_backend(backend)](model_name)
+
+def _load_torch(model_name: str):
+    """Load the PyTorch fp32 pipeline."""
+    from transformers import pipeline
+
+    return pipeline(
+        "zero-shot-classification",
+        model=model_name,
+        device=-1  # Use CPU (-1), change to 0 for GPU
+    )
+
+def _load_torch_int8(model_name: str):
+    """Load the model with dynamic int8 quantization of its Linear layers (CPU only)."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer, device=-1)
+
+def _load_onnx(model_name: str):
+    """
+    Load the model on ONNX Runtime.
+    The first load exports the model to TEXT_ONNX_MODEL_DIR; later loads reuse the export.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer, pipeline
+
+    export_dir = os.path.join(TEXT_ONNX_MODEL_DIR, model_name.replace("/", "__"))
+
+    if os.path.isdir(export_dir):
+        model = ORTModelForSequenceClassification.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        print(f"🔄 Exporting {model_name} to ONNX (first run only)...")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+def check_backend_parity(backends: Optional[List[str]] = None, texts: Optional[List[str]] = None,
+                         labels: Optional[List[str]] = None) -> Dict:
+    """
+    Run the same texts through several backends and report score drift
+    against the first backend. A backend whose packages are missing is
+    reported as skipped rather than scored, since it would silently load torch.
+
+    Args:
+        backends (List[str], optional): Backends to compare; the first is the reference
+        texts (List[str], optional): Texts to classify (defaults to PARITY_SAMPLE_TEXTS)
+        labels (List[str], optional): Candidate labels (defaults to the detector's labels)
+
+    Returns:
+        Dict: Per-backend max/mean absolute score drift, top-label agreement and timing,
+              or 'skipped' / 'error' for backends that could not be compared
+    """
+    from backend.detection.huggingface_detector import DEFAULT_LABELS
+
+    backends = backends or list(SUPPORTED_BACKENDS)
+    texts = texts or PARITY_SAMPLE_TEXTS
+    labels = labels or DEFAULT_LABELS
+
+    outputs = {}
+    report = {"reference": backends[0], "texts": len(texts), "backends": {}}
+
+    for backend in backends:
+        resolved = resolve_backend(backend)
+        if resolved != backend:
+            report["backends"][backend] = {"skipped": f"fell back to {resolved}"}
+            continue
+
+        try:
+            classifier = load_zero_shot_classifier(backend)
+            started = time.perf_counter()
+            results = classifier(texts, labels)
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            report["backends"][backend] = {"error": str(e)}
+            continue
+
+        outputs[backend] = [dict(zip(r["labels"], r["scores"])) for r in results]
+        report["backends"][backend] = {"seconds": round(elapsed, 3)}
+
+    reference = outputs.get(backends[0])
+    if reference is None:
+        return report
+
+    for backend, scores in outputs.items():
+        drifts = [
+            abs(ref[label] - got[label])
+            for ref, got in zip(reference, scores)
+            for label in labels
+        ]
+        agreement = sum(
+            1 for ref, got in zip(reference, scores)
+            if max(ref, key=ref.get) == max(got, key=got.get)
+        )
+        report["backends"][backend].update({
+            "max_abs_drift": round(max(drifts), 4),
+            "mean_abs_drift": round(sum(drifts) / len(drifts), 4),
+            "top_label_agreement": round(agreement / len(texts), 3)
+        })
+
+    return report
+
+def main():
+    """Command-line entry point for the backend parity check."""
+    parser = argparse.ArgumentParser(description="Compare zero-shot classifier backends for score drift.")
+    parser.add_argument("--backends", nargs="+", default=list(SUPPORTED_BACKENDS), choices=SUPPORTED_BACKENDS,
+                        help="Backends to compare; the first one is the reference")
+    args = parser.parse_args()
+
+    print(f"🧪 Checking backend parity: {', '.join(args.backends)}")
+    print(json.dumps(check_backend_parity(args.backends), indent=2))
+
+if __name__ == "__main__":
+    main()
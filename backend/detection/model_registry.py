@@ -0,0 +1,273 @@
+# detection/model_registry.py
+"""
+Process-wide registry of the heavy ML models (BART, CLIP, Whisper).
+Each model is loaded once, the first time it is needed, and shared by all
+requests. Models can be unloaded again by an LRU limit or an idle timeout.
+"""
+
+import gc
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.config import (
+    TEXT_MODEL_NAME, TEXT_CLASSIFIER_BACKEND, CLIP_MODEL_NAME, WHISPER_MODEL_SIZE,
+    MODEL_REGISTRY_MAX_LOADED, MODEL_IDLE_TIMEOUT_SECONDS
+)
+
+class ModelLoadError(Exception):
+    """Raised when a registered model cannot be loaded."""
+
+class _ModelEntry:
+    """Book-keeping for one registered model."""
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.model = None
+        self.error: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.load_count = 0
+        self.lock = threading.Lock()
+
+class ModelRegistry:
+    """
+    Lazily loads and shares named models, unloading them under memory pressure.
+    """
+
+    def __init__(self, max_loaded: int = 0, idle_timeout: float = 0):
+        """
+        Initialize the registry.
+
+        Args:
+            max_loaded (int): Maximum models kept loaded at once, least recently used
+                              are unloaded first (0 = unlimited)
+            idle_timeout (float): Unload models unused for this many seconds (0 = never)
+        """
+        self.max_loaded = max(0, max_loaded)
+        self.idle_timeout = max(0.0, idle_timeout)
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """
+        Register a model loader under a name. Nothing is loaded yet.
+
+        Args:
+            name (str): Model name used with get()
+            loader (Callable): Zero-argument function that loads and returns the model
+        """
+        with self._lock:
+            self._entries[name] = _ModelEntry(name, loader)
+
+    def get(self, name: str) -> Any:
+        """
+        Get a model, loading it on first use.
+
+        Args:
+            name (str): Registered model name
+
+        Returns:
+            Any: The loaded model object
+
+        Raises:
+            KeyError: If no model is registered under that name
+            ModelLoadError: If the model failed to load
+        """
+        entry = self._entries[name]
+        model = entry.model
+
+        if model is None:
+            with entry.lock:
+                if entry.model is None:
+                    self._load(entry)
+                model = entry.model
+
+            # Evict other models outside the entry lock to avoid lock-order deadlocks
+            self._enforce_lru_limit(keep=name)
+            self._ensure_sweeper()
+
+        entry.last_used = time.monotonic()
+        return model
+
+    def is_loaded(self, name: str) -> bool:
+        """Return True if the named model is currently in memory."""
+        entry = self._entries.get(name)
+        return entry is not None and entry.model is not None
+
+    def unload(self, name: str) -> bool:
+        """
+        Drop the registry's reference to a model so its memory can be reclaimed.
+        Requests already holding the model keep using it until they finish.
+        A previous load failure is also cleared so the next get() retries.
+
+        Args:
+            name (str): Registered model name
+
+        Returns:
+            bool: True if a loaded model was dropped
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+
+        with entry.lock:
+            was_loaded = entry.model is not None
+            entry.model = None
+            entry.error = None
+            entry.loaded_at = None
+
+        if was_loaded:
+            gc.collect()
+            print(f"♻️ Unloaded model '{name}'")
+        return was_loaded
+
+    def evict_idle(self) -> List[str]:
+        """
+        Unload every model that has been idle longer than the idle timeout.
+
+        Returns:
+            List[str]: Names of the models that were unloaded
+        """
+        if not self.idle_timeout:
+            return []
+
+        now = time.monotonic()
+        idle = [
+            entry.name for entry in list(self._entries.values())
+            if entry.model is not None and entry.last_used is not None
+            and now - entry.last_used > self.idle_timeout
+        ]
+        return [name for name in idle if self.unload(name)]
+
+    def get_status(self) -> Dict:
+        """
+        Get the load state of every registered model.
+
+        Returns:
+            Dict: Per-model load state, load time and idle time
+        """
+        now = time.monotonic()
+        models = {}
+        for entry in list(self._entries.values()):
+            if entry.model is not None:
+                state = "loaded"
+            elif entry.error:
+                state = "failed"
+            else:
+                state = "not_loaded"
+            models[entry.name] = {
+                "state": state,
+                "load_seconds": round(entry.load_seconds, 2) if entry.load_seconds is not None else None,
+                "load_count": entry.load_count,
+                "idle_seconds": round(now - entry.last_used, 1) if entry.last_used is not None else None,
+                "error": entry.error
+            }
+        return {
+            "max_loaded": self.max_loaded,
+            "idle_timeout_seconds": self.idle_timeout,
+            "models": models
+        }
+
+    def _load(self, entry: _ModelEntry) -> None:
+        """Load a model into its entry. The caller holds the entry lock."""
+        if entry.error:
+            raise ModelLoadError(f"Model '{entry.name}' failed to load: {entry.error}")
+
+        started = time.monotonic()
+        try:
+            entry.model = entry.loader()
+        except Exception as e:
+            entry.error = str(e)
+            raise ModelLoadError(f"Model '{entry.name}' failed to load: {e}") from e
+
+        entry.load_seconds = time.monotonic() - started
+        entry.loaded_at = entry.last_used = time.monotonic()
+        entry.load_count += 1
+
+    def _enforce_lru_limit(self, keep: str) -> None:
+        """Unload least recently used models until the loaded count fits the limit."""
+        if not self.max_loaded:
+            return
+
+        loaded = [e for e in list(self._entries.values()) if e.model is not None and e.name != keep]
+        excess = len(loaded) + 1 - self.max_loaded
+        if excess <= 0:
+            return
+
+        loaded.sort(key=lambda e: e.last_used or 0)
+        for entry in loaded[:excess]:
+            self.unload(entry.name)
+
+    def _ensure_sweeper(self) -> None:
+        """Start the idle-timeout sweeper thread once a model is loaded."""
+        if not self.idle_timeout or (self._sweeper is not None and self._sweeper.is_alive()):
+            return
+        with self._lock:
+            if self._sweeper is None or not self._sweeper.is_alive():
+                self._sweeper = threading.Thread(target=self._sweep, name="model-idle-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def _sweep(self) -> None:
+        """Periodically unload idle models."""
+        interval = max(1.0, min(self.idle_timeout / 2, 60.0))
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+
+def _load_bart():
+    """Load the zero-shot text classifier on the configured inference backend."""
+    from backend.detection.inference_backends import load_zero_shot_classifier
+
+    print(f"🔄 Loading Hugging Face zero-shot classifier ({TEXT_CLASSIFIER_BACKEND} backend)...")
+    classifier = load_zero_shot_classifier(TEXT_CLASSIFIER_BACKEND, TEXT_MODEL_NAME)
+    print("✅ Hugging Face model loaded successfully!")
+    return classifier
+
+def _load_clip():
+    """Load the CLIP model and its processor."""
+    from transformers import CLIPModel, CLIPProcessor
+
+    print("🔄 Loading CLIP model for cross-modal detection...")
+    model = CLIPModel.from_pretrained(CLIP_MODEL_NAME)
+    processor = CLIPProcessor.from_pretrained(CLIP_MODEL_NAME)
+    model.eval()
+    print("✅ CLIP model loaded successfully!")
+    return model, processor
+
+def _load_whisper():
+    """Load the Whisper speech-to-text model."""
+    import whisper
+
+    print("🔄 Loading Whisper model for audio transcription...")
+    model = whisper.load_model(WHISPER_MODEL_SIZE)
+    print("✅ Whisper model loaded successfully!")
+    return model
+
+def parse_model_names(value: str) -> List[str]:
+    """Split a comma-separated model list ("bart,clip,whisper")."""
+    return [name.strip().lower() for name in value.split(",") if name.strip()]
+
+# Global instance for reuse
+_registry_instance = None
+# The warm-up thread and the first request threads can ask for it at the same time
+_registry_lock = threading.Lock()
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the global model registry with the default models registered."""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                registry = ModelRegistry(
+                    max_loaded=MODEL_REGISTRY_MAX_LOADED,
+                    idle_timeout=MODEL_IDLE_TIMEOUT_SECONDS
+                )
+                registry.register("bart", _load_bart)
+                registry.register("clip", _load_clip)
+                registry.register("whisper", _load_whisper)
+                _registry_instance = registry
+    return _registry_instance
@@ -6,24 +6,52 @@ Now integrates with Hugging Face models for real misinformation detection.
 
 import random
 import datetime
-from typing import Dict
+import importlib.util
+import sys
+import threading
+from typing import Callable, Dict, List, Optional
+
+from backend.config import (
+    TEXT_MODEL_NAME, TEXT_CLASSIFIER_BACKEND, VERDICT_CACHE_SIZE, VERDICT_CACHE_TTL_SECONDS,
+    CASCADE_ENABLED, CASCADE_UNCERTAIN_LOW, CASCADE_UNCERTAIN_HIGH, WARMUP_POLICY
+)
+from backend.detection.model_registry import get_model_registry
+from backend.detection.prescreen import prescreen_text
+from backend.detection.verdict_cache import VerdictCache, make_cache_key
+from backend.metrics import timed
+from backend.startup import is_warming_up
 
 # Import the new Hugging Face detector
 try:
-    from backend.detection.huggingface_detector import analyze_text_with_huggingface
+    from backend.detection.huggingface_detector import (
+        analyze_text_with_huggingface, analyze_texts_with_huggingface, get_batching_stats, LABEL_SET_VERSION
+    )
     HUGGINGFACE_AVAILABLE = True
 except ImportError:
     HUGGINGFACE_AVAILABLE = False
     print("⚠️ Hugging Face detector not available. Using fallback analysis.")
 
-# Import cross-modal detector
-try:
-    from backend.detection.cross_modal_detector import CrossModalDetector
-    CROSS_MODAL_AVAILABLE = True
-except ImportError:
-    CROSS_MODAL_AVAILABLE = False
+# Cross-modal detection needs numpy, Pillow and torch; check for them without importing
+# them, so the heavy libraries are only loaded by the warm-up or the first cross-modal request
+CROSS_MODAL_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("numpy", "PIL", "torch"))
+if CROSS_MODAL_AVAILABLE:
+    from backend.detection.cross_modal_detector import get_cross_modal_detector
+else:
     print("⚠️ Cross-modal detector not available. Skipping cross-modal analysis.")
 
+# Shared verdict cache for repeated posts
+_verdict_cache = VerdictCache(max_size=VERDICT_CACHE_SIZE, ttl_seconds=VERDICT_CACHE_TTL_SECONDS)
+
+# Counts of which cascade stage decided each text verdict; updated from executor threads
+_cascade_stats = {"prescreen": 0, "zero_shot": 0, "fallback": 0, "warmup": 0}
+_cascade_lock = threading.Lock()
+
+def _count_decision(stage: str) -> None:
+    """Count a text verdict decided by a cascade stage."""
+    with _cascade_lock:
+        _cascade_stats[stage] += 1
+
+@timed("pipeline.analyze_post")
 def analyze_post(post: Dict) -> Dict:
     """
     Analyze a post and generate a trust score with reasoning.
@@ -37,53 +65,155 @@ def analyze_post(post: Dict) -> Dict:
     Returns:
         Dict: Analysis result with post_id, trust_score, reason, and timestamp
     """
+    return _analyze_posts([post], _classify_single_text)[0]
+
+@timed("pipeline.analyze_posts")
+def analyze_posts(posts: List[Dict]) -> List[Dict]:
+    """
+    Analyze several posts at once.
     
-    content = post.get("content", "")
-    content_type = post.get("content_type", "text")
+    Cache hits and confident pre-screen verdicts are resolved per post; all
+    remaining text posts go through the zero-shot model in one batched call.
+    
+    Args:
+        posts (List[Dict]): Post dictionaries containing id, content, content_type, etc.
+        
+    Returns:
+        List[Dict]: One analysis result per post, in input order
+    """
+    return _analyze_posts(posts, analyze_texts_with_huggingface)
+
+def _classify_single_text(texts: List[str]) -> List[Dict]:
+    """Classify a single text through the micro-batcher shared with other requests."""
+    return [analyze_text_with_huggingface(texts[0])]
+
+def _analyze_posts(posts: List[Dict], classify: Callable[[List[str]], List[Dict]]) -> List[Dict]:
+    """
+    Run posts through the verdict cache, the cascade and the text classifier.
+    
+    Args:
+        posts (List[Dict]): Posts to analyze
+        classify (Callable): Maps a list of texts to a list of zero-shot analyses
+        
+    Returns:
+        List[Dict]: One analysis result per post, in input order
+    """
+    results: List[Optional[Dict]] = [None] * len(posts)
+    pending = []  # (index, cache_key, pre-screen result) waiting for the model
+    warming_up = WARMUP_POLICY == "fallback" and is_warming_up("bart")
     
     # Use Hugging Face detector if available
-    if HUGGINGFACE_AVAILABLE and content_type == "text":
+    if HUGGINGFACE_AVAILABLE:
+        for index, post in enumerate(posts):
+            content = post.get("content", "")
+            if post.get("content_type", "text") != "text":
+                continue
+            
+            try:
+                # Reuse the verdict for identical content if we have seen it recently
+                cache_key = make_cache_key(content, f"{TEXT_MODEL_NAME}:{TEXT_CLASSIFIER_BACKEND}", LABEL_SET_VERSION)
+                analysis = _verdict_cache.get(cache_key)
+                if analysis is not None:
+                    results[index] = _build_text_result(post, analysis, cached=True)
+                    continue
+                
+                # Cascade: the cheap pre-screen decides on its own unless it is uncertain
+                screen = None
+                if CASCADE_ENABLED:
+                    screen = prescreen_text(content)
+                    probability = screen["misinformation_probability"]
+                    if not CASCADE_UNCERTAIN_LOW <= probability <= CASCADE_UNCERTAIN_HIGH:
+                        screen["decided_by"] = "prescreen"
+                        _count_decision("prescreen")
+                        results[index] = _build_text_result(post, screen, cached=False)
+                        continue
+                
+                # While the zero-shot model is still warming up, answer with the pre-screen verdict
+                if warming_up:
+                    screen = screen or prescreen_text(content)
+                    screen["decided_by"] = "warmup"
+                    _count_decision("warmup")
+                    results[index] = _build_text_result(post, screen, cached=False)
+                    continue
+                
+                pending.append((index, cache_key, screen))
+                
+            except Exception as e:
+                print(f"❌ Hugging Face analysis failed: {e}")
+    
+    if pending:
         try:
             # Analyze with Hugging Face model
-            analysis = analyze_text_with_huggingface(content)
-            
-            # Create result with Hugging Face analysis
-            result = {
-                "post_id": post["id"],
-                "trust_score": analysis["trust_score"],
-                "reason": analysis["reason"],
-                "classification": analysis["classification"],
-                "confidence": analysis["confidence"],
-                "timestamp": datetime.datetime.utcnow().isoformat() + "Z"
-            }
-            
-            return result
+            analyses = classify([posts[index].get("content", "") for index, _, _ in pending])
             
+            for (index, cache_key, screen), analysis in zip(pending, analyses):
+                analysis = dict(analysis)
+                analysis["decided_by"] = "fallback" if "fallback" in analysis.get("all_scores", {}) else "zero_shot"
+                if screen is not None:
+                    analysis["prescreen_probability"] = screen["misinformation_probability"]
+                _count_decision(analysis["decided_by"])
+                
+                # Only cache model verdicts; pre-screen and fallback results are cheap to recompute
+                if analysis["decided_by"] == "zero_shot":
+                    _verdict_cache.put(cache_key, analysis)
+                
+                results[index] = _build_text_result(posts[index], analysis, cached=False)
+                
         except Exception as e:
             print(f"❌ Hugging Face analysis failed: {e}")
             # Fall back to placeholder analysis
     
     # Fallback to placeholder analysis
-    trust_score = random.randint(0, 100)
-    reason = _generate_reason(post, trust_score)
+    for index, post in enumerate(posts):
+        if results[index] is None:
+            trust_score = random.randint(0, 100)
+            results[index] = {
+                "post_id": post["id"],
+                "trust_score": trust_score,
+                "reason": _generate_reason(post, trust_score),
+                "timestamp": datetime.datetime.utcnow().isoformat() + "Z"
+            }
     
+    return results
+
+def _build_text_result(post: Dict, analysis: Dict, cached: bool) -> Dict:
+    """
+    Create a pipeline result from a text analysis.
+    
+    Args:
+        post (Dict): The analyzed post
+        analysis (Dict): Analysis from the cache, the pre-screen or the model
+        cached (bool): Whether the analysis came from the verdict cache
+        
+    Returns:
+        Dict: Pipeline result with a fresh post_id and timestamp
+    """
     result = {
         "post_id": post["id"],
-        "trust_score": trust_score,
-        "reason": reason,
+        "trust_score": analysis["trust_score"],
+        "reason": analysis["reason"],
+        "classification": analysis["classification"],
+        "confidence": analysis["confidence"],
+        "all_scores": analysis.get("all_scores", {}),
+        "decided_by": analysis["decided_by"],
+        "cached": cached,
         "timestamp": datetime.datetime.utcnow().isoformat() + "Z"
     }
+    for key in ("prescreen_probability", "window_count", "padding_efficiency"):
+        if key in analysis:
+            result[key] = analysis[key]
     
     return result
 
-def analyze_post_with_cross_modal(post: Dict, image_path: str = None, audio_path: str = None) -> Dict:
+@timed("pipeline.analyze_post_with_cross_modal")
+def analyze_post_with_cross_modal(post: Dict, image=None, audio=None) -> Dict:
     """
     Analyze a post with cross-modal consistency detection.
     
     Args:
         post (Dict): Post dictionary containing id, content, content_type, etc.
-        image_path (str, optional): Path to image file for cross-modal analysis
-        audio_path (str, optional): Path to audio file for cross-modal analysis
+        image (str, bytes or MediaInput, optional): Image for cross-modal analysis
+        audio (str, bytes or MediaInput, optional): Audio for cross-modal analysis
         
     Returns:
         Dict: Analysis result with cross-modal consistency scores
@@ -92,14 +222,16 @@ def analyze_post_with_cross_modal(post: Dict, image_path: str = None, audio_path
     # First, get the basic analysis
     basic_result = analyze_post(post)
     
-    # Add cross-modal analysis if available
-    if CROSS_MODAL_AVAILABLE and (image_path or audio_path):
+    # Add cross-modal analysis if available (skipped while CLIP/Whisper are still warming up
+    # under the fallback policy)
+    warming_up = WARMUP_POLICY == "fallback" and is_warming_up("clip", "whisper")
+    if CROSS_MODAL_AVAILABLE and not warming_up and (image is not None or audio is not None):
         try:
-            cross_modal_detector = CrossModalDetector()
+            cross_modal_detector = get_cross_modal_detector()
             cross_modal_result = cross_modal_detector.analyze(
                 text=post.get("content", ""),
-                image_path=image_path,
-                audio_path=audio_path
+                image=image,
+                audio=audio
             )
             
             # Combine results
@@ -122,6 +254,96 @@ def analyze_post_with_cross_modal(post: Dict, image_path: str = None, audio_path
     
     return basic_result
 
+def get_model_status() -> Dict:
+    """
+    Get the load state of the shared BART, CLIP and Whisper models.
+    
+    Returns:
+        Dict: Model registry status, with the configured and the actually loaded text backend
+              (and 'text_classifier_backend_error' if the configured one is not supported)
+    """
+    from backend.detection.inference_backends import resolve_backend
+
+    status = get_model_registry().get_status()
+    status["text_classifier_backend"] = TEXT_CLASSIFIER_BACKEND
+    try:
+        status["text_classifier_backend_resolved"] = resolve_backend(TEXT_CLASSIFIER_BACKEND, warn=False)
+    except ValueError as e:
+        # A misconfigured backend is reported here rather than failing /status and /metrics
+        status["text_classifier_backend_resolved"] = None
+        status["text_classifier_backend_error"] = str(e)
+    return status
+
+def get_verdict_cache_stats() -> Dict:
+    """
+    Get hit, miss and eviction counts of the verdict cache.
+    
+    Returns:
+        Dict: Verdict cache statistics
+    """
+    return _verdict_cache.get_stats()
+
+def get_cascade_stats() -> Dict:
+    """
+    Get how many text verdicts each cascade stage decided.
+    
+    Returns:
+        Dict: Cascade configuration and per-stage decision counts
+    """
+    with _cascade_lock:
+        decided_by = dict(_cascade_stats)
+    decided = sum(decided_by.values())
+    return {
+        "enabled": CASCADE_ENABLED,
+        "uncertainty_band": [CASCADE_UNCERTAIN_LOW, CASCADE_UNCERTAIN_HIGH],
+        "decided_by": decided_by,
+        "prescreen_ratio": round(decided_by["prescreen"] / decided, 3) if decided else 0.0
+    }
+
+def get_embedding_cache_stats() -> Dict:
+    """
+    Get hit and miss counts of the CLIP embedding caches.
+    
+    Returns:
+        Dict: Embedding cache statistics (empty when cross-modal detection is not available)
+    """
+    if not CROSS_MODAL_AVAILABLE:
+        return {}
+    from backend.detection.embedding_engine import get_embedding_engine
+    
+    return get_embedding_engine().get_stats()
+
+def get_transcription_stats() -> Dict:
+    """
+    Get transcript cache and transcription pool statistics.
+    
+    Returns:
+        Dict: Transcription statistics (empty when cross-modal detection is not available)
+    """
+    if not CROSS_MODAL_AVAILABLE:
+        return {}
+    from backend.detection.transcription import get_transcriber
+    
+    return get_transcriber().get_stats()
+
+def shutdown_detection_workers() -> None:
+    """Stop background worker processes started by the detectors."""
+    # Nothing to stop if the transcriber was never imported
+    transcription = sys.modules.get("backend.detection.transcription")
+    if transcription is not None:
+        transcription.shutdown_transcriber()
+
+def get_text_batching_stats() -> Dict:
+    """
+    Get fill statistics for the micro-batched text classifier.
+    
+    Returns:
+        Dict: Batch statistics (empty when Hugging Face is not available)
+    """
+    if not HUGGINGFACE_AVAILABLE:
+        return {}
+    return get_batching_stats()
+
 def _calculate_combined_trust_score(text_trust: int, cross_modal_trust: int) -> int:
     """
     Calculate combined trust score from text analysis and cross-modal analysis.
@@ -0,0 +1,326 @@
+# detection/transcription.py
+"""
+Whisper transcription service with a persistent transcript cache.
+Transcripts are keyed by the SHA-256 of the audio content and stored in a
+local SQLite file, so re-posted clips are never transcribed twice. Fresh
+transcriptions run in a dedicated process pool so long clips cannot starve
+text analysis of CPU time in the server process. Audio can be given as a
+file path or as raw bytes; bytes are decoded through an ffmpeg pipe straight
+into the float32 array Whisper expects, without touching the disk.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from backend.config import (
+    WHISPER_MODEL_SIZE, TRANSCRIPT_CACHE_PATH, TRANSCRIPTION_WORKERS, TRANSCRIPTION_TIMEOUT_SECONDS,
+    MEDIA_AUDIO_MAX_SECONDS
+)
+from backend.metrics import timed
+
+class TranscriptCache:
+    """
+    Transcript store keyed by audio content hash, persisted in SQLite.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the transcript cache.
+
+        Args:
+            path (str): SQLite database file path
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            " audio_hash TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " text TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (audio_hash, model))"
+        )
+        self._conn.commit()
+
+    def get(self, audio_hash: str, model: str) -> Optional[str]:
+        """Return the cached transcript for an audio hash and model, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM transcripts WHERE audio_hash = ? AND model = ?",
+                (audio_hash, model)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, audio_hash: str, model: str, text: str) -> None:
+        """Store a transcript."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (audio_hash, model, text, created_at) VALUES (?, ?, ?, ?)",
+                (audio_hash, model, text, time.time())
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        """Return the number of stored transcripts."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+
+# Whisper works on 16 kHz mono audio
+WHISPER_SAMPLE_RATE = 16000
+
+@timed("cross_modal.audio_decode")
+def decode_audio(data: bytes, sample_rate: int = WHISPER_SAMPLE_RATE,
+                 max_seconds: Optional[float] = MEDIA_AUDIO_MAX_SECONDS) -> np.ndarray:
+    """
+    Decode an encoded audio file (mp3, wav, ogg, ...) from memory into a mono
+    float32 waveform in [-1, 1], piping the bytes through ffmpeg. Decoding
+    stops after `max_seconds`, which bounds the work for formats whose
+    duration cannot be checked from the header at upload time.
+
+    Args:
+        data (bytes): Encoded audio file contents
+        sample_rate (int): Output sample rate
+        max_seconds (float, optional): Decode at most this much audio (None = all)
+
+    Returns:
+        np.ndarray: 1-D float32 samples
+
+    Raises:
+        RuntimeError: If ffmpeg is missing or cannot decode the audio
+    """
+    command = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "pipe:1"
+    ]
+    if max_seconds:
+        command[-1:-1] = ["-t", str(max_seconds)]
+    try:
+        completed = subprocess.run(command, input=data, capture_output=True, check=True)
+    except FileNotFoundError as e:
+        raise RuntimeError("ffmpeg is required to decode audio") from e
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='replace')[-500:]}") from e
+    return np.frombuffer(completed.stdout, np.int16).astype(np.float32) / 32768.0
+
+def _whisper_input(audio: Union[str, bytes]):
+    """Whisper takes a path as-is; in-memory audio is decoded to a waveform first."""
+    return decode_audio(audio) if isinstance(audio, (bytes, bytearray, memoryview)) else audio
+
+# Whisper model loaded once per pool worker process
+_worker_model = None
+
+def _init_worker(model_size: str) -> None:
+    """Load Whisper once in each transcription worker process."""
+    global _worker_model
+    import whisper
+
+    _worker_model = whisper.load_model(model_size)
+
+def _transcribe_in_worker(audio: Union[str, bytes]) -> str:
+    """Transcribe an audio file path or in-memory audio inside a pool worker."""
+    return _worker_model.transcribe(_whisper_input(audio))["text"].strip()
+
+# Serializes decodes on the server process's shared Whisper model: the decoder
+# installs kv-cache hooks on the model, so concurrent calls corrupt each other
+_in_process_lock = threading.Lock()
+
+def _transcribe_in_process(audio: Union[str, bytes]) -> str:
+    """Transcribe on the registry's Whisper model, one clip at a time."""
+    from backend.detection.model_registry import get_model_registry
+
+    model = get_model_registry().get("whisper")
+    samples = _whisper_input(audio)
+    with _in_process_lock:
+        return model.transcribe(samples)["text"].strip()
+
+class Transcriber:
+    """
+    Cached Whisper transcription, run in a process pool or in-process.
+    """
+
+    def __init__(self, cache: TranscriptCache, workers: int = 1, model_size: str = WHISPER_MODEL_SIZE,
+                 timeout: float = 300):
+        """
+        Initialize the transcriber.
+
+        Args:
+            cache (TranscriptCache): Persistent transcript cache
+            workers (int): Transcription worker processes (0 = transcribe in the server process)
+            model_size (str): Whisper model size
+            timeout (float): Maximum seconds to wait for one transcription
+        """
+        self.cache = cache
+        self.workers = max(0, workers)
+        self.model_size = model_size
+        self.timeout = timeout
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._hits = 0
+        self._misses = 0
+        self._shared = 0
+
+    @timed("cross_modal.transcribe")
+    def transcribe(self, audio: Union[str, bytes], audio_hash: Optional[str] = None) -> str:
+        """
+        Transcribe audio, reusing a cached transcript when available.
+        Concurrent requests for the same clip share a single transcription.
+
+        Args:
+            audio (str or bytes): Path to the audio file, or the encoded file contents
+            audio_hash (str, optional): Precomputed SHA-256 of the file contents
+
+        Returns:
+            str: The transcript text
+        """
+        if audio_hash is None:
+            audio_hash = hashlib.sha256(audio).hexdigest() if isinstance(audio, bytes) else _hash_file(audio)
+
+        cached = self.cache.get(audio_hash, self.model_size)
+        if cached is not None:
+            with self._lock:
+                self._hits += 1
+            return cached
+
+        with self._lock:
+            future = self._in_flight.get(audio_hash)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[audio_hash] = future
+                self._misses += 1
+            else:
+                self._shared += 1
+
+        if not owner:
+            return future.result(timeout=self.timeout)
+
+        try:
+            text = self._run(audio)
+            self.cache.put(audio_hash, self.model_size, text)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(audio_hash, None)
+
+    def get_stats(self) -> Dict:
+        """Get transcript cache and pool statistics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "workers": self.workers,
+                "model": self.model_size,
+                "cached_transcripts": self.cache.count(),
+                "hits": self._hits,
+                "misses": self._misses,
+                "shared_in_flight": self._shared,
+                "in_flight": len(self._in_flight),
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @timed("cross_modal.whisper")
+    def _run(self, audio: Union[str, bytes]) -> str:
+        """
+        Transcribe in the worker pool, or in-process when no workers are configured
+        (serialized, since the in-process model is shared by every thread).
+        In-memory audio is sent to the worker still encoded, which is far
+        smaller than the waveform.
+        """
+        if not self.workers:
+            return _transcribe_in_process(audio)
+
+        return self._get_pool().submit(_transcribe_in_worker, audio).result(timeout=self.timeout)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Start the worker pool on first use. Workers are spawned, not forked, to stay clear of torch threads."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_size,)
+                )
+            return self._pool
+
+def _hash_file(path: str) -> str:
+    """Compute the SHA-256 of a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Global instance for reuse; first created from concurrent executor threads
+_transcriber_instance = None
+_transcriber_lock = threading.Lock()
+
+# Worker processes for the global transcriber; -1 is resolved by the prefork
+# server (in-process) or on first use (one worker)
+_transcription_workers = TRANSCRIPTION_WORKERS
+
+def configure_transcription_workers(workers: int) -> None:
+    """Set the worker processes used when the global transcriber is created."""
+    global _transcription_workers
+    _transcription_workers = workers
+
+def transcription_workers() -> int:
+    """Worker processes the global transcriber uses (one unless configured)."""
+    return 1 if _transcription_workers < 0 else _transcription_workers
+
+def get_transcriber() -> Transcriber:
+    """Get or create the global transcriber."""
+    global _transcriber_instance
+    if _transcriber_instance is None:
+        with _transcriber_lock:
+            if _transcriber_instance is None:
+                _transcriber_instance = Transcriber(
+                    TranscriptCache(TRANSCRIPT_CACHE_PATH),
+                    workers=transcription_workers(),
+                    model_size=WHISPER_MODEL_SIZE,
+                    timeout=TRANSCRIPTION_TIMEOUT_SECONDS
+                )
+    return _transcriber_instance
+
+def shutdown_transcriber() -> None:
+    """Stop the global transcriber's worker processes, if any were started."""
+    if _transcriber_instance is not None:
+        _transcriber_instance.shutdown()
+
+def _reset_after_fork() -> None:
+    """
+    Drop the parent's transcriber in a forked worker: its cache connection and
+    worker pool belong to the parent. A new one is created on first use.
+    """
+    global _transcriber_instance, _transcriber_lock
+    _transcriber_instance, _transcriber_lock = None, threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
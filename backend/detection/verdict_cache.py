@@ -0,0 +1,149 @@
+# detection/verdict_cache.py
+"""
+Content-hash verdict cache for the detection pipeline.
+Identical or near-identical posts (same text after normalization) reuse the
+previous classification instead of running zero-shot inference again.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text so trivially different copies of a post hash the same.
+    Applies Unicode NFKC, case folding and whitespace collapsing.
+
+    Args:
+        text (str): Raw post content
+
+    Returns:
+        str: Normalized text
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+def make_cache_key(text: str, model_name: str, label_version: str) -> str:
+    """
+    Build a cache key from the normalized text, model and label-set version.
+
+    Args:
+        text (str): Raw post content
+        model_name (str): Name of the classification model
+        label_version (str): Version identifier of the candidate label set
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(label_version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+class VerdictCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of cached verdicts (0 disables caching)
+            ttl_seconds (float): Seconds a verdict stays valid (0 = no expiry)
+        """
+        self.max_size = max(0, max_size)
+        self.ttl = max(0.0, ttl_seconds)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached verdict.
+
+        Args:
+            key (str): Cache key from make_cache_key()
+
+        Returns:
+            Dict or None: A copy of the cached verdict, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            stored_at, verdict = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return dict(verdict)
+
+    def put(self, key: str, verdict: Dict) -> None:
+        """
+        Store a verdict, evicting the least recently used entry if full.
+
+        Args:
+            key (str): Cache key from make_cache_key()
+            verdict (Dict): Analysis result to cache
+        """
+        if not self.max_size:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(verdict))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> int:
+        """
+        Remove all cached verdicts.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            cleared = len(self._entries)
+            self._entries.clear()
+            return cleared
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache hit, miss and eviction counts.
+
+        Returns:
+            Dict: Cache statistics
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,217 @@
+# backend/executor.py
+"""
+Executor-backed inference layer.
+Runs blocking model calls (BART, CLIP, Whisper) on a bounded thread pool so
+the FastAPI event loop stays free for health and log endpoints.
+
+A call holds one of the concurrency slots while it runs. Calls that hand
+their model work to a shared worker (the text micro-batcher) give the slot
+back with release_inference_slot() while they wait, so the slot limit does
+not cap how many texts can join a batch. Such calls still occupy a pool
+thread, so calls queued behind busy threads count towards the queue limit
+just like calls waiting for a slot: overload is refused, not buffered.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from backend.config import INFERENCE_WORKERS, INFERENCE_MAX_CONCURRENCY, INFERENCE_MAX_QUEUE
+from backend.metrics import observe_stage
+
+class InferenceOverloaded(Exception):
+    """Raised when too many inference calls are already waiting for a slot."""
+
+class _Slot:
+    """A running call's concurrency slot, released once by whichever side gets there first."""
+
+    __slots__ = ("executor", "loop", "released")
+
+    def __init__(self, executor: "InferenceExecutor", loop: asyncio.AbstractEventLoop):
+        self.executor = executor
+        self.loop = loop
+        self.released = False
+
+    def release(self) -> None:
+        """Return the slot; safe to call from the pool thread or the event loop, and more than once."""
+        executor = self.executor
+        with executor._lock:
+            if self.released:
+                return
+            self.released = True
+            executor._active -= 1
+        self.loop.call_soon_threadsafe(executor._semaphore.release)
+
+# The slot held by the call running in this context, if any
+_current_slot: contextvars.ContextVar[Optional[_Slot]] = contextvars.ContextVar("inference_slot", default=None)
+
+class InferenceExecutor:
+    """
+    Bounded thread pool with a fixed concurrency limit for blocking inference calls.
+    """
+
+    def __init__(self, max_workers: int = 4, max_concurrency: int = 4, max_queue: int = 64):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers (int): Number of threads in the pool
+            max_concurrency (int): Maximum number of inference calls running at once
+            max_queue (int): Maximum number of calls waiting for a slot or a free pool thread (0 = unbounded)
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_concurrency = max(1, min(max_concurrency, self.max_workers))
+        self.max_queue = max(0, max_queue)
+
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._active = 0
+        self._in_pool = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking function on the pool once a concurrency slot is free.
+
+        Args:
+            func (Callable): Blocking function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            Any: The function's return value
+
+        Raises:
+            InferenceOverloaded: If the wait queue is already full
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        with self._lock:
+            # Calls that released their slot early still hold a thread; anything beyond
+            # the pool size sits in the pool's own queue and counts as waiting too
+            queued = self._waiting + max(0, self._in_pool - self.max_workers)
+            saturated = self._semaphore.locked() or self._in_pool >= self.max_workers
+            if self.max_queue and queued >= self.max_queue and saturated:
+                self._rejected += 1
+                raise InferenceOverloaded(f"Inference queue is full ({queued} waiting)")
+            self._waiting += 1
+
+        try:
+            with observe_stage("inference.queue_wait"):
+                await self._semaphore.acquire()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        with self._lock:
+            self._active += 1
+            self._in_pool += 1
+        slot = _Slot(self, asyncio.get_running_loop())
+        # Run in a copy of the caller's context so the request's trace follows it into
+        # the pool, and so the function can release its slot early
+        context = contextvars.copy_context()
+        context.run(_current_slot.set, slot)
+        try:
+            future = self._pool.submit(functools.partial(context.run, func, *args, **kwargs))
+        except BaseException:
+            with self._lock:
+                self._in_pool -= 1
+            slot.release()
+            raise
+        # The slot is returned when the pool thread finishes, not when the caller stops
+        # waiting: a cancelled request's model call keeps running and keeps its slot
+        future.add_done_callback(lambda _: self._finish(slot))
+        return await asyncio.wrap_future(future)
+
+    def _finish(self, slot: _Slot) -> None:
+        """Count a finished call and return its slot (if it did not release it early)."""
+        with self._lock:
+            self._completed += 1
+            self._in_pool -= 1
+        slot.release()
+
+    def get_stats(self) -> Dict:
+        """
+        Get current load of the inference pool. Calls that released their
+        slot early are no longer counted as active.
+
+        Returns:
+            Dict: Worker count, concurrency limit, active and waiting calls, and
+                  calls queued in the pool behind busy threads
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "waiting": self._waiting,
+                "queued_in_pool": max(0, self._in_pool - self.max_workers),
+                "completed": self._completed,
+                "rejected": self._rejected
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the thread pool."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+# Global instance for reuse
+_executor_instance = None
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get or create the global inference executor."""
+    global _executor_instance
+    if _executor_instance is None:
+        _executor_instance = InferenceExecutor(
+            max_workers=INFERENCE_WORKERS,
+            max_concurrency=INFERENCE_MAX_CONCURRENCY,
+            max_queue=INFERENCE_MAX_QUEUE
+        )
+    return _executor_instance
+
+def release_inference_slot() -> None:
+    """
+    Give up the calling inference call's concurrency slot, e.g. before blocking
+    on a shared batch worker that bounds model work itself. The call keeps
+    its pool thread. Does nothing outside an executor call.
+    """
+    slot = _current_slot.get()
+    if slot is not None:
+        slot.release()
+
+async def run_inference(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking inference call off the event loop.
+
+    Args:
+        func (Callable): Blocking function to run
+        *args: Positional arguments for the function
+        **kwargs: Keyword arguments for the function
+
+    Returns:
+        Any: The function's return value
+    """
+    return await get_inference_executor().run(func, *args, **kwargs)
+
+def _reset_after_fork() -> None:
+    """Drop the parent's thread pool in a forked worker; its threads do not survive the fork."""
+    global _executor_instance
+    _executor_instance = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def shutdown_inference_executor(wait: bool = True) -> None:
+    """Shut down the global inference executor, if it was created."""
+    global _executor_instance
+    if _executor_instance is not None:
+        _executor_instance.shutdown(wait=wait)
+        _executor_instance = None
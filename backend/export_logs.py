@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Export the detection log history to columnar files for offline analysis.
+Runs incrementally: each run only exports records added since the last one.
+"""
+
+import argparse
+import json
+import sys
+import os
+
+# Add the repository root to Python path so `backend.` imports resolve from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def main():
+    """Export new detection records from the log store."""
+    from backend.config import LOG_STORE_PATH
+    from backend.logs.export import EXPORT_FORMATS, export_detections
+    from backend.logs.store import DetectionLogStore
+
+    parser = argparse.ArgumentParser(description="Export detection logs to day-partitioned Parquet or Arrow files.")
+    parser.add_argument("--db", default=LOG_STORE_PATH, help="Detection log store (SQLite) path")
+    parser.add_argument("--out", default="data/exports", help="Export directory")
+    parser.add_argument("--format", default="parquet", choices=list(EXPORT_FORMATS), help="Output file format")
+    parser.add_argument("--since-seq", type=int, default=None,
+                        help="Export records after this store seq instead of the stored watermark")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Records written per file chunk")
+    parser.add_argument("--compression", default="zstd", help="Compression codec (zstd, snappy, lz4, none)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Log store not found: {args.db}")
+        sys.exit(1)
+
+    store = DetectionLogStore(args.db, flush_interval=0)
+    try:
+        print(f"📦 Exporting detection logs from {args.db} to {args.out} ({args.format})")
+        result = export_detections(
+            store,
+            args.out,
+            file_format=args.format,
+            since_seq=args.since_seq,
+            chunk_size=args.chunk_size,
+            compression=args.compression
+        )
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        store.close()
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# backend/id_allocator.py
+"""
+Central ID allocation for posts and log entries.
+Each process reserves blocks of IDs from a counter row in a small SQLite
+file, so IDs are unique across threads, worker processes and restarts, and
+handing out an ID is a lock plus an integer increment almost all of the
+time. IDs increase monotonically within a process; across processes they are
+unique but interleave by block, so they must not be read as time order: the
+log store pages and exports by its own commit sequence, and log IDs only
+identify entries. They stay small integers, safe for JSON and JavaScript
+clients.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from backend.config import ID_ALLOCATOR_PATH, ID_BLOCK_SIZE
+
+class BlockIdAllocator:
+    """
+    Hands out IDs from a locally reserved block, reserving the next block when it runs out.
+    """
+
+    def __init__(self, name: str, path: str, block_size: int = 1000):
+        """
+        Initialize the allocator. No block is reserved until the first ID is requested.
+
+        Args:
+            name (str): Sequence name (one counter row per name)
+            path (str): SQLite database file shared by all processes
+            block_size (int): IDs reserved per database round trip
+        """
+        self.name = name
+        self.path = path
+        self.block_size = max(1, block_size)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._next = 0
+        self._limit = 0   # exclusive end of the reserved block
+        self._blocks_reserved = 0
+
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS id_sequences (name TEXT PRIMARY KEY, next_id INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO id_sequences (name, next_id) VALUES (?, 1)", (name,))
+
+    def next_id(self) -> int:
+        """Return a new unique ID."""
+        with self._lock:
+            if self._next >= self._limit:
+                self._reserve(self.block_size)
+            value = self._next
+            self._next += 1
+            return value
+
+    def next_ids(self, count: int) -> List[int]:
+        """
+        Return `count` new unique IDs, in increasing order.
+
+        Args:
+            count (int): Number of IDs
+
+        Returns:
+            List[int]: The IDs
+        """
+        ids: List[int] = []
+        with self._lock:
+            while len(ids) < count:
+                if self._next >= self._limit:
+                    self._reserve(max(self.block_size, count - len(ids)))
+                take = min(count - len(ids), self._limit - self._next)
+                ids.extend(range(self._next, self._next + take))
+                self._next += take
+        return ids
+
+    def advance_to(self, minimum: int) -> None:
+        """
+        Make sure no ID below `minimum` is handed out from now on, e.g. to
+        continue after IDs that already exist in a store.
+
+        Args:
+            minimum (int): Smallest acceptable next ID
+        """
+        with self._lock:
+            with self._connect() as conn:
+                conn.execute("UPDATE id_sequences SET next_id = MAX(next_id, ?) WHERE name = ?", (minimum, self.name))
+            if self._next < minimum:
+                # Drop the rest of the local block; the next call reserves above the minimum
+                self._next = self._limit = 0
+
+    def get_stats(self) -> Dict:
+        """Get the local block position and how many blocks were reserved."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "block_size": self.block_size,
+                "next_local_id": self._next if self._next < self._limit else None,
+                "remaining_in_block": max(0, self._limit - self._next),
+                "blocks_reserved": self._blocks_reserved
+            }
+
+    def _reset_after_fork(self) -> None:
+        """Forget the local block in a forked child, so parent and child never hand out the same IDs."""
+        self._lock = threading.Lock()
+        self._next = self._limit = 0
+
+    def _reserve(self, size: int) -> None:
+        """Atomically take the next `size` IDs from the shared counter. Caller holds the lock."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            start = conn.execute("SELECT next_id FROM id_sequences WHERE name = ?", (self.name,)).fetchone()[0]
+            conn.execute("UPDATE id_sequences SET next_id = ? WHERE name = ?", (start + size, self.name))
+        self._next, self._limit = start, start + size
+        self._blocks_reserved += 1
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived connection; reservations are rare, so none is kept open."""
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        return _ClosingConnection(conn)
+
+class _ClosingConnection:
+    """Context manager that commits (or rolls back) an explicit transaction and closes the connection."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def execute(self, *args):
+        return self.conn.execute(*args)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+
+# One allocator per sequence name
+_allocators: Dict[str, BlockIdAllocator] = {}
+_allocators_lock = threading.Lock()
+
+def get_id_allocator(name: str) -> BlockIdAllocator:
+    """Get or create the allocator for a sequence (e.g. "post", "log_entry")."""
+    allocator = _allocators.get(name)
+    if allocator is None:
+        with _allocators_lock:
+            allocator = _allocators.get(name)
+            if allocator is None:
+                allocator = BlockIdAllocator(name, ID_ALLOCATOR_PATH, ID_BLOCK_SIZE)
+                _allocators[name] = allocator
+    return allocator
+
+def next_post_id() -> int:
+    """Allocate a post ID."""
+    return get_id_allocator("post").next_id()
+
+def next_post_ids(count: int) -> List[int]:
+    """Allocate `count` post IDs."""
+    return get_id_allocator("post").next_ids(count)
+
+def get_id_allocator_stats() -> Dict[str, Optional[Dict]]:
+    """Get statistics for every allocator created so far."""
+    with _allocators_lock:
+        allocators = list(_allocators.values())
+    return {allocator.name: allocator.get_stats() for allocator in allocators}
+
+def _reset_after_fork() -> None:
+    """Give a forked worker fresh locks and no reserved blocks."""
+    global _allocators_lock
+    _allocators_lock = threading.Lock()
+    for allocator in _allocators.values():
+        allocator._reset_after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
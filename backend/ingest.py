@@ -0,0 +1,142 @@
+# backend/ingest.py
+"""
+Incremental parsing of bulk upload bodies for /analyze/batch.
+Accepts either a JSON array or NDJSON (one JSON value per line) and yields
+posts one at a time, so memory stays flat regardless of upload size.
+"""
+
+import codecs
+import json
+from typing import AsyncIterator, Dict, List
+
+from backend.config import BULK_MAX_ITEM_BYTES
+
+class IngestError(ValueError):
+    """Raised when a bulk upload body cannot be parsed."""
+
+async def iter_bulk_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[object]:
+    """
+    Yield JSON values from a JSON-array or NDJSON body as they arrive.
+    The format is detected from the first non-whitespace character.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Raw request body chunks
+
+    Yields:
+        object: Each decoded array element or NDJSON line
+
+    Raises:
+        IngestError: On malformed input or an item larger than BULK_MAX_ITEM_BYTES
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    json_decoder = json.JSONDecoder()
+    buffer = ""
+    mode = None  # "array" or "ndjson"
+    array_closed = False
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+
+        if mode is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                buffer = ""
+                continue
+            if stripped[0] == "[":
+                mode = "array"
+                buffer = stripped[1:]
+            else:
+                mode = "ndjson"
+                buffer = stripped
+
+        if mode == "ndjson":
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                item = _decode_line(line)
+                if item is not None:
+                    yield item
+        elif not array_closed:
+            items, buffer, array_closed = _drain_array(buffer, json_decoder)
+            for item in items:
+                yield item
+
+        if len(buffer) > BULK_MAX_ITEM_BYTES:
+            raise IngestError(f"Item exceeds the {BULK_MAX_ITEM_BYTES} byte limit")
+
+    buffer += decoder.decode(b"", final=True)
+
+    if mode == "ndjson":
+        item = _decode_line(buffer)
+        if item is not None:
+            yield item
+    elif mode == "array" and not array_closed:
+        items, buffer, array_closed = _drain_array(buffer, json_decoder)
+        for item in items:
+            yield item
+        if not array_closed:
+            raise IngestError("JSON array is not terminated")
+
+def _decode_line(line: str):
+    """Decode one NDJSON line, skipping blank lines."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise IngestError(f"Invalid NDJSON line: {e}") from e
+
+def _drain_array(buffer: str, json_decoder: json.JSONDecoder):
+    """
+    Decode every complete element at the front of a JSON-array buffer.
+
+    Returns:
+        tuple: (decoded items, unconsumed buffer, whether the closing bracket was seen)
+    """
+    items: List[object] = []
+    pos = 0
+
+    while True:
+        # Skip whitespace and the separator between elements
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            return items, "", False
+        if buffer[pos] == "]":
+            return items, "", True
+
+        try:
+            item, pos = json_decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Element is incomplete; wait for more data
+            return items, buffer[pos:], False
+        items.append(item)
+
+def item_to_post_fields(item: object) -> Dict:
+    """
+    Normalize one bulk item into post fields.
+    Items may be a bare string or an object with 'content' and optional
+    'content_type' and 'id' (returned as 'external_id').
+
+    Args:
+        item (object): Decoded JSON value
+
+    Returns:
+        Dict: 'content', 'content_type' and optionally 'external_id'
+
+    Raises:
+        IngestError: If the item has no text content
+    """
+    if isinstance(item, str):
+        return {"content": item, "content_type": "text"}
+
+    if isinstance(item, dict) and isinstance(item.get("content"), str):
+        fields = {
+            "content": item["content"],
+            "content_type": item.get("content_type", "text")
+        }
+        if "id" in item:
+            fields["external_id"] = item["id"]
+        return fields
+
+    raise IngestError("Each item must be a string or an object with a 'content' string")
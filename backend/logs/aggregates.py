@@ -0,0 +1,176 @@
+# logs/aggregates.py
+"""
+Streaming trust-score aggregates over sliding time windows.
+Each window is a ring of time slots, and each slot holds a fixed 101-bin
+trust-score histogram plus per-classification counts. Recording a detection
+touches one slot per window, and reading a window merges its slots, so
+p50/p95, classification rates and detections per minute never need the raw
+log records. Until the process has been up for a full window, rates are taken
+over the uptime rather than the window length.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from backend.logs.score_index import MAX_SCORE, clamp_score
+
+# Window name -> (slot length in seconds, number of slots)
+WINDOWS = {
+    "1m": (5, 12),
+    "15m": (60, 15),
+    "24h": (900, 96)
+}
+
+QUANTILES = {"p50": 0.50, "p95": 0.95}
+
+class _Slot:
+    """Histogram and classification counts for one time slot."""
+
+    __slots__ = ("epoch", "histogram", "classifications", "count")
+
+    def __init__(self):
+        self.epoch = -1
+        self.histogram = [0] * (MAX_SCORE + 1)
+        self.classifications: Counter = Counter()
+        self.count = 0
+
+    def reset(self, epoch: int) -> None:
+        self.epoch = epoch
+        self.histogram = [0] * (MAX_SCORE + 1)
+        self.classifications = Counter()
+        self.count = 0
+
+class RotatingHistogram:
+    """
+    Ring of time slots covering `slot_seconds * slots` seconds.
+    Stale slots are reset lazily when their position comes round again.
+    """
+
+    def __init__(self, slot_seconds: int, slots: int):
+        self.slot_seconds = slot_seconds
+        self.slots = [_Slot() for _ in range(slots)]
+
+    @property
+    def window_seconds(self) -> int:
+        return self.slot_seconds * len(self.slots)
+
+    def add(self, score: int, classification: str, now: float) -> None:
+        epoch = int(now // self.slot_seconds)
+        slot = self.slots[epoch % len(self.slots)]
+        if slot.epoch != epoch:
+            slot.reset(epoch)
+        slot.histogram[score] += 1
+        slot.classifications[classification] += 1
+        slot.count += 1
+
+    def live_slots(self, now: float) -> List[_Slot]:
+        """Return the slots that fall inside the window ending now."""
+        current = int(now // self.slot_seconds)
+        return [slot for slot in self.slots if 0 <= current - slot.epoch < len(self.slots)]
+
+def histogram_quantile(histogram: List[int], total: int, q: float) -> Optional[int]:
+    """
+    Return the smallest score whose cumulative count reaches q of the total.
+
+    Args:
+        histogram (List[int]): Count per score 0-100
+        total (int): Sum of the histogram
+        q (float): Quantile between 0 and 1
+
+    Returns:
+        int or None: The quantile score, or None if the histogram is empty
+    """
+    if not total:
+        return None
+    target = max(1, q * total)
+    running = 0
+    for score, count in enumerate(histogram):
+        running += count
+        if running >= target:
+            return score
+    return MAX_SCORE
+
+def _describe(histogram: List[int], classifications: Counter, count: int, seconds: Optional[float]) -> Dict:
+    """Summarize a merged histogram into the /stats format."""
+    stats = {
+        "count": count,
+        "avg_trust_score": round(sum(score * n for score, n in enumerate(histogram)) / count, 1) if count else None,
+        **{name: histogram_quantile(histogram, count, q) for name, q in QUANTILES.items()},
+        "classification_rates": {
+            label: round(n / count, 4) for label, n in classifications.most_common()
+        } if count else {}
+    }
+    if seconds:
+        stats["detections_per_minute"] = round(count / (seconds / 60), 3)
+    return stats
+
+class TrustAggregator:
+    """
+    Thread-safe streaming aggregates over the 1m, 15m and 24h windows plus all time.
+    """
+
+    def __init__(self, windows: Dict = WINDOWS, started_at: Optional[float] = None):
+        """
+        Initialize the aggregator.
+
+        Args:
+            windows (Dict): Window name -> (slot seconds, slot count)
+            started_at (float, optional): Start of recording as a Unix timestamp (default: current time)
+        """
+        self._windows = {name: RotatingHistogram(*spec) for name, spec in windows.items()}
+        self._lock = threading.Lock()
+        self._histogram = [0] * (MAX_SCORE + 1)
+        self._classifications: Counter = Counter()
+        self._count = 0
+        self._started_at = time.time() if started_at is None else started_at
+
+    def record(self, trust_score, classification: Optional[str] = None, now: Optional[float] = None) -> None:
+        """
+        Add one detection.
+
+        Args:
+            trust_score: Trust score (clamped to 0-100)
+            classification (str, optional): Detection classification
+            now (float, optional): Detection time as a Unix timestamp (default: current time)
+        """
+        score = clamp_score(trust_score)
+        label = classification or "unknown"
+        now = time.time() if now is None else now
+
+        with self._lock:
+            for window in self._windows.values():
+                window.add(score, label, now)
+            self._histogram[score] += 1
+            self._classifications[label] += 1
+            self._count += 1
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        """
+        Read the aggregates for every window.
+
+        Args:
+            now (float, optional): Window end as a Unix timestamp (default: current time)
+
+        Returns:
+            Dict: 'windows' (per window name) and 'all_time' statistics
+        """
+        now = time.time() if now is None else now
+        uptime = max(now - self._started_at, 1.0)
+        windows = {}
+
+        with self._lock:
+            for name, window in self._windows.items():
+                histogram = [0] * (MAX_SCORE + 1)
+                classifications: Counter = Counter()
+                count = 0
+                for slot in window.live_slots(now):
+                    histogram = [a + b for a, b in zip(histogram, slot.histogram)]
+                    classifications.update(slot.classifications)
+                    count += slot.count
+                windows[name] = _describe(histogram, classifications, count, min(window.window_seconds, uptime))
+
+            all_time = _describe(list(self._histogram), Counter(self._classifications), self._count, uptime)
+
+        return {"windows": windows, "all_time": all_time}
@@ -0,0 +1,193 @@
+# logs/export.py
+"""
+Columnar export of the detection history for offline analysis.
+Records are read from the log store in commit order (the store's seq),
+starting after the last exported seq (the watermark), and written as
+day-partitioned Parquet or Arrow IPC files with a compact schema: small
+integer types, UTC timestamps and dictionary-encoded classification and
+reason columns. Log IDs are not used as the watermark: a lower ID can be
+committed after a higher one, and would never be exported.
+
+pyarrow is an optional dependency and is only imported when exporting.
+"""
+
+import datetime
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from backend.logs.store import DetectionLogStore
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+WATERMARK_FILE = "_watermark.json"
+
+def _require_pyarrow():
+    """Import pyarrow, with an actionable error if it is missing."""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("Columnar export needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+def export_schema():
+    """Return the Arrow schema used for exported detection records."""
+    pa = _require_pyarrow()
+    return pa.schema([
+        ("id", pa.int64()),
+        ("post_id", pa.int64()),
+        ("trust_score", pa.int8()),
+        ("classification", pa.dictionary(pa.int16(), pa.string())),
+        ("reason", pa.dictionary(pa.int32(), pa.string())),
+        ("timestamp", pa.timestamp("ms", tz="UTC")),
+        ("logged_at", pa.timestamp("ms", tz="UTC"))
+    ])
+
+def _parse_time(value) -> Optional[datetime.datetime]:
+    """Parse an ISO-8601 timestamp (with or without a trailing Z) as UTC."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
+
+def _read_watermark_file(out_dir: str) -> Dict:
+    """Return the watermark file contents for an export directory ({} if none)."""
+    try:
+        with open(os.path.join(out_dir, WATERMARK_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def read_watermark(out_dir: str, store: Optional[DetectionLogStore] = None) -> int:
+    """
+    Return the last exported seq for an export directory (0 if none).
+
+    Args:
+        out_dir (str): Export directory
+        store (DetectionLogStore, optional): Store used to translate a watermark
+                                             written as a log id by older exports
+
+    Returns:
+        int: The watermark seq
+    """
+    watermark = _read_watermark_file(out_dir)
+    try:
+        if "last_seq" in watermark:
+            return int(watermark["last_seq"])
+        if "last_id" in watermark and store is not None:
+            return store.seq_for_id(int(watermark["last_id"]))
+    except (TypeError, ValueError):
+        pass
+    return 0
+
+def _write_watermark(out_dir: str, last_seq: int) -> None:
+    """Atomically record the last exported seq."""
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"last_seq": last_seq, "exported_at": datetime.datetime.utcnow().isoformat() + "Z"}, f)
+    os.replace(tmp_path, path)
+
+def _to_table(entries: List[Dict]):
+    """Build an Arrow table from log entries using the export schema."""
+    pa = _require_pyarrow()
+    schema = export_schema()
+    columns = {
+        "id": [entry["id"] for entry in entries],
+        "post_id": [entry.get("post_id") for entry in entries],
+        "trust_score": [entry.get("trust_score") for entry in entries],
+        "classification": [entry.get("classification") for entry in entries],
+        "reason": [entry.get("reason") for entry in entries],
+        "timestamp": [_parse_time(entry.get("timestamp")) for entry in entries],
+        "logged_at": [_parse_time(entry.get("logged_at")) for entry in entries]
+    }
+    arrays = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(columns[field.name], type=pa.string()).dictionary_encode()
+                          .cast(field.type))
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def _write_table(table, path: str, file_format: str, compression: str) -> None:
+    """Write a table as Parquet or Arrow IPC, via a temporary file so readers never see partial files."""
+    pa = _require_pyarrow()
+    tmp_path = path + ".tmp"
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, tmp_path, compression=None if compression == "none" else compression,
+                       use_dictionary=["classification", "reason"])
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+def export_detections(store: DetectionLogStore, out_dir: str, file_format: str = "parquet",
+                      since_seq: Optional[int] = None, chunk_size: int = 100_000,
+                      compression: str = "zstd") -> Dict:
+    """
+    Export detection records committed after the watermark into day-partitioned files.
+    Files are named out_dir/date=YYYY-MM-DD/part-<first seq>-<last seq>.<ext>; the
+    watermark is advanced after each chunk, so an interrupted export resumes cleanly.
+
+    Args:
+        store (DetectionLogStore): Source log store
+        out_dir (str): Export directory
+        file_format (str): "parquet" or "arrow"
+        since_seq (int, optional): Export records after this seq instead of the stored watermark
+        chunk_size (int): Records read and written per chunk
+        compression (str): Codec ("zstd", "snappy", "lz4", "none", ...)
+
+    Returns:
+        Dict: Records and files written, and the new watermark
+
+    Raises:
+        ValueError: If the format is not supported
+        RuntimeError: If pyarrow is not installed
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{file_format}'. Choose one of: {', '.join(EXPORT_FORMATS)}")
+    _require_pyarrow()
+
+    os.makedirs(out_dir, exist_ok=True)
+    watermark = read_watermark(out_dir, store) if since_seq is None else since_seq
+    started = time.perf_counter()
+    records = 0
+    files: List[str] = []
+
+    for chunk in store.iter_after(watermark, chunk_size):
+        partitions: Dict[str, List[Dict]] = defaultdict(list)
+        for entry in chunk:
+            logged_at = _parse_time(entry.get("logged_at")) or _parse_time(entry.get("timestamp"))
+            partitions[logged_at.strftime("%Y-%m-%d") if logged_at else "unknown"].append(entry)
+
+        for day, entries in sorted(partitions.items()):
+            directory = os.path.join(out_dir, f"date={day}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(
+                directory,
+                f"part-{entries[0]['seq']:012d}-{entries[-1]['seq']:012d}{EXPORT_FORMATS[file_format]}"
+            )
+            _write_table(_to_table(entries), path, file_format, compression)
+            files.append(path)
+
+        records += len(chunk)
+        watermark = chunk[-1]["seq"]
+        _write_watermark(out_dir, watermark)
+
+    return {
+        "records_exported": records,
+        "files_written": files,
+        "watermark": watermark,
+        "elapsed_seconds": round(time.perf_counter() - started, 3)
+    }
@@ -1,106 +1,114 @@
 # logs/logger.py
 """
 Logger system for detection results and system events.
-Currently logs to console with formatted output.
-Designed for easy MongoDB integration in production.
+Keeps recent entries in an in-memory ring buffer and hands every record to a
+background writer that outputs formatted lines to the console, optionally a
+rotating JSON-lines file, and the embedded SQLite store.
 """
 
 import datetime
-from typing import Dict, List, Optional
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
 
-# In-memory storage for recent logs (will be replaced with MongoDB)
-_recent_logs = []
-_max_logs_in_memory = 100  # Keep last 100 logs in memory
+from backend.config import (
+    LOG_BUFFER_CAPACITY, LOG_STORE_ENABLED, LOG_STORE_PATH,
+    LOG_STORE_BATCH_SIZE, LOG_STORE_FLUSH_INTERVAL_SECONDS,
+    LOG_SINKS, LOG_FILE_PATH, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT,
+    LOG_QUEUE_MAX_SIZE, LOG_WRITER_BATCH_SIZE
+)
+from backend.id_allocator import get_id_allocator
+from backend.logs.aggregates import TrustAggregator
+from backend.logs.record import DetectionRecord
+from backend.logs.ring_buffer import DetectionRingBuffer
+from backend.logs.sink import AsyncLogWriter, ConsoleSink, JsonLinesFileSink, StoreSink
+from backend.logs.store import DetectionLogStore
+from backend.logs.stream import get_broadcaster
+from backend.metrics import timed
 
+# Upper bound on the in-memory buffer size
+MAX_LOG_BUFFER_CAPACITY = 10_000_000
+
+# In-memory ring buffer for recent logs
+_log_buffer = DetectionRingBuffer(max(1, min(LOG_BUFFER_CAPACITY, MAX_LOG_BUFFER_CAPACITY)))
+
+# Log entry IDs come from the shared allocator; it is advanced past the IDs
+# already in the persistent store the first time an ID is needed. They are
+# unique but, across workers, not in time order: cursors and export
+# watermarks use the store's commit-ordered seq instead
+_log_ids_ready = False
+
+# Streaming trust-score aggregates over 1m/15m/24h windows
+_trust_aggregates = TrustAggregator()
+
+# Durable log store, opened on first use
+_log_store = None
+_log_store_lock = threading.Lock()
+
+# Background log writer, created on first use
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+@timed("logging.log_detection")
 def log_detection(result: Dict) -> None:
     """
     Log a detection result in a formatted way to console.
-    Also stores in memory for get_logs() function.
+    Also stores in memory for get_logs() function. Output is queued for the
+    background writer, so this never waits on stdout, files or the store.
     
     Args:
         result (Dict): Detection result from pipeline.analyze_post()
                       Expected keys: post_id, trust_score, reason, timestamp
     """
     
-    # Extract data from result
-    post_id = result.get("post_id", "Unknown")
-    trust_score = result.get("trust_score", 0)
-    reason = result.get("reason", "No reason provided")
-    timestamp = result.get("timestamp", datetime.datetime.utcnow().isoformat() + "Z")
-    
-    # Format trust score with color coding for console
-    trust_display = _format_trust_score(trust_score)
-    
-    # Create formatted log message
-    log_message = f"[AI-Agent] Post #{post_id} → Trust Score: {trust_display} → Reason: {reason}"
+    # Store a compact record in memory for get_logs() and update the windowed aggregates;
+    # the console message and JSON are rendered later, when the record is read or written out
+    record = _store_log_in_memory(result)
+    _trust_aggregates.record(record.trust_score, record.classification)
     
-    # Print to console
-    print(log_message)
+    # Queue for console, file and store output
+    _get_log_writer().enqueue({"entry": record})
     
-    # Store in memory for get_logs() (will be replaced with MongoDB insert)
-    _store_log_in_memory(result, log_message)
+    # Push to live /logs/stream subscribers
+    get_broadcaster().publish("detection", record.to_dict(include_message=False), event_id=record.id)
 
-def _format_trust_score(trust_score: int) -> str:
-    """
-    Format trust score with percentage and optional color indicators.
-    
-    Args:
-        trust_score (int): Trust score from 0-100
-        
-    Returns:
-        str: Formatted trust score string
-    """
-    
-    # Convert to percentage
-    percentage = f"{trust_score}%"
-    
-    # Add visual indicators based on trust level
-    if trust_score >= 80:
-        return f"{percentage} ✅"  # High trust - green checkmark
-    elif trust_score >= 60:
-        return f"{percentage} ⚠️"   # Medium-high trust - warning
-    elif trust_score >= 40:
-        return f"{percentage} ❓"   # Medium trust - question mark
-    elif trust_score >= 20:
-        return f"{percentage} ⚠️"   # Low trust - warning
-    else:
-        return f"{percentage} 🚨"   # Very low trust - alert
-    
-def _store_log_in_memory(result: Dict, formatted_message: str) -> None:
+def _store_log_in_memory(result: Dict) -> DetectionRecord:
     """
     Store log entry in memory for retrieval.
-    This will be replaced with MongoDB insertion in production.
     
     Args:
         result (Dict): Original detection result
-        formatted_message (str): Formatted console message
+        
+    Returns:
+        DetectionRecord: The stored log record
     """
     
-    global _recent_logs
-    
-    # Create log entry for storage
-    log_entry = {
-        "id": len(_recent_logs) + 1,  # Simple incrementing ID
-        "post_id": result.get("post_id"),
-        "trust_score": result.get("trust_score"),
-        "reason": result.get("reason"),
-        "timestamp": result.get("timestamp"),
-        "formatted_message": formatted_message,
-        "logged_at": datetime.datetime.utcnow().isoformat() + "Z"
-    }
+    # Create a slotted record; the formatted message is not stored
+    record = DetectionRecord.from_result(_next_log_id(), result)
     
-    # Add to recent logs
-    _recent_logs.append(log_entry)
+    # Add to recent logs; the ring buffer evicts the oldest entry in O(1) when full
+    _log_buffer.append(record)
     
-    # Keep only recent logs (prevent memory overflow)
-    if len(_recent_logs) > _max_logs_in_memory:
-        _recent_logs.pop(0)  # Remove oldest log
+    return record
+
+def _next_log_id() -> int:
+    """Allocate the next log entry ID."""
+    global _log_ids_ready
+    allocator = get_id_allocator("log_entry")
+    if not _log_ids_ready:
+        store = _get_log_store()
+        with _log_store_lock:
+            if not _log_ids_ready:
+                if store:
+                    allocator.advance_to(store.max_id() + 1)
+                _log_ids_ready = True
+    return allocator.next_id()
 
 def get_logs(limit: Optional[int] = 20) -> List[Dict]:
     """
     Retrieve recent detection logs.
-    Currently returns from in-memory storage.
-    In production, this will query MongoDB with pagination.
+    Returns from the in-memory ring buffer; use get_logs_page() to page
+    through older history in the log store.
     
     Args:
         limit (int, optional): Maximum number of logs to return. Defaults to 20.
@@ -109,16 +117,14 @@ def get_logs(limit: Optional[int] = 20) -> List[Dict]:
         List[Dict]: List of recent log entries
     """
     
-    # Return recent logs (most recent first)
-    recent_logs = _recent_logs[-limit:] if _recent_logs else []
-    recent_logs.reverse()  # Most recent first
-    
-    return recent_logs
+    # Return recent logs (most recent first), rendered as dicts
+    return [record.to_dict() for record in _log_buffer.latest(limit)]
 
 def get_logs_by_trust_range(min_trust: int = 0, max_trust: int = 100, limit: int = 20) -> List[Dict]:
     """
     Get logs filtered by trust score range.
-    Placeholder for MongoDB query with filtering.
+    Recent logs come from the in-memory score index; if it holds fewer than
+    `limit` matches, older ones are read from the log store.
     
     Args:
         min_trust (int): Minimum trust score (inclusive)
@@ -129,58 +135,92 @@ def get_logs_by_trust_range(min_trust: int = 0, max_trust: int = 100, limit: int
         List[Dict]: Filtered log entries
     """
     
-    # Filter logs by trust score range
-    filtered_logs = [
-        log for log in _recent_logs 
-        if min_trust <= log.get("trust_score", 0) <= max_trust
-    ]
+    # Merge only the score buckets inside the range, newest first, stopping at the limit
+    filtered_logs = [record.to_dict() for record in _log_buffer.latest_in_range(min_trust, max_trust, limit)]
+    
+    if len(filtered_logs) < limit and _get_log_store():
+        # Log IDs do not follow commit order, so there is no ID to continue below;
+        # walk the store newest first and skip entries already taken from the buffer
+        seen = {entry["id"] for entry in filtered_logs}
+        cursor = None
+        while len(filtered_logs) < limit:
+            older_logs, cursor = _query_logs_from_store(
+                {"min_trust": min_trust, "max_trust": max_trust, "before_seq": cursor}, limit
+            )
+            filtered_logs.extend(entry for entry in older_logs if entry["id"] not in seen)
+            if cursor is None:
+                break
     
-    # Return most recent first, limited
-    filtered_logs.reverse()
     return filtered_logs[:limit]
 
+def get_logs_page(cursor: Optional[int] = None, limit: int = 20, min_trust: Optional[int] = None,
+                  max_trust: Optional[int] = None) -> Dict:
+    """
+    Page through the full detection history, newest first.
+    
+    Args:
+        cursor (int, optional): Cursor returned by the previous page (None for the first page);
+                                a store seq, so rows committed later never shift a walk
+        limit (int): Maximum number of logs per page
+        min_trust (int, optional): Minimum trust score (inclusive)
+        max_trust (int, optional): Maximum trust score (inclusive)
+        
+    Returns:
+        Dict: 'logs' and 'next_cursor' (None on the last page)
+    """
+    if not _get_log_store():
+        logs = get_logs(limit) if cursor is None else []
+        return {"logs": logs, "next_cursor": None}
+    
+    logs, next_cursor = _query_logs_from_store(
+        {"min_trust": min_trust, "max_trust": max_trust, "before_seq": cursor}, limit
+    )
+    return {"logs": logs, "next_cursor": next_cursor}
+
 def get_logs_summary() -> Dict:
     """
     Get summary statistics of recent logs.
-    In production, this will use MongoDB aggregation.
+    Served from running counters kept by the ring buffer.
     
     Returns:
         Dict: Summary statistics
     """
     
-    if not _recent_logs:
+    # Counters are maintained on insert and eviction, so this is constant-time
+    summary = _log_buffer.summary()
+    
+    if not summary["count"]:
         return {
             "total_logs": 0,
             "avg_trust_score": 0,
             "high_trust_count": 0,
             "medium_trust_count": 0, 
             "low_trust_count": 0,
-            "latest_log_time": None
+            "latest_log_time": None,
+            "worker_pid": os.getpid()
         }
     
-    # Calculate statistics
-    trust_scores = [log.get("trust_score", 0) for log in _recent_logs]
-    total_logs = len(_recent_logs)
-    avg_trust = sum(trust_scores) / total_logs if trust_scores else 0
-    
-    # Count by trust levels
-    high_trust = sum(1 for score in trust_scores if score >= 70)
-    medium_trust = sum(1 for score in trust_scores if 30 <= score < 70)
-    low_trust = sum(1 for score in trust_scores if score < 30)
-    
-    # Get latest timestamp
-    latest_log = _recent_logs[-1] if _recent_logs else None
-    latest_time = latest_log.get("timestamp") if latest_log else None
-    
     return {
-        "total_logs": total_logs,
-        "avg_trust_score": round(avg_trust, 1),
-        "high_trust_count": high_trust,
-        "medium_trust_count": medium_trust,
-        "low_trust_count": low_trust,
-        "latest_log_time": latest_time
+        "total_logs": summary["count"],
+        "avg_trust_score": round(summary["avg_trust_score"], 1),
+        "high_trust_count": summary["high_trust_count"],
+        "medium_trust_count": summary["medium_trust_count"],
+        "low_trust_count": summary["low_trust_count"],
+        "latest_log_time": summary["latest"].get("timestamp"),
+        "worker_pid": os.getpid()
     }
 
+def get_trust_stats() -> Dict:
+    """
+    Get trust-score quantiles, classification rates and detection rates
+    over the 1m, 15m and 24h windows, read from the streaming aggregates.
+    The aggregates cover this process only (one prefork worker).
+    
+    Returns:
+        Dict: Per-window and all-time statistics, and the answering worker's pid
+    """
+    return {**_trust_aggregates.snapshot(), "worker_pid": os.getpid()}
+
 def log_system_event(event_type: str, message: str, details: Optional[Dict] = None) -> None:
     """
     Log system events (agent start/stop, errors, etc.).
@@ -198,66 +238,184 @@ def log_system_event(event_type: str, message: str, details: Optional[Dict] = No
     if details:
         formatted_message += f" | Details: {details}"
     
-    # Print to console
-    print(f"[{timestamp}] {formatted_message}")
-    
-    # In production, this would also go to MongoDB system events collection
+    # Queue for console and file output
+    _get_log_writer().enqueue({
+        "line": f"[{timestamp}] {formatted_message}",
+        "data": {
+            "type": "system",
+            "event_type": event_type,
+            "message": message,
+            "details": details,
+            "logged_at": timestamp
+        }
+    })
 
 def clear_logs() -> int:
     """
     Clear all logs from memory.
-    In production, this would be a MongoDB delete operation with safety checks.
+    Persisted history in the log store is kept.
     
     Returns:
         int: Number of logs cleared
     """
     
-    global _recent_logs
-    cleared_count = len(_recent_logs)
-    _recent_logs.clear()
+    cleared_count = _log_buffer.clear()
     
     log_system_event("MAINTENANCE", f"Cleared {cleared_count} logs from memory")
     return cleared_count
 
-# MongoDB integration placeholder functions
-def _init_mongodb_connection():
+# Persistent log store functions
+def _get_log_store() -> Optional[DetectionLogStore]:
+    """Return the log store, opening it on first use (None when disabled or unavailable)."""
+    global _log_store
+    if _log_store is None and LOG_STORE_ENABLED:
+        with _log_store_lock:
+            if _log_store is None:
+                _log_store = _init_log_store()
+    return _log_store or None
+
+def _init_log_store():
     """
-    Initialize MongoDB connection.
-    This will replace the in-memory storage system.
+    Open the embedded SQLite log store.
+    
+    Returns:
+        DetectionLogStore or False: The store, or False if it could not be opened
     """
-    # TODO: Implement MongoDB connection
-    # from pymongo import MongoClient
-    # client = MongoClient(mongodb_uri)
-    # db = client.misinformation_detection
-    # return db.detection_logs
-    pass
-
-def _insert_log_to_mongodb(log_entry: Dict):
+    try:
+        return DetectionLogStore(
+            LOG_STORE_PATH,
+            batch_size=LOG_STORE_BATCH_SIZE,
+            flush_interval=LOG_STORE_FLUSH_INTERVAL_SECONDS
+        )
+    except Exception as e:
+        print(f"❌ Could not open detection log store at {LOG_STORE_PATH}: {e}")
+        return False
+
+def _query_logs_from_store(filter_dict: Dict, limit: int) -> Tuple[List[Dict], Optional[int]]:
     """
-    Insert log entry to MongoDB collection.
+    Query logs from the log store, newest first. Rows are rendered through
+    DetectionRecord, so they have the same fields as entries from the ring buffer.
     
     Args:
-        log_entry (Dict): Log entry to insert
+        filter_dict (Dict): Optional 'min_trust', 'max_trust', 'post_id' and 'before_seq' filters
+        limit (int): Result limit
+        
+    Returns:
+        Tuple[List[Dict], Optional[int]]: Query results and the cursor for the next page
     """
-    # TODO: Implement MongoDB insertion
-    # collection.insert_one(log_entry)
-    pass
+    store = _get_log_store()
+    if not store:
+        return [], None
+    rows, next_cursor = store.query(limit=limit, **{k: v for k, v in filter_dict.items() if v is not None})
+    return [DetectionRecord.from_row(row).to_dict() for row in rows], next_cursor
 
-def _query_logs_from_mongodb(filter_dict: Dict, limit: int, sort_by: str = "timestamp"):
+def get_detections_after(log_id: int, limit: int) -> Optional[List[Tuple[int, Dict]]]:
     """
-    Query logs from MongoDB with filtering and sorting.
+    Get detections committed after a log entry, in commit (seq) order, for
+    resuming the live stream where the replay window does not reach: the
+    store is shared by all workers, so this works whichever one was streaming.
     
     Args:
-        filter_dict (Dict): MongoDB query filter
-        limit (int): Result limit
-        sort_by (str): Field to sort by
+        log_id (int): Last log ID the client received
+        limit (int): Maximum number of detections
+        
+    Returns:
+        List[Tuple[int, Dict]] or None: (log ID, stream payload) pairs, or None when the
+                                        store is disabled or does not hold `log_id`
+    """
+    store = _get_log_store()
+    if not store:
+        return None
+    
+    # Records this worker has queued but not written yet belong after the resume point
+    flush_logs()
+    seq = store.seq_of_id(log_id)
+    if seq is None:
+        return None
+    rows = next(store.iter_after(seq, chunk_size=limit), [])
+    return [(row["id"], DetectionRecord.from_row(row).to_dict(include_message=False)) for row in rows]
+
+def flush_log_store() -> None:
+    """Write any pending log entries to the log store."""
+    if _log_store:
+        _log_store.flush()
+
+def _get_log_writer() -> AsyncLogWriter:
+    """Return the background log writer, creating it with the configured sinks on first use."""
+    global _log_writer
+    if _log_writer is None:
+        store = _get_log_store()
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = AsyncLogWriter(
+                    _build_sinks(store),
+                    max_queue=LOG_QUEUE_MAX_SIZE,
+                    batch_size=LOG_WRITER_BATCH_SIZE
+                )
+    return _log_writer
+
+def _build_sinks(store: Optional[DetectionLogStore]) -> List:
+    """Create the sinks named in LOG_SINKS, plus the store sink when the store is enabled."""
+    names = {name.strip().lower() for name in LOG_SINKS.split(",") if name.strip()}
+    sinks = []
+    if "console" in names:
+        sinks.append(ConsoleSink())
+    if "file" in names:
+        try:
+            sinks.append(JsonLinesFileSink(LOG_FILE_PATH, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT))
+        except OSError as e:
+            print(f"❌ Could not open log file {LOG_FILE_PATH}: {e}")
+    if store:
+        sinks.append(StoreSink(store))
+    return sinks
+
+def flush_logs(timeout: float = 5.0) -> bool:
+    """
+    Wait until every queued log record has been written to the sinks.
+    
+    Args:
+        timeout (float): Maximum seconds to wait
         
     Returns:
-        List[Dict]: Query results
+        bool: True if the queue drained in time
+    """
+    if _log_writer is None:
+        return True
+    return _log_writer.flush(timeout)
+
+def get_log_writer_stats() -> Dict:
+    """Get log queue depth and written/dropped record counts."""
+    return _get_log_writer().get_stats()
+
+def shutdown_log_writer(timeout: float = 5.0) -> None:
+    """Flush queued records and stop the background writer and its sinks."""
+    global _log_writer
+    with _log_writer_lock:
+        writer, _log_writer = _log_writer, None
+    if writer is not None:
+        writer.close(timeout)
+
+def close_log_store() -> None:
+    """Flush and close the log store; it is reopened on next use."""
+    global _log_store
+    with _log_store_lock:
+        store, _log_store = _log_store, None
+    if store:
+        store.close()
+
+def _reset_after_fork() -> None:
     """
-    # TODO: Implement MongoDB query
-    # return list(collection.find(filter_dict).sort(sort_by, -1).limit(limit))
-    pass
+    Drop the parent's log store connection and writer thread in a forked
+    worker; SQLite connections and threads must not be shared across a fork.
+    Both are reopened on first use in the worker.
+    """
+    global _log_store, _log_store_lock, _log_writer, _log_writer_lock, _log_ids_ready
+    _log_store, _log_store_lock = None, threading.Lock()
+    _log_writer, _log_writer_lock = None, threading.Lock()
+    _log_ids_ready = False
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
 
 # Test function to demonstrate the logger
 def test_logger():
@@ -296,6 +454,7 @@ def test_logger():
     print("📊 Logging detection results:")
     for result in test_results:
         log_detection(result)
+    flush_logs()
     
     print("\n" + "="*80)
     
@@ -328,6 +487,7 @@ def test_logger():
     log_system_event("AGENT_START", "Autonomous agent initialized successfully")
     log_system_event("ERROR", "Database connection timeout", {"retry_count": 3, "timeout": "5s"})
     log_system_event("INFO", "Processing batch completed", {"posts_processed": 150})
+    flush_logs()
 
 if __name__ == "__main__":
     test_logger()
\ No newline at end of file
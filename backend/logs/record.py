@@ -0,0 +1,221 @@
+# logs/record.py
+"""
+Compact in-memory representation of a detection log entry.
+A DetectionRecord keeps only the raw fields in __slots__ (no per-instance
+dict) and stores the log time as a float. The console message and the JSON
+dict are rendered on demand, when a record is read or written out, instead
+of being stored with every entry.
+
+Run this module to compare the memory of 1M records in the dict and slotted
+layouts:
+
+    python -m backend.logs.record --records 1000000
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+FIELDS = ("id", "post_id", "trust_score", "classification", "reason", "timestamp", "logged_at")
+
+def format_trust_score(trust_score: int) -> str:
+    """
+    Format trust score with percentage and optional color indicators.
+
+    Args:
+        trust_score (int): Trust score from 0-100
+
+    Returns:
+        str: Formatted trust score string
+    """
+
+    # Convert to percentage
+    percentage = f"{trust_score}%"
+
+    # Add visual indicators based on trust level
+    if trust_score >= 80:
+        return f"{percentage} ✅"  # High trust - green checkmark
+    elif trust_score >= 60:
+        return f"{percentage} ⚠️"   # Medium-high trust - warning
+    elif trust_score >= 40:
+        return f"{percentage} ❓"   # Medium trust - question mark
+    elif trust_score >= 20:
+        return f"{percentage} ⚠️"   # Low trust - warning
+    else:
+        return f"{percentage} 🚨"   # Very low trust - alert
+
+def _isoformat(epoch: float) -> str:
+    """Render a Unix timestamp in the logger's ISO-8601 'Z' format."""
+    return datetime.datetime.utcfromtimestamp(epoch).isoformat() + "Z"
+
+def _parse_epoch(value: Optional[str]) -> float:
+    """Parse a logger ISO-8601 'Z' timestamp back into a Unix timestamp (0 if missing or invalid)."""
+    try:
+        parsed = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return 0.0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+class DetectionRecord:
+    """
+    One detection log entry. Supports dict-style reads (record["id"],
+    record.get("trust_score")) so it can be used wherever log entries are read.
+    """
+
+    __slots__ = ("id", "post_id", "trust_score", "classification", "reason", "timestamp", "logged_at_epoch")
+
+    def __init__(self, id: int, post_id, trust_score, classification: Optional[str], reason: Optional[str],
+                 timestamp: Optional[str], logged_at_epoch: float):
+        self.id = id
+        self.post_id = post_id
+        self.trust_score = trust_score
+        # Classifications come from a small label set; share one string object per label
+        self.classification = sys.intern(classification) if isinstance(classification, str) else classification
+        self.reason = reason
+        self.timestamp = timestamp
+        self.logged_at_epoch = logged_at_epoch
+
+    @classmethod
+    def from_result(cls, log_id: int, result: Dict, logged_at_epoch: Optional[float] = None) -> "DetectionRecord":
+        """Create a record from a detection result dict."""
+        return cls(
+            log_id,
+            result.get("post_id"),
+            result.get("trust_score"),
+            result.get("classification"),
+            result.get("reason"),
+            result.get("timestamp"),
+            time.time() if logged_at_epoch is None else logged_at_epoch
+        )
+
+    @classmethod
+    def from_row(cls, row: Dict) -> "DetectionRecord":
+        """Create a record from a log store row, whose logged_at is ISO-8601 text."""
+        return cls(
+            row["id"],
+            row.get("post_id"),
+            row.get("trust_score"),
+            row.get("classification"),
+            row.get("reason"),
+            row.get("timestamp"),
+            _parse_epoch(row.get("logged_at"))
+        )
+
+    @property
+    def logged_at(self) -> str:
+        return _isoformat(self.logged_at_epoch)
+
+    @property
+    def formatted_message(self) -> str:
+        """The console line for this detection, rendered on each access."""
+        post_id = "Unknown" if self.post_id is None else self.post_id
+        reason = "No reason provided" if self.reason is None else self.reason
+        trust_display = format_trust_score(self.trust_score or 0)
+        return f"[AI-Agent] Post #{post_id} → Trust Score: {trust_display} → Reason: {reason}"
+
+    def to_dict(self, include_message: bool = True) -> Dict:
+        """
+        Render the record as a log entry dict.
+
+        Args:
+            include_message (bool): Include the formatted console message
+
+        Returns:
+            Dict: The log entry fields
+        """
+        entry = {field: getattr(self, field) for field in FIELDS}
+        if include_message:
+            entry["formatted_message"] = self.formatted_message
+        return entry
+
+    def to_json(self) -> str:
+        """Render the record as one JSON line (without the console message)."""
+        return json.dumps(self.to_dict(include_message=False), default=str)
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in FIELDS or key == "formatted_message" else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        if key not in FIELDS and key != "formatted_message":
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self) -> str:
+        return f"DetectionRecord(id={self.id}, post_id={self.post_id}, trust_score={self.trust_score})"
+
+def _measure(build, count: int) -> Dict:
+    """Build `count` entries and report the retained memory and build time."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    entries = [build(i) for i in range(count)]
+    elapsed = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    gc.collect()
+    return {
+        "total_mb": round(retained / 1e6, 1),
+        "bytes_per_record": round(retained / count, 1),
+        "build_seconds": round(elapsed, 2)
+    }
+
+def benchmark_memory(count: int = 1_000_000) -> Dict:
+    """
+    Compare the memory of `count` log entries stored as dicts (with a
+    pre-rendered message and ISO log time) against DetectionRecords.
+
+    Args:
+        count (int): Number of records to build
+
+    Returns:
+        Dict: Measurements for both layouts and the reduction ratio
+    """
+    reasons = [f"AI analysis: classified as misinformation with {c}% confidence" for c in range(50, 100)]
+    classifications = ["misinformation", "reliable information", "opinion", "factual news"]
+    base_time = time.time()
+
+    def result(i: int) -> Dict:
+        return {
+            "post_id": i,
+            "trust_score": i % 101,
+            "classification": classifications[i % 4],
+            "reason": reasons[i % 50],
+            "timestamp": "2025-07-30T14:30:00.000000Z"
+        }
+
+    def as_dict(i: int) -> Dict:
+        record = DetectionRecord.from_result(i, result(i), base_time + i)
+        return record.to_dict() | {"logged_at": _isoformat(base_time + i)}
+
+    def as_record(i: int) -> DetectionRecord:
+        return DetectionRecord.from_result(i, result(i), base_time + i)
+
+    dict_layout = _measure(as_dict, count)
+    record_layout = _measure(as_record, count)
+    return {
+        "records": count,
+        "dict": dict_layout,
+        "slotted": record_layout,
+        "reduction": round(dict_layout["total_mb"] / max(record_layout["total_mb"], 1e-9), 2)
+    }
+
+def main():
+    """Command-line entry point for the memory benchmark."""
+    parser = argparse.ArgumentParser(description="Compare log entry memory in the dict and slotted layouts.")
+    parser.add_argument("--records", type=int, default=1_000_000, help="Number of records to build")
+    args = parser.parse_args()
+
+    print(f"🧪 Building {args.records:,} log entries in each layout...")
+    print(json.dumps(benchmark_memory(args.records), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# logs/ring_buffer.py
+"""
+Fixed-capacity ring buffer for detection log entries.
+Appends and evictions are O(1), and summary statistics (count, trust score
+sum, trust buckets, latest timestamp) are maintained incrementally so that
+summary queries cost the same no matter how many entries are buffered.
+A per-score index answers trust-range queries without scanning the buffer.
+"""
+
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from backend.logs.score_index import ScoreBucketIndex
+
+# Trust buckets used by the /logs summary
+HIGH_TRUST_MIN = 70
+LOW_TRUST_BELOW = 30
+
+def trust_bucket(trust_score: int) -> str:
+    """Return 'high' (>= 70), 'medium' (30-69) or 'low' (< 30) for a trust score."""
+    if trust_score >= HIGH_TRUST_MIN:
+        return "high"
+    if trust_score < LOW_TRUST_BELOW:
+        return "low"
+    return "medium"
+
+class DetectionRingBuffer:
+    """
+    Ring buffer of log entries with running summary counters.
+    """
+
+    def __init__(self, capacity: int = 100):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity (int): Maximum number of entries kept; the oldest are evicted first
+        """
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+
+        self.capacity = capacity
+        self._slots: List[Optional[Dict]] = [None] * capacity
+        self._head = 0   # index of the next slot to write
+        self._count = 0
+        self._lock = threading.Lock()
+
+        self._trust_sum = 0
+        self._buckets = {"high": 0, "medium": 0, "low": 0}
+        self._total_appended = 0
+        self._total_evicted = 0
+        self._score_index = ScoreBucketIndex()
+
+    def append(self, entry: Dict) -> Optional[Dict]:
+        """
+        Add an entry, evicting the oldest one if the buffer is full.
+
+        Args:
+            entry (Dict): Log entry with at least 'trust_score'
+
+        Returns:
+            Dict or None: The evicted entry, if any
+        """
+        trust_score = entry.get("trust_score") or 0
+
+        with self._lock:
+            evicted = self._slots[self._head] if self._count == self.capacity else None
+            if evicted is not None:
+                evicted_score = evicted.get("trust_score") or 0
+                self._trust_sum -= evicted_score
+                self._buckets[trust_bucket(evicted_score)] -= 1
+                self._score_index.remove_oldest(evicted)
+                self._total_evicted += 1
+            else:
+                self._count += 1
+
+            self._slots[self._head] = entry
+            self._head = (self._head + 1) % self.capacity
+            self._trust_sum += trust_score
+            self._buckets[trust_bucket(trust_score)] += 1
+            self._score_index.add(self._total_appended, entry)
+            self._total_appended += 1
+
+        return evicted
+
+    def latest(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Return the most recent entries, newest first.
+
+        Args:
+            limit (int, optional): Maximum number of entries (default: all)
+
+        Returns:
+            List[Dict]: Entries, newest first
+        """
+        with self._lock:
+            count = self._count if limit is None else max(0, min(limit, self._count))
+            return [self._slots[(self._head - 1 - i) % self.capacity] for i in range(count)]
+
+    def iter_newest_first(self) -> Iterator[Dict]:
+        """
+        Iterate entries from newest to oldest without copying the buffer.
+        Entries appended during iteration may be skipped or seen twice.
+        """
+        head, count = self._head, self._count
+        for i in range(count):
+            entry = self._slots[(head - 1 - i) % self.capacity]
+            if entry is not None:
+                yield entry
+
+    def latest_in_range(self, min_trust: int, max_trust: int, limit: int) -> List[Dict]:
+        """
+        Return the most recent entries with a trust score in [min_trust, max_trust].
+        Only the per-score buckets inside the range are read.
+
+        Args:
+            min_trust (int): Minimum trust score (inclusive)
+            max_trust (int): Maximum trust score (inclusive)
+            limit (int): Maximum number of entries
+
+        Returns:
+            List[Dict]: Matching entries, newest first
+        """
+        with self._lock:
+            return self._score_index.query(min_trust, max_trust, limit)
+
+    def oldest(self) -> Optional[Dict]:
+        """Return the oldest buffered entry, or None if empty."""
+        with self._lock:
+            if not self._count:
+                return None
+            return self._slots[(self._head - self._count) % self.capacity]
+
+    def newest(self) -> Optional[Dict]:
+        """Return the most recent entry, or None if empty."""
+        with self._lock:
+            if not self._count:
+                return None
+            return self._slots[(self._head - 1) % self.capacity]
+
+    def clear(self) -> int:
+        """
+        Remove all entries and reset the summary counters.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            cleared = self._count
+            self._slots = [None] * self.capacity
+            self._head = 0
+            self._count = 0
+            self._trust_sum = 0
+            self._buckets = {"high": 0, "medium": 0, "low": 0}
+            self._score_index.clear()
+            return cleared
+
+    def summary(self) -> Dict:
+        """
+        Constant-time summary of the buffered entries.
+
+        Returns:
+            Dict: Count, trust score sum and average, bucket counts and the latest entry
+        """
+        with self._lock:
+            latest = self._slots[(self._head - 1) % self.capacity] if self._count else None
+            return {
+                "count": self._count,
+                "trust_sum": self._trust_sum,
+                "avg_trust_score": self._trust_sum / self._count if self._count else 0,
+                "high_trust_count": self._buckets["high"],
+                "medium_trust_count": self._buckets["medium"],
+                "low_trust_count": self._buckets["low"],
+                "latest": latest,
+                "total_appended": self._total_appended,
+                "total_evicted": self._total_evicted
+            }
+
+    def __len__(self) -> int:
+        return self._count
@@ -0,0 +1,82 @@
+# logs/score_index.py
+"""
+Secondary index over buffered detection logs keyed by trust score.
+Each of the 101 possible scores (0-100) has its own time-ordered bucket, so
+a trust-range query only touches the buckets inside the range and merges
+them newest-first, stopping as soon as it has enough results.
+"""
+
+import heapq
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, Tuple
+
+MIN_SCORE = 0
+MAX_SCORE = 100
+
+def clamp_score(trust_score) -> int:
+    """Map a trust score onto a bucket number between 0 and 100."""
+    return min(MAX_SCORE, max(MIN_SCORE, int(trust_score or 0)))
+
+class ScoreBucketIndex:
+    """
+    Per-score buckets of (sequence, entry) pairs, oldest on the left.
+    Not thread-safe on its own; the owning ring buffer serializes access.
+    """
+
+    def __init__(self):
+        self._buckets: List[Deque[Tuple[int, Dict]]] = [deque() for _ in range(MAX_SCORE + 1)]
+
+    def add(self, sequence: int, entry: Dict) -> None:
+        """
+        Index an entry. Sequences must increase with every call.
+
+        Args:
+            sequence (int): Insertion sequence number of the entry
+            entry (Dict): Log entry with 'trust_score'
+        """
+        self._buckets[clamp_score(entry.get("trust_score"))].append((sequence, entry))
+
+    def remove_oldest(self, entry: Dict) -> None:
+        """
+        Drop an evicted entry. Evictions happen oldest-first, so the entry
+        is always at the left end of its bucket.
+
+        Args:
+            entry (Dict): The evicted log entry
+        """
+        bucket = self._buckets[clamp_score(entry.get("trust_score"))]
+        if bucket and bucket[0][1] is entry:
+            bucket.popleft()
+
+    def query(self, min_trust: int, max_trust: int, limit: int) -> List[Dict]:
+        """
+        Return the newest entries with a trust score in [min_trust, max_trust].
+
+        Args:
+            min_trust (int): Minimum trust score (inclusive)
+            max_trust (int): Maximum trust score (inclusive)
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Dict]: Matching entries, newest first
+        """
+        low, high = clamp_score(min_trust), clamp_score(max_trust)
+        if limit <= 0 or min_trust > max_trust or max_trust < MIN_SCORE or min_trust > MAX_SCORE:
+            return []
+
+        buckets = [reversed(bucket) for bucket in self._buckets[low:high + 1] if bucket]
+        if len(buckets) == 1:
+            return [entry for _, entry in islice(buckets[0], limit)]
+
+        merged = heapq.merge(*buckets, key=lambda item: item[0], reverse=True)
+        return [entry for _, entry in islice(merged, limit)]
+
+    def clear(self) -> None:
+        """Remove all indexed entries."""
+        for bucket in self._buckets:
+            bucket.clear()
+
+    def bucket_sizes(self) -> List[int]:
+        """Return the number of indexed entries for each score 0-100."""
+        return [len(bucket) for bucket in self._buckets]
@@ -0,0 +1,257 @@
+# logs/sink.py
+"""
+Asynchronous, batched log output.
+Callers only enqueue a record; a background thread drains the queue in
+batches and hands each batch to the configured sinks (console, rotating
+JSON-lines file, persistent store). When the queue is full, new records are
+dropped and counted rather than blocking the caller.
+"""
+
+import json
+import os
+import queue
+import sys
+import threading
+from typing import Dict, List, Optional, Sequence
+
+def _render_line(record: Dict) -> Optional[str]:
+    """Console line for a record: its 'line', or the entry's formatted message rendered now."""
+    if record.get("line"):
+        return record["line"]
+    entry = record.get("entry")
+    return entry.formatted_message if hasattr(entry, "formatted_message") else None
+
+def _render_data(record: Dict) -> Optional[Dict]:
+    """JSON payload for a record: its 'data', or the entry rendered now."""
+    if "data" in record:
+        return record["data"]
+    entry = record.get("entry")
+    if hasattr(entry, "to_dict"):
+        return {"type": "detection", **entry.to_dict(include_message=False)}
+    return None
+
+class ConsoleSink:
+    """
+    Writes each record's console line to stdout, one write call per batch.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def write(self, records: List[Dict]) -> None:
+        stream = self.stream or sys.stdout
+        lines = [_render_line(record) for record in records]
+        lines = [line for line in lines if line]
+        if lines:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+
+    def close(self) -> None:
+        pass
+
+class JsonLinesFileSink:
+    """
+    Appends each record's JSON payload as one line, rotating the file by size.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 10_000_000, backup_count: int = 5):
+        """
+        Open the log file.
+
+        Args:
+            path (str): JSON-lines file path
+            max_bytes (int): Rotate once the file reaches this size (0 = never rotate)
+            backup_count (int): Rotated files kept as path.1 ... path.N
+        """
+        self.path = path
+        self.max_bytes = max(0, max_bytes)
+        self.backup_count = max(0, backup_count)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, records: List[Dict]) -> None:
+        payloads = [_render_data(record) for record in records]
+        lines = [json.dumps(payload, default=str) + "\n" for payload in payloads if payload is not None]
+        if not lines:
+            return
+        self._file.write("".join(lines))
+        self._file.flush()
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _rotate(self) -> None:
+        """Shift path -> path.1 -> path.2 ..., dropping the oldest backup."""
+        self._file.close()
+        if self.backup_count:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+class StoreSink:
+    """
+    Inserts each record's 'entry' into a DetectionLogStore in one transaction per batch.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def write(self, records: List[Dict]) -> None:
+        entries = [record["entry"] for record in records if record.get("entry")]
+        if entries:
+            self.store.add_many(entries)
+
+    def close(self) -> None:
+        self.store.flush()
+
+class AsyncLogWriter:
+    """
+    Bounded record queue drained by a background thread into a set of sinks.
+    """
+
+    def __init__(self, sinks: Sequence, max_queue: int = 10_000, batch_size: int = 256):
+        """
+        Initialize the writer. The drain thread starts on the first record.
+
+        Args:
+            sinks (Sequence): Objects with write(records) and close()
+            max_queue (int): Maximum queued records before new ones are dropped
+            batch_size (int): Maximum records handed to the sinks at once
+        """
+        self.sinks = list(sinks)
+        self.batch_size = max(1, batch_size)
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue))
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._written = 0
+        self._dropped = 0
+        self._sink_errors = 0
+        self._batches = 0
+
+    def enqueue(self, record: Dict) -> bool:
+        """
+        Queue a record without blocking.
+
+        Args:
+            record (Dict): Record with any of 'line', 'data' and 'entry'; a DetectionRecord
+                           entry is rendered by the sinks when no line or data is given
+
+        Returns:
+            bool: False if the queue was full and the record was dropped
+        """
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every record queued so far has been written.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if the queue drained in time
+        """
+        if self._worker is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush, stop the drain thread and close the sinks. A later record restarts the thread."""
+        with self._lock:
+            worker = self._worker
+        if worker is not None:
+            self.flush(timeout)
+            self._queue.put(None)
+            worker.join(timeout)
+            with self._lock:
+                self._worker = None
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"❌ Error closing log sink {type(sink).__name__}: {e}", file=sys.stderr)
+
+    def get_stats(self) -> Dict:
+        """Get queue depth and written, dropped and failed record counts."""
+        with self._lock:
+            return {
+                "sinks": [type(sink).__name__ for sink in self.sinks],
+                "queue_depth": self._queue.qsize(),
+                "written": self._written,
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "sink_errors": self._sink_errors
+            }
+
+    def _ensure_worker(self) -> None:
+        """Start the drain thread if it is not running."""
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+                self._worker.start()
+
+    def _drain(self) -> None:
+        """Block for one record, then take whatever else is queued up to batch_size."""
+        while True:
+            item = self._queue.get()
+            batch, markers, stop = [], [], False
+
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+
+    def _write(self, batch: List[Dict]) -> None:
+        """Hand a batch to every sink; one failing sink does not affect the others."""
+        errors = 0
+        for sink in self.sinks:
+            try:
+                sink.write(batch)
+            except Exception as e:
+                errors += 1
+                print(f"❌ Log sink {type(sink).__name__} failed: {e}", file=sys.stderr)
+        with self._lock:
+            self._written += len(batch)
+            self._batches += 1
+            self._sink_errors += errors
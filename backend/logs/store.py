@@ -0,0 +1,258 @@
+# logs/store.py
+"""
+Durable detection-log store on embedded SQLite (WAL mode).
+Needs no outside service: inserts are batched into single transactions and
+queries use indexes on timestamp, trust_score and post_id with cursor-based
+pagination.
+
+Log IDs identify entries but say nothing about order: worker processes
+allocate them from separate blocks and write them later, through the async
+log writer. Each row therefore also gets a `seq`, an AUTOINCREMENT rowid
+assigned inside SQLite's serialized write transactions, so seq order is
+commit order. Page cursors and export watermarks are seq values; a row that
+commits after a reader has passed its cursor always lands above it.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_COLUMNS = ("id", "post_id", "trust_score", "classification", "reason", "timestamp", "logged_at")
+_SELECT = f"SELECT seq, {', '.join(_COLUMNS)} FROM detection_logs"
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS detection_logs (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER NOT NULL UNIQUE,
+        post_id INTEGER,
+        trust_score INTEGER,
+        classification TEXT,
+        reason TEXT,
+        timestamp TEXT,
+        logged_at TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_detection_logs_timestamp ON detection_logs (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_detection_logs_trust_score ON detection_logs (trust_score, seq)",
+    "CREATE INDEX IF NOT EXISTS idx_detection_logs_post_id ON detection_logs (post_id)"
+]
+
+class DetectionLogStore:
+    """
+    SQLite-backed store for detection log entries with batched inserts.
+    """
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval: float = 1.0):
+        """
+        Open (or create) the store.
+
+        Args:
+            path (str): SQLite database file path
+            batch_size (int): Pending entries that trigger a flush
+            flush_interval (float): Maximum seconds an entry waits before being written
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+        self._flusher: Optional[threading.Thread] = None
+        if self.flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="log-store-flusher", daemon=True)
+            self._flusher.start()
+
+    def add(self, entry: Dict) -> None:
+        """
+        Queue a log entry for insertion; written once the batch fills or the interval passes.
+
+        Args:
+            entry (Dict): Log entry with the store's columns
+        """
+        with self._lock:
+            self._pending.append(tuple(entry.get(column) for column in _COLUMNS))
+            should_flush = len(self._pending) >= self.batch_size
+        if should_flush:
+            self.flush()
+
+    def add_many(self, entries: List[Dict]) -> None:
+        """Queue several log entries and flush them in one transaction."""
+        with self._lock:
+            self._pending.extend(tuple(entry.get(column) for column in _COLUMNS) for entry in entries)
+        self.flush()
+
+    def flush(self) -> int:
+        """
+        Write all pending entries in one transaction. Entries stay pending
+        until the transaction commits, so a failed write is retried by the
+        next flush instead of losing them.
+
+        Returns:
+            int: Number of entries written
+        """
+        with self._lock:
+            rows = self._pending
+            if not rows:
+                return 0
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO detection_logs ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                    rows
+                )
+            self._pending = []
+            return len(rows)
+
+    def query(self, min_trust: Optional[int] = None, max_trust: Optional[int] = None,
+              post_id: Optional[int] = None, before_seq: Optional[int] = None,
+              limit: int = 20) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Query log entries newest first (in commit order) with keyset (cursor) pagination.
+
+        Args:
+            min_trust (int, optional): Minimum trust score (inclusive)
+            max_trust (int, optional): Maximum trust score (inclusive)
+            post_id (int, optional): Only entries for this post
+            before_seq (int, optional): Cursor; only entries committed before this seq are returned
+            limit (int): Maximum number of entries
+
+        Returns:
+            Tuple[List[Dict], Optional[int]]: Entries and the cursor for the next page
+                                              (None when there are no more results)
+        """
+        self.flush()
+
+        clauses, params = [], []
+        if min_trust is not None:
+            clauses.append("trust_score >= ?")
+            params.append(min_trust)
+        if max_trust is not None:
+            clauses.append("trust_score <= ?")
+            params.append(max_trust)
+        if post_id is not None:
+            clauses.append("post_id = ?")
+            params.append(post_id)
+        if before_seq is not None:
+            clauses.append("seq < ?")
+            params.append(before_seq)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        limit = max(1, limit)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"{_SELECT} {where} ORDER BY seq DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+
+        entries = [_row_to_entry(row) for row in rows[:limit]]
+        next_cursor = entries[-1]["seq"] if len(rows) > limit else None
+        return entries, next_cursor
+
+    def iter_after(self, after_seq: int = 0, chunk_size: int = 10_000) -> Iterator[List[Dict]]:
+        """
+        Yield entries committed after `after_seq`, oldest first, in chunks.
+
+        Args:
+            after_seq (int): Only entries with a larger seq are returned
+            chunk_size (int): Maximum entries per chunk
+
+        Yields:
+            List[Dict]: Chunks of entries (each with its 'seq'), in commit order
+        """
+        self.flush()
+        chunk_size = max(1, chunk_size)
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"{_SELECT} WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (after_seq, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            chunk = [_row_to_entry(row) for row in rows]
+            after_seq = chunk[-1]["seq"]
+            yield chunk
+
+    def count(self) -> int:
+        """Return the number of stored entries."""
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM detection_logs").fetchone()[0]
+
+    def max_id(self) -> int:
+        """Return the largest stored log id (0 if empty)."""
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM detection_logs").fetchone()[0]
+
+    def seq_for_id(self, log_id: int) -> int:
+        """Return the largest seq among entries with an id up to `log_id` (0 if none)."""
+        self.flush()
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM detection_logs WHERE id <= ?", (log_id,)
+            ).fetchone()[0]
+
+    def seq_of_id(self, log_id: int) -> Optional[int]:
+        """Return the seq of the entry with this log id, or None if it is not stored."""
+        self.flush()
+        with self._lock:
+            row = self._conn.execute("SELECT seq FROM detection_logs WHERE id = ?", (log_id,)).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        """Flush pending entries and close the connection."""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self) -> None:
+        """Rebuild a table from before the seq column, numbering existing rows in id order."""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(detection_logs)")]
+        if not columns or "seq" in columns:
+            return
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute("ALTER TABLE detection_logs RENAME TO detection_logs_old")
+            for index in ("timestamp", "trust_score", "post_id"):
+                self._conn.execute(f"DROP INDEX IF EXISTS idx_detection_logs_{index}")
+            self._conn.execute(_SCHEMA[0])
+            self._conn.execute(
+                f"INSERT INTO detection_logs ({', '.join(_COLUMNS)}) "
+                f"SELECT {', '.join(_COLUMNS)} FROM detection_logs_old ORDER BY id"
+            )
+            self._conn.execute("DROP TABLE detection_logs_old")
+
+    def _flush_periodically(self) -> None:
+        """Background loop that bounds how long an entry stays pending."""
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.ProgrammingError:
+                # Connection was closed
+                return
+            except sqlite3.Error as e:
+                print(f"❌ Error flushing detection logs: {e}")
+
+def _row_to_entry(row: tuple) -> Dict:
+    """Turn a (seq, *columns) row into an entry dict."""
+    entry = dict(zip(_COLUMNS, row[1:]))
+    entry["seq"] = row[0]
+    return entry
@@ -0,0 +1,321 @@
+# logs/stream.py
+"""
+Live detection feed for Server-Sent Events subscribers.
+The logger publishes each detection once; the event is serialized a single
+time and fanned out to every subscriber's bounded buffer. A short replay
+window lets reconnecting clients resume from their Last-Event-ID, and a
+subscriber that falls behind loses its oldest events rather than growing
+without limit. Detection events use the log record ID as their event ID, so
+resume points match what /logs pages return.
+
+The replay window only holds this process's events. A Last-Event-ID it does
+not hold (after a restart, or a reconnect that lands on another prefork
+worker) is resumed from the log store instead, in its commit (seq) order.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from backend.config import (
+    LOG_STREAM_REPLAY_SIZE, LOG_STREAM_SUBSCRIBER_BUFFER, LOG_STREAM_MAX_SUBSCRIBERS,
+    LOG_STREAM_SUMMARY_INTERVAL_SECONDS
+)
+
+# (log ID, payload) detections committed after a log ID, or None if it is unknown
+HistoryFn = Callable[[int, int], Optional[List[Tuple[int, Dict]]]]
+
+class TooManySubscribers(RuntimeError):
+    """Raised when the stream already has the maximum number of subscribers."""
+
+def format_sse(data: str, event: Optional[str] = None, event_id: Optional[int] = None) -> str:
+    """
+    Format one Server-Sent Events frame.
+
+    Args:
+        data (str): Event payload (single line)
+        event (str, optional): Event type
+        event_id (int, optional): Event ID clients echo back as Last-Event-ID
+
+    Returns:
+        str: The encoded frame
+    """
+    frame = ""
+    if event_id is not None:
+        frame += f"id: {event_id}\n"
+    if event:
+        frame += f"event: {event}\n"
+    return frame + f"data: {data}\n\n"
+
+class Subscriber:
+    """
+    One stream client: a bounded buffer of pending frames and a wake-up event.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int):
+        self.loop = loop
+        self.pending: Deque[Tuple[int, str]] = deque(maxlen=max(1, buffer_size))
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def push(self, event_id: int, frame: str) -> None:
+        """Queue a frame, dropping the oldest one if the buffer is full. Caller holds the broadcaster lock."""
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append((event_id, frame))
+
+    def wake(self) -> None:
+        """Signal the subscriber's event loop from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self.ready.set)
+        except RuntimeError:
+            # Event loop already closed
+            pass
+
+class DetectionBroadcaster:
+    """
+    Fans published events out to SSE subscribers, with a replay window for resumes.
+    """
+
+    def __init__(self, replay_size: int = 1000, buffer_size: int = 256, max_subscribers: int = 100,
+                 history_fn: Optional[HistoryFn] = None):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            replay_size (int): Recent events kept for Last-Event-ID resumes
+            buffer_size (int): Maximum undelivered frames per subscriber
+            max_subscribers (int): Maximum concurrent subscribers
+            history_fn (HistoryFn, optional): Returns up to N detections committed after a
+                                              log ID (blocking); used for resumes outside the window
+        """
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.history_fn = history_fn
+
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._replay: Deque[Tuple[int, str]] = deque(maxlen=max(0, replay_size))
+        self._subscribers: List[Subscriber] = []
+        self._published = 0
+        self._dropped = 0
+
+    def publish(self, event: str, payload: Dict, event_id: Optional[int] = None) -> int:
+        """
+        Send an event to every subscriber. Safe to call from any thread.
+
+        Args:
+            event (str): Event type
+            payload (Dict): JSON-serializable event data
+            event_id (int, optional): Event ID (defaults to one past the highest ID published so far)
+
+        Returns:
+            int: The event ID
+        """
+        data = json.dumps(payload, default=str)
+        with self._lock:
+            if event_id is None:
+                event_id = self._last_id + 1
+            self._last_id = max(self._last_id, event_id)
+            frame = format_sse(data, event, event_id)
+            self._replay.append((event_id, frame))
+            self._published += 1
+            subscribers = list(self._subscribers)
+            for subscriber in subscribers:
+                subscriber.push(event_id, frame)
+
+        for subscriber in subscribers:
+            subscriber.wake()
+        return event_id
+
+    def subscribe(self, last_event_id: Optional[int] = None,
+                  loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscriber:
+        """
+        Register a subscriber. A resume point outside the replay window is
+        looked up through history_fn, which blocks: call this off the event
+        loop (passing the loop) when a history_fn is set.
+
+        Args:
+            last_event_id (int, optional): Resume after this event ID
+            loop (AbstractEventLoop, optional): Loop the subscriber is read on (default: the running loop)
+
+        Returns:
+            Subscriber: The new subscriber
+
+        Raises:
+            TooManySubscribers: If max_subscribers are already connected
+        """
+        subscriber = Subscriber(loop or asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribers(f"Log stream is limited to {self.max_subscribers} subscribers")
+            from_history = (
+                last_event_id is not None and self.history_fn is not None
+                and all(event_id != last_event_id for event_id, _ in self._replay)
+            )
+            if last_event_id is not None and not from_history:
+                for event_id, frame in self._frames_after(last_event_id):
+                    subscriber.push(event_id, frame)
+            # Registered before the history lookup, so nothing published meanwhile is missed
+            self._subscribers.append(subscriber)
+
+        if from_history:
+            self._backfill(subscriber, last_event_id)
+        if subscriber.pending:
+            subscriber.wake()
+        return subscriber
+
+    def _backfill(self, subscriber: Subscriber, last_event_id: int) -> None:
+        """
+        Queue the stored detections committed after `last_event_id` ahead of
+        anything published since the subscriber registered, without duplicates.
+        Falls back to the replay window when the store does not know the ID.
+        """
+        try:
+            history = self.history_fn(last_event_id, self._replay.maxlen or self.buffer_size)
+        except Exception as e:
+            print(f"❌ Could not load stream history after event {last_event_id}: {e}")
+            history = None
+
+        with self._lock:
+            if history is None:
+                frames = self._frames_after(last_event_id)
+            else:
+                frames = [
+                    (event_id, format_sse(json.dumps(payload, default=str), "detection", event_id))
+                    for event_id, payload in history
+                ]
+            seen = {event_id for event_id, _ in frames}
+            published = [entry for entry in subscriber.pending if entry[0] not in seen]
+            subscriber.pending.clear()
+            for event_id, frame in frames + published:
+                subscriber.push(event_id, frame)
+
+    def _frames_after(self, last_event_id: int) -> List[Tuple[int, str]]:
+        """
+        Replay frames published after the given event. Concurrent detections
+        can publish their IDs slightly out of order, so the resume point is
+        located by position; an ID no longer retained falls back to comparing IDs.
+        Caller holds the lock.
+        """
+        replay = list(self._replay)
+        for index, (event_id, _) in enumerate(replay):
+            if event_id == last_event_id:
+                return replay[index + 1:]
+        return [(event_id, frame) for event_id, frame in replay if event_id > last_event_id]
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a subscriber and record how many events it lost."""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+                self._dropped += subscriber.dropped
+
+    async def next_frames(self, subscriber: Subscriber, timeout: float) -> List[str]:
+        """
+        Wait up to `timeout` seconds for frames and return all that are pending.
+
+        Args:
+            subscriber (Subscriber): The waiting subscriber
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            List[str]: Pending frames (empty on timeout)
+        """
+        try:
+            await asyncio.wait_for(subscriber.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._lock:
+            subscriber.ready.clear()
+            frames = [frame for _, frame in subscriber.pending]
+            subscriber.pending.clear()
+        return frames
+
+    def get_stats(self) -> Dict:
+        """Get subscriber count and published/dropped event counts."""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published,
+                "replay_window": len(self._replay),
+                "dropped": self._dropped + sum(subscriber.dropped for subscriber in self._subscribers)
+            }
+
+def summary_delta(previous: Dict, current: Dict) -> Dict:
+    """Return the keys of `current` whose values differ from `previous`."""
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+async def sse_event_stream(broadcaster: DetectionBroadcaster, subscriber: Subscriber,
+                           summary_fn: Callable[[], Dict],
+                           summary_interval: float = LOG_STREAM_SUMMARY_INTERVAL_SECONDS) -> AsyncIterator[str]:
+    """
+    Yield SSE frames for one subscriber: detections as they arrive, a full
+    summary on connect and only changed summary fields afterwards. A comment
+    line is sent when nothing changed, to keep proxies from closing the connection.
+
+    Args:
+        broadcaster (DetectionBroadcaster): Event source
+        subscriber (Subscriber): Subscriber returned by broadcaster.subscribe()
+        summary_fn (Callable[[], Dict]): Returns the current log summary
+        summary_interval (float): Seconds between summary checks
+
+    Yields:
+        str: Encoded SSE frames
+    """
+    try:
+        yield "retry: 3000\n\n"
+
+        last_summary = summary_fn()
+        yield format_sse(json.dumps(last_summary, default=str), "summary")
+        next_summary_at = time.monotonic() + summary_interval
+
+        while True:
+            frames = await broadcaster.next_frames(subscriber, max(0.0, next_summary_at - time.monotonic()))
+            if frames:
+                yield "".join(frames)
+
+            if time.monotonic() >= next_summary_at:
+                current = summary_fn()
+                delta = summary_delta(last_summary, current)
+                if delta:
+                    yield format_sse(json.dumps(delta, default=str), "summary")
+                    last_summary = current
+                elif not frames:
+                    yield ": keepalive\n\n"
+                next_summary_at = time.monotonic() + summary_interval
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+# Global instance for reuse
+_broadcaster_instance = None
+_broadcaster_lock = threading.Lock()
+
+def get_broadcaster() -> DetectionBroadcaster:
+    """Get or create the global detection broadcaster."""
+    global _broadcaster_instance
+    if _broadcaster_instance is None:
+        with _broadcaster_lock:
+            if _broadcaster_instance is None:
+                # Imported here: the logger publishes through this module
+                from backend.logs.logger import get_detections_after
+
+                _broadcaster_instance = DetectionBroadcaster(
+                    replay_size=LOG_STREAM_REPLAY_SIZE,
+                    buffer_size=LOG_STREAM_SUBSCRIBER_BUFFER,
+                    max_subscribers=LOG_STREAM_MAX_SUBSCRIBERS,
+                    history_fn=get_detections_after
+                )
+    return _broadcaster_instance
+
+def _reset_after_fork() -> None:
+    """Start a forked worker without the parent's subscribers and replay buffer."""
+    global _broadcaster_instance, _broadcaster_lock
+    _broadcaster_instance, _broadcaster_lock = None, threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
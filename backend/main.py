@@ -1,16 +1,38 @@
 
-from fastapi import FastAPI, Form, File, UploadFile
-from fastapi.responses import HTMLResponse
+import time
+
+# Start of the app import, for the startup profile
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Form, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from contextlib import asynccontextmanager
 import asyncio
-import time
-import os
-import tempfile
-import shutil
+import json
+from typing import Optional
 
 from backend.agent import AutonomousAgent
-from backend.logs.logger import log_system_event, get_logs, get_logs_summary, get_logs_by_trust_range
-from backend.config import DEBUG, API_HOST, API_PORT
+from backend.logs.logger import (
+    log_system_event, get_logs_page, get_logs_summary, get_logs_by_trust_range,
+    get_trust_stats, get_log_writer_stats, shutdown_log_writer, close_log_store
+)
+from backend.detection.pipeline import (
+    get_text_batching_stats, get_model_status, get_verdict_cache_stats,
+    get_cascade_stats, get_embedding_cache_stats, get_transcription_stats, shutdown_detection_workers
+)
+from backend.logs.stream import get_broadcaster, sse_event_stream, TooManySubscribers
+from backend.id_allocator import get_id_allocator_stats
+from backend.executor import run_inference, get_inference_executor, shutdown_inference_executor, InferenceOverloaded
+from backend.media import parse_media_form, MediaRejected
+from backend.metrics import observe_stage, render_metrics
+from backend.tracing import request_trace, get_trace, list_traces
+from backend.ingest import iter_bulk_items, item_to_post_fields, IngestError
+from backend.detection.model_registry import parse_model_names
+from backend.startup import get_startup_profile, get_model_warmup, start_model_warmup, WARMUP_POLICIES
+from backend.config import (
+    DEBUG, API_HOST, API_PORT, BULK_BATCH_SIZE, WARMUP_ENABLED, WARMUP_MODELS, WARMUP_POLICY,
+    WARMUP_QUEUE_TIMEOUT_SECONDS, TRACE_HEADER
+)
 
 agent_instance = None
 
@@ -20,14 +42,27 @@ async def lifespan(app: FastAPI):
     Manage application lifespan: initialize agent on startup, cleanup on shutdown.
     """
     global agent_instance
+    started = time.perf_counter()
     log_system_event("STARTUP", "Initializing autonomous AI agent...")
     agent_instance = AutonomousAgent()
     log_system_event("STARTUP", "🚀 Autonomous AI agent initialized successfully")
+    get_startup_profile().record("startup:agent", started)
+    
+    # Load models in the background; requests meanwhile follow WARMUP_POLICY
+    if WARMUP_ENABLED:
+        if WARMUP_POLICY not in WARMUP_POLICIES:
+            log_system_event("STARTUP", f"⚠️ Unknown WARMUP_POLICY '{WARMUP_POLICY}', rejecting requests until warm")
+        start_model_warmup(parse_model_names(WARMUP_MODELS))
+        log_system_event("STARTUP", f"🔥 Warming up models in the background: {WARMUP_MODELS}")
     try:
         yield
     finally:
+        shutdown_inference_executor(wait=False)
+        shutdown_detection_workers()
         if agent_instance:
             log_system_event("SHUTDOWN", "🛑 Autonomous AI agent stopped")
+        shutdown_log_writer()
+        close_log_store()
 
 app = FastAPI(
     title="Autonomous AI Misinformation Detection Engine",
@@ -48,89 +83,207 @@ async def root():
         "debug_mode": DEBUG
     }
 
+async def _warmup_gate() -> Optional[JSONResponse]:
+    """
+    Apply WARMUP_POLICY to a request arriving before the model warm-up has finished.
+    
+    Returns:
+        JSONResponse or None: A 503 to send instead, or None to go ahead
+    """
+    warmup = get_model_warmup()
+    if warmup is None or warmup.ready or WARMUP_POLICY == "fallback":
+        return None
+    if WARMUP_POLICY == "queue" and await warmup.wait_ready(WARMUP_QUEUE_TIMEOUT_SECONDS):
+        return None
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "5"},
+        content={"error": "Models are still loading", "warmup": warmup.get_status()}
+    )
+
+def _profiling_requested(request: Request) -> bool:
+    """Return True if the request asks for a timing breakdown (?profile=1 or the TRACE_HEADER header)."""
+    flag = request.query_params.get("profile") or request.headers.get(TRACE_HEADER) or ""
+    return flag.lower() in ("1", "true", "yes", "on")
+
+def _with_profile(response, trace):
+    """Add the trace's per-stage breakdown to a successful JSON response."""
+    if trace is not None and isinstance(response, dict):
+        response["profile"] = trace.breakdown()
+    return response
+
 @app.post("/analyze")
-async def analyze_content(content: str = Form(...), content_type: str = Form("text")):
+async def analyze_content(request: Request, content: str = Form(...), content_type: str = Form("text")):
     """
     Analyze content sent from frontend and return trust score and classification.
+    With ?profile=1 (or the X-Profile header) the response includes a per-stage timing breakdown.
     """
+    with request_trace("POST /analyze", _profiling_requested(request)) as trace:
+        response = await _analyze_content(content, content_type)
+    return _with_profile(response, trace)
+
+async def _analyze_content(content: str, content_type: str):
     if not agent_instance:
         return {"error": "Agent not initialized"}
     
+    rejected = await _warmup_gate()
+    if rejected:
+        return rejected
+    
     try:
-        result = agent_instance.analyze_content(content, content_type)
+        result = await run_inference(agent_instance.analyze_content, content, content_type)
         return {
             "success": True,
             "post_id": result["post_id"],
             "trust_score": result["trust_score"],
             "reason": result["reason"],
-            "timestamp": result["timestamp"]
+            "timestamp": result["timestamp"],
+            # Long-text windowing details; None when the pre-screen decided without the model
+            "window_count": result.get("window_count"),
+            "padding_efficiency": result.get("padding_efficiency")
         }
+    except InferenceOverloaded as e:
+        return JSONResponse(status_code=503, content={"error": f"Analysis failed: {str(e)}"})
     except Exception as e:
         log_system_event("ANALYSIS_ERROR", f"❌ Error analyzing content: {str(e)}")
         return {"error": f"Analysis failed: {str(e)}"}
 
-@app.post("/detect-cross-modal")
-async def detect_cross_modal(
-    text: str = Form(...),
-    image: UploadFile = File(None),
-    audio: UploadFile = File(None)
-):
+class _RequestBodyStreamingResponse(StreamingResponse):
     """
-    Analyze content with cross-modal inconsistency detection.
-    Accepts text, image, and audio files for comprehensive analysis.
+    StreamingResponse that does not listen for client disconnects.
+    The default one consumes `receive` in the background, which would race with
+    the endpoint still reading the request body while results are streamed.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: Request):
+    """
+    Analyze many posts in one request.
+    
+    Accepts a JSON array or an NDJSON body whose items are strings or objects
+    with 'content' (and optional 'content_type' and 'id'). Posts are fed through
+    the pipeline in model-sized batches and results are streamed back as NDJSON
+    as each batch completes.
     """
     if not agent_instance:
         return {"error": "Agent not initialized"}
     
-    try:
-        # Create temporary files for uploaded content
-        temp_files = []
-        image_path = None
-        audio_path = None
-        
-        # Save image file if provided
-        if image:
-            temp_image = tempfile.NamedTemporaryFile(delete=False, suffix=f".{image.filename.split('.')[-1]}")
-            shutil.copyfileobj(image.file, temp_image)
-            temp_image.close()
-            image_path = temp_image.name
-            temp_files.append(image_path)
+    rejected = await _warmup_gate()
+    if rejected:
+        return rejected
+    
+    async def stream_results():
+        batch = []
+        index = 0
         
-        # Save audio file if provided
-        if audio:
-            temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix=f".{audio.filename.split('.')[-1]}")
-            shutil.copyfileobj(audio.file, temp_audio)
-            temp_audio.close()
-            audio_path = temp_audio.name
-            temp_files.append(audio_path)
+        async def flush(items):
+            results = await run_inference(agent_instance.analyze_batch, items)
+            lines = []
+            for item, result in zip(items, results):
+                line = {"index": item["index"], **result}
+                if "external_id" in item:
+                    line["external_id"] = item["external_id"]
+                lines.append(json.dumps(line))
+            return "\n".join(lines) + "\n"
         
         try:
-            # Import the cross-modal analysis function
-            from backend.detection.pipeline import analyze_post_with_cross_modal
+            parse_error = None
+            try:
+                async for raw_item in iter_bulk_items(request.stream()):
+                    try:
+                        fields = item_to_post_fields(raw_item)
+                    except IngestError as e:
+                        yield json.dumps({"index": index, "error": str(e)}) + "\n"
+                        index += 1
+                        continue
+                    
+                    fields["index"] = index
+                    index += 1
+                    batch.append(fields)
+                    
+                    if len(batch) >= BULK_BATCH_SIZE:
+                        yield await flush(batch)
+                        batch = []
+            except IngestError as e:
+                parse_error = e
             
-            # Create post object
-            post = {
-                "id": agent_instance._post_id_counter,
-                "author": "frontend_user",
-                "content_type": "multimodal",
-                "language": "en",
-                "content": text,
-                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
-            }
-            
-            # Analyze with cross-modal detection
-            result = analyze_post_with_cross_modal(post, image_path, audio_path)
-            
-            # Increment counter
-            agent_instance._post_id_counter += 1
-            agent_instance.posts_processed += 1
+            # Items parsed before a malformed tail still get their results
+            if batch:
+                yield await flush(batch)
             
-            # Log the detection result
-            from backend.logs.logger import log_detection
-            log_detection(result)
-            
-            if DEBUG:
-                log_system_event("CROSS_MODAL_ANALYSIS", f"📊 Cross-modal analysis completed for text: {text[:50]}...")
+            if parse_error:
+                yield json.dumps({"error": f"Batch analysis stopped: {str(parse_error)}"}) + "\n"
+        
+        except InferenceOverloaded as e:
+            yield json.dumps({"error": f"Batch analysis stopped: {str(e)}"}) + "\n"
+        except Exception as e:
+            log_system_event("BATCH_ANALYSIS_ERROR", f"❌ Error in batch analysis: {str(e)}")
+            yield json.dumps({"error": f"Batch analysis failed: {str(e)}"}) + "\n"
+    
+    return _RequestBodyStreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/detect-cross-modal", openapi_extra={
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["text"],
+                    "properties": {
+                        "text": {"type": "string"},
+                        "image": {"type": "string", "format": "binary"},
+                        "audio": {"type": "string", "format": "binary"}
+                    }
+                }
+            }
+        }
+    }
+})
+async def detect_cross_modal(request: Request):
+    """
+    Analyze content with cross-modal inconsistency detection.
+    Accepts text, image, and audio files for comprehensive analysis.
+    
+    The multipart body is parsed as it streams in: uploads are hashed while
+    reading, unsupported formats are rejected with 415 from their first bytes,
+    and oversized or overlong uploads with 413 as soon as a limit is exceeded.
+    With ?profile=1 (or the X-Profile header) the response includes a per-stage timing breakdown.
+    """
+    with request_trace("POST /detect-cross-modal", _profiling_requested(request)) as trace:
+        response = await _detect_cross_modal(request)
+    return _with_profile(response, trace)
+
+async def _detect_cross_modal(request: Request):
+    if not agent_instance:
+        return {"error": "Agent not initialized"}
+    
+    rejected = await _warmup_gate()
+    if rejected:
+        return rejected
+    
+    try:
+        with observe_stage("cross_modal.upload"):
+            form = await parse_media_form(
+                request.stream(), request.headers.get("content-type", ""), request.headers.get("content-length")
+            )
+    except MediaRejected as e:
+        return JSONResponse(status_code=e.status_code, content={"error": str(e)})
+    
+    with form:
+        text = form.fields.get("text")
+        if text is None:
+            return JSONResponse(status_code=422, content={"error": "Missing form field 'text'"})
+        
+        try:
+            result = await run_inference(
+                agent_instance.analyze_cross_modal, text, form.files.get("image"), form.files.get("audio")
+            )
             
             return {
                 "success": True,
@@ -142,39 +295,64 @@ async def detect_cross_modal(
                 "similarity_scores": result.get("similarity_scores", {}),
                 "cross_modal_details": result.get("cross_modal_analysis", {})
             }
-            
-        finally:
-            # Clean up temporary files
-            for temp_file in temp_files:
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
-    
-    except Exception as e:
-        log_system_event("CROSS_MODAL_ERROR", f"❌ Error in cross-modal analysis: {str(e)}")
-        return {"error": f"Cross-modal analysis failed: {str(e)}"}
+        
+        except InferenceOverloaded as e:
+            return JSONResponse(status_code=503, content={"error": f"Cross-modal analysis failed: {str(e)}"})
+        except Exception as e:
+            log_system_event("CROSS_MODAL_ERROR", f"❌ Error in cross-modal analysis: {str(e)}")
+            return {"error": f"Cross-modal analysis failed: {str(e)}"}
 
 @app.get("/logs")
-async def get_detection_logs(limit: int = 20):
+async def get_detection_logs(limit: int = 20, cursor: Optional[int] = None):
     """
     Get recent detection logs for monitoring.
+    Pass the returned next_cursor as cursor to page back through older logs.
     """
-    logs = get_logs(limit=limit)
+    # Pages come from the log store in commit order, so cursors stay valid across workers;
+    # the SQLite query runs off the event loop
+    page = await asyncio.to_thread(get_logs_page, cursor=cursor, limit=limit)
+    logs, next_cursor = page["logs"], page["next_cursor"]
     summary = get_logs_summary()
     
     return {
         "recent_logs": logs,
         "summary": summary,
-        "total_logs_retrieved": len(logs)
+        "total_logs_retrieved": len(logs),
+        "next_cursor": next_cursor
     }
 
+@app.get("/logs/stream")
+async def stream_logs(request: Request, last_event_id: Optional[int] = None):
+    """
+    Stream new detections and summary changes as Server-Sent Events.
+    Reconnecting clients resume from the Last-Event-ID header (or last_event_id query parameter);
+    a resume point this worker no longer holds is replayed from the shared log store in commit order.
+    In production mode live events are the detections of the worker that accepted the stream.
+    """
+    header_id = request.headers.get("last-event-id")
+    if header_id and header_id.isdigit():
+        last_event_id = int(header_id)
+    
+    broadcaster = get_broadcaster()
+    try:
+        # A resume may read the log store, so subscribe off the event loop
+        subscriber = await asyncio.to_thread(broadcaster.subscribe, last_event_id, asyncio.get_running_loop())
+    except TooManySubscribers as e:
+        return JSONResponse(status_code=503, content={"error": str(e)})
+    
+    return StreamingResponse(
+        sse_event_stream(broadcaster, subscriber, get_logs_summary),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/logs/low-trust")
 async def get_low_trust_logs(limit: int = 10):
     """
     Get logs with low trust scores (potential misinformation).
     """
-    logs = get_logs_by_trust_range(min_trust=0, max_trust=30, limit=limit)
+    # May fall back to several log store queries, so run it off the event loop
+    logs = await asyncio.to_thread(get_logs_by_trust_range, min_trust=0, max_trust=30, limit=limit)
     
     return {
         "low_trust_logs": logs,
@@ -182,6 +360,14 @@ async def get_low_trust_logs(limit: int = 10):
         "threshold": "0-30% trust score"
     }
 
+@app.get("/stats")
+async def get_stats():
+    """
+    Get trust-score p50/p95, classification rates and detections per minute
+    over the last 1 minute, 15 minutes and 24 hours, for the worker that answers.
+    """
+    return get_trust_stats()
+
 @app.get("/status")
 async def get_status():
     """
@@ -190,9 +376,81 @@ async def get_status():
     return {
         "agent_running": agent_instance is not None,
         "posts_processed": agent_instance.posts_processed if agent_instance else 0,
+        "text_batching": get_text_batching_stats(),
+        "inference_pool": get_inference_executor().get_stats(),
+        "models": get_model_status(),
+        "verdict_cache": get_verdict_cache_stats(),
+        "cascade": get_cascade_stats(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "transcription": get_transcription_stats(),
+        "log_writer": get_log_writer_stats(),
+        "log_stream": get_broadcaster().get_stats(),
+        "id_allocation": get_id_allocator_stats(),
+        "warmup": get_model_warmup().get_status() if get_model_warmup() else None,
         "system_status": "healthy"
     }
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics: per-stage latency histograms, queue depths, cache
+    hit ratios, model load state and verdict (including fallback) counts.
+    Counters are per worker; in production mode scrape each worker on its
+    METRICS_PORT_BASE port rather than this shared port.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/traces")
+async def traces():
+    """
+    Recently profiled requests, newest first.
+    """
+    return {"traces": list_traces()}
+
+@app.get("/traces/{trace_id}")
+async def trace_export(trace_id: str):
+    """
+    Spans of a profiled request as Chrome trace JSON, for chrome://tracing or Perfetto.
+    """
+    trace = get_trace(trace_id)
+    if trace is None:
+        return JSONResponse(status_code=404, content={"error": f"Trace '{trace_id}' not found"})
+    return JSONResponse(
+        content=trace.to_chrome_trace(),
+        headers={"Content-Disposition": f'inline; filename="trace-{trace_id}.json"'}
+    )
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once the agent is up and the background model
+    warm-up has finished, 503 before that.
+    """
+    warmup = get_model_warmup()
+    is_ready = agent_instance is not None and (warmup is None or warmup.ready)
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "ready": is_ready,
+            "warmup": warmup.get_status() if warmup else None,
+            "policy": WARMUP_POLICY
+        }
+    )
+
+@app.get("/startup-profile")
+async def startup_profile():
+    """
+    Per-phase startup timings: app import, agent startup, library imports
+    and model loads from the background warm-up.
+    """
+    warmup = get_model_warmup()
+    return {
+        **get_startup_profile().snapshot(),
+        "warmup": warmup.get_status() if warmup else None
+    }
+
+get_startup_profile().record("import:app", _import_started)
+
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Starting Autonomous AI Misinformation Detection Engine")
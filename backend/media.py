@@ -0,0 +1,457 @@
+# backend/media.py
+"""
+In-memory handling of uploaded media for /detect-cross-modal.
+Request bodies are parsed as a stream: each file part is hashed as it
+arrives, its format is sniffed from the first bytes, and per-modality size
+and duration limits are enforced while reading, so unsupported or oversized
+uploads are rejected before the rest of the body is read. Accepted files are
+kept as bytes so images decode straight from memory and audio is piped to
+ffmpeg without a temp file. Only uploads larger than
+MEDIA_SPOOL_THRESHOLD_BYTES are spooled to a temporary file, which is always
+removed when the MediaInput is closed.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Union
+
+from backend.config import (
+    MEDIA_SPOOL_THRESHOLD_BYTES, MEDIA_IMAGE_MAX_BYTES, MEDIA_AUDIO_MAX_BYTES,
+    MEDIA_AUDIO_MAX_SECONDS, MEDIA_TEXT_MAX_BYTES
+)
+
+try:
+    from python_multipart.exceptions import FormParserError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    from multipart.exceptions import FormParserError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+_READ_CHUNK_BYTES = 1 << 20
+
+# Bytes needed to identify every supported format
+_SNIFF_BYTES = 12
+
+# Bytes kept for reading container headers (WAV/FLAC duration)
+_HEADER_BYTES = 4096
+
+class MediaRejected(ValueError):
+    """Raised when an upload is refused; status_code is 413 (too large), 415 (unsupported) or 422 (malformed form)."""
+
+    def __init__(self, message: str, status_code: int = 415):
+        super().__init__(message)
+        self.status_code = status_code
+
+class MediaInput:
+    """
+    One uploaded file, held in memory or spooled to disk. Use as a context
+    manager (or call close()) to guarantee the spool file is removed.
+    """
+
+    def __init__(self, filename: Optional[str], data: Optional[bytes] = None, path: Optional[str] = None,
+                 sha256: Optional[str] = None, size: int = 0, media_format: Optional[str] = None,
+                 duration: Optional[float] = None):
+        self.filename = filename
+        self.data = data
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.format = media_format
+        self.duration = duration
+
+    @property
+    def in_memory(self) -> bool:
+        return self.data is not None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """The raw bytes when held in memory, otherwise the spool file path."""
+        return self.data if self.data is not None else self.path
+
+    def close(self) -> None:
+        """Release the buffer and delete the spool file, if any."""
+        self.data = None
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def __enter__(self) -> "MediaInput":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+def sniff_format(head: bytes) -> Optional[str]:
+    """
+    Identify a media format from its leading magic bytes.
+
+    Args:
+        head (bytes): At least the first 12 bytes of the file
+
+    Returns:
+        str or None: "png", "jpeg", "gif", "webp", "bmp", "wav", "mp3", "ogg",
+                     "flac", "mp4" or "webm", or None if unrecognized
+    """
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "webp"
+    if head.startswith(b"RIFF") and head[8:12] == b"WAVE":
+        return "wav"
+    if head.startswith(b"BM"):
+        return "bmp"
+    if head.startswith(b"ID3") or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if head.startswith(b"OggS"):
+        return "ogg"
+    if head.startswith(b"fLaC"):
+        return "flac"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"
+    return None
+
+# Formats accepted for each upload modality
+MODALITY_FORMATS = {
+    "image": {"png", "jpeg", "gif", "webp", "bmp"},
+    "audio": {"wav", "mp3", "ogg", "flac", "mp4", "webm"}
+}
+
+def audio_duration(head: bytes, media_format: str) -> Optional[float]:
+    """
+    Read the duration of a WAV or FLAC file from its header.
+    Other formats need decoding to measure and return None.
+
+    Args:
+        head (bytes): The first bytes of the file (up to a few KB)
+        media_format (str): Format from sniff_format()
+
+    Returns:
+        float or None: Duration in seconds, if the header states it
+    """
+    if media_format == "wav":
+        byte_rate = data_size = None
+        pos = 12
+        while pos + 8 <= len(head):
+            chunk_id, chunk_size = head[pos:pos + 4], struct.unpack("<I", head[pos + 4:pos + 8])[0]
+            if chunk_id == b"fmt " and pos + 16 <= len(head):
+                byte_rate = struct.unpack("<I", head[pos + 16:pos + 20])[0] if pos + 20 <= len(head) else None
+            elif chunk_id == b"data":
+                data_size = chunk_size
+                break
+            pos += 8 + chunk_size + (chunk_size & 1)
+        if byte_rate and data_size and data_size != 0xFFFFFFFF:
+            return data_size / byte_rate
+    elif media_format == "flac" and len(head) >= 26:
+        info = head[8:42]
+        sample_rate = (info[10] << 12) | (info[11] << 4) | (info[12] >> 4)
+        total_samples = ((info[13] & 0x0F) << 32) | struct.unpack(">I", info[14:18])[0]
+        if sample_rate and total_samples:
+            return total_samples / sample_rate
+    return None
+
+class MediaWriter:
+    """
+    Incrementally receives one upload: hashes it, sniffs its format, enforces
+    limits and keeps it in memory or spools it to disk.
+    """
+
+    def __init__(self, filename: Optional[str], modality: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_seconds: Optional[float] = None, spool_threshold: int = MEDIA_SPOOL_THRESHOLD_BYTES):
+        """
+        Args:
+            filename (str, optional): Original filename, used for the spool file suffix
+            modality (str, optional): "image" or "audio" to check the format (None accepts anything)
+            max_bytes (int, optional): Largest accepted size
+            max_seconds (float, optional): Longest accepted audio duration, when the header states it
+            spool_threshold (int): Largest size kept in memory
+        """
+        self.filename = filename
+        self.modality = modality
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.spool_threshold = spool_threshold
+
+        self._digest = hashlib.sha256()
+        self._chunks: List[bytes] = []
+        self._head = b""
+        self._size = 0
+        self._spool = None
+        self._format: Optional[str] = None
+        self._sniffed = modality is None
+        self._duration: Optional[float] = None
+        self._duration_checked = modality != "audio"
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def write(self, chunk: bytes) -> None:
+        """
+        Add the next chunk of the upload.
+
+        Raises:
+            MediaRejected: As soon as the upload is known to be unsupported or too large
+        """
+        if not chunk:
+            return
+        self._size += len(chunk)
+        if self.max_bytes is not None and self._size > self.max_bytes:
+            raise MediaRejected(f"{(self.modality or 'File').capitalize()} upload exceeds the "
+                                f"{self.max_bytes} byte limit", 413)
+
+        if len(self._head) < _HEADER_BYTES:
+            self._head += chunk[:_HEADER_BYTES - len(self._head)]
+        if not self._sniffed and len(self._head) >= _SNIFF_BYTES:
+            self._check_format()
+        if not self._duration_checked and len(self._head) >= _HEADER_BYTES:
+            self._check_duration()
+
+        self._digest.update(chunk)
+        if self._spool is None and self._size > self.spool_threshold:
+            self._spool = tempfile.NamedTemporaryFile(delete=False, suffix=_suffix(self.filename))
+            self._spool.writelines(self._chunks)
+            self._chunks = []
+        if self._spool is not None:
+            self._spool.write(chunk)
+        else:
+            self._chunks.append(chunk)
+
+    def finish(self) -> MediaInput:
+        """
+        Complete the upload.
+
+        Returns:
+            MediaInput: The upload, in memory or spooled
+
+        Raises:
+            MediaRejected: If a short upload turns out to be unsupported or too long
+        """
+        if not self._sniffed:
+            self._check_format()
+        if not self._duration_checked:
+            self._check_duration()
+
+        if self._spool is not None:
+            self._spool.close()
+            path, self._spool = self._spool.name, None
+            return MediaInput(self.filename, path=path, sha256=self._digest.hexdigest(), size=self._size,
+                              media_format=self._format, duration=self._duration)
+
+        data, self._chunks = b"".join(self._chunks), []
+        return MediaInput(self.filename, data=data, sha256=self._digest.hexdigest(), size=self._size,
+                          media_format=self._format, duration=self._duration)
+
+    def abort(self) -> None:
+        """Discard the upload and remove any spool file."""
+        self._chunks = []
+        if self._spool is not None:
+            self._spool.close()
+            try:
+                os.unlink(self._spool.name)
+            except OSError:
+                pass
+            self._spool = None
+
+    def _check_format(self) -> None:
+        self._sniffed = True
+        self._format = sniff_format(self._head)
+        allowed = MODALITY_FORMATS.get(self.modality, set())
+        if self._format not in allowed:
+            raise MediaRejected(f"Unsupported {self.modality} format; expected one of: {', '.join(sorted(allowed))}",
+                                415)
+
+    def _check_duration(self) -> None:
+        self._duration_checked = True
+        self._duration = audio_duration(self._head, self._format)
+        if self.max_seconds and self._duration and self._duration > self.max_seconds:
+            raise MediaRejected(f"Audio upload is {self._duration:.0f}s long; the limit is "
+                                f"{self.max_seconds:.0f}s", 413)
+
+def _suffix(filename: Optional[str]) -> str:
+    """File extension (with dot) to give a spool file, so decoders can sniff the format."""
+    extension = os.path.splitext(filename or "")[1]
+    return extension if extension.isascii() and len(extension) <= 10 else ""
+
+def read_media(stream: BinaryIO, filename: Optional[str] = None, modality: Optional[str] = None,
+               max_bytes: Optional[int] = None, spool_threshold: int = MEDIA_SPOOL_THRESHOLD_BYTES) -> MediaInput:
+    """
+    Read a file object in chunks, hashing it in the same pass. Files up to
+    `spool_threshold` bytes stay in memory; larger ones are written to a
+    temporary file as they are read.
+
+    Args:
+        stream (BinaryIO): Readable binary file object
+        filename (str, optional): Original filename, used for the spool file suffix
+        modality (str, optional): "image" or "audio" to check the format
+        max_bytes (int, optional): Largest accepted size
+        spool_threshold (int): Largest size kept in memory
+
+    Returns:
+        MediaInput: The upload, in memory or spooled
+
+    Raises:
+        MediaRejected: If the file is unsupported or too large
+    """
+    writer = MediaWriter(filename, modality, max_bytes, spool_threshold=spool_threshold)
+    try:
+        for chunk in iter(lambda: stream.read(_READ_CHUNK_BYTES), b""):
+            writer.write(chunk)
+        return writer.finish()
+    except BaseException:
+        writer.abort()
+        raise
+
+# Multipart file fields accepted by /detect-cross-modal: field name -> (modality, max bytes, max seconds)
+CROSS_MODAL_FILE_FIELDS = {
+    "image": ("image", MEDIA_IMAGE_MAX_BYTES, None),
+    "audio": ("audio", MEDIA_AUDIO_MAX_BYTES, MEDIA_AUDIO_MAX_SECONDS)
+}
+
+# Allowance for multipart boundaries, part headers and small form fields
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class MediaForm:
+    """
+    Parsed multipart form: text fields and uploaded files.
+    Use as a context manager to close every file.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, str] = {}
+        self.files: Dict[str, MediaInput] = {}
+
+    def close(self) -> None:
+        for media in self.files.values():
+            media.close()
+
+    def __enter__(self) -> "MediaForm":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+async def parse_media_form(chunks: AsyncIterator[bytes], content_type: str, content_length: Optional[str] = None,
+                           file_fields: Dict = CROSS_MODAL_FILE_FIELDS,
+                           max_field_bytes: int = MEDIA_TEXT_MAX_BYTES) -> MediaForm:
+    """
+    Parse a multipart/form-data body as it streams in, enforcing upload limits.
+    A declared Content-Length above the combined limits is refused before any
+    body is read; otherwise parsing stops at the first part that breaks a limit.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Raw request body chunks
+        content_type (str): The request Content-Type header
+        content_length (str, optional): The request Content-Length header
+        file_fields (Dict): Accepted file fields -> (modality, max bytes, max seconds)
+        max_field_bytes (int): Largest accepted text field
+
+    Returns:
+        MediaForm: Text fields and files (files with an empty filename and body are skipped)
+
+    Raises:
+        MediaRejected: If the body is not multipart or is malformed or truncated, a part is
+                       unsupported or too large, or a file field is sent twice
+    """
+    mime_type, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if mime_type != b"multipart/form-data" or not boundary:
+        raise MediaRejected("Expected a multipart/form-data body", 415)
+
+    if content_length and content_length.isdigit():
+        max_total = sum(limit for _, limit, _ in file_fields.values()) + max_field_bytes + _MULTIPART_OVERHEAD_BYTES
+        if int(content_length) > max_total:
+            raise MediaRejected(f"Request body exceeds the {max_total} byte limit", 413)
+
+    form = MediaForm()
+    state = {"headers": {}, "field": None, "value": b"", "name": None, "writer": None, "text": None, "open": False}
+    writers: List[MediaWriter] = []
+
+    def on_part_begin():
+        state.update(headers={}, field=None, value=b"", name=None, writer=None, text=None, open=True)
+
+    def on_header_field(data, start, end):
+        state["field"] = (state["field"] or b"") + data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["field"].lower()] = state["value"]
+        state["field"], state["value"] = None, b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        name = disposition.get(b"name", b"").decode("utf-8", "replace")
+        filename = disposition.get(b"filename")
+        state["name"] = name
+        if filename is None:
+            state["text"] = bytearray()
+        elif name in file_fields:
+            if name in form.files:
+                # Replacing the first file would leak it (and its spool file); refuse the form instead
+                raise MediaRejected(f"File field '{name}' was sent more than once", 422)
+            modality, max_bytes, max_seconds = file_fields[name]
+            writer = MediaWriter(filename.decode("utf-8", "replace"), modality, max_bytes, max_seconds)
+            writers.append(writer)
+            state["writer"] = writer
+        # Unknown file fields are skipped without buffering
+
+    def on_part_data(data, start, end):
+        if state["writer"] is not None:
+            state["writer"].write(data[start:end])
+        elif state["text"] is not None:
+            state["text"] += data[start:end]
+            if len(state["text"]) > max_field_bytes:
+                raise MediaRejected(f"Form field '{state['name']}' exceeds the {max_field_bytes} byte limit", 413)
+
+    def on_part_end():
+        state["open"] = False
+        writer = state["writer"]
+        if writer is not None:
+            if not writer.filename and writer.size == 0:
+                # Browsers send an empty part for a file input left blank
+                writers.remove(writer)
+            else:
+                form.files[state["name"]] = writer.finish()
+                writers.remove(writer)
+        elif state["text"] is not None:
+            form.fields[state["name"]] = state["text"].decode("utf-8", "replace")
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end
+    })
+
+    try:
+        try:
+            async for chunk in chunks:
+                parser.write(chunk)
+            parser.finalize()
+        except FormParserError as e:
+            raise MediaRejected("Malformed multipart body", 400) from e
+        if state["open"]:
+            # The body ended inside a part (no closing boundary)
+            raise MediaRejected("Malformed multipart body", 400)
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        form.close()
+        raise
+
+    return form
@@ -0,0 +1,327 @@
+# backend/metrics.py
+"""
+Prometheus text-format metrics without an external client library.
+Stage latencies are recorded into fixed-bucket histograms as they happen
+(one bisect and one locked increment per observation), and into the active
+request trace when the request is being profiled; queue depths, cache
+hit ratios, model load state and verdict counts are read from the existing
+stats functions only when /metrics is scraped.
+
+Everything here is per process. Under the prefork server each worker keeps
+its own counters and /metrics answers from whichever worker accepted the
+connection, so set METRICS_PORT_BASE to have every worker also serve its
+own /metrics on a fixed port, and scrape each of those.
+"""
+
+import bisect
+import functools
+import http.server
+import math
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.tracing import record_span
+
+# Latency buckets in seconds, from sub-millisecond cache hits to long transcriptions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = "hacksky_"
+
+def _escape(value) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _format_labels(labels: Dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+class MetricFamily:
+    """
+    One metric name with its type, help text and labelled samples, as rendered at scrape time.
+    """
+
+    def __init__(self, name: str, metric_type: str, documentation: str):
+        # Counter samples end in _total, and the TYPE line must name them the same way
+        self.name = METRIC_PREFIX + name + ("_total" if metric_type == "counter" else "")
+        self.type = metric_type
+        self.documentation = documentation
+        self.samples: List[Tuple[str, Dict, float]] = []
+
+    def add(self, value: float, suffix: str = "", **labels) -> "MetricFamily":
+        """Add a sample (suffix is e.g. "_bucket" for histogram series; counters already end in _total)."""
+        if value is not None:
+            self.samples.append((suffix, labels, value))
+        return self
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples:
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+class _HistogramSeries:
+    """Bucket counts (non-cumulative, last slot is +Inf), sum and count for one label value."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+class Histogram:
+    """
+    Latency histogram with one label (e.g. stage) and fixed buckets.
+    """
+
+    def __init__(self, name: str, documentation: str, label: str = "stage",
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[str, _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+
+    def time(self, label_value: str, errors: Optional["Counter"] = None) -> "_Timer":
+        """Context manager that observes the time spent inside it (and counts exceptions into `errors`)."""
+        return _Timer(self, label_value, errors)
+
+    def collect(self) -> MetricFamily:
+        """Render the histogram as cumulative _bucket, _sum and _count samples."""
+        family = MetricFamily(self.name, "histogram", self.documentation)
+        with self._lock:
+            snapshot = [(label_value, list(series.counts), series.total, series.count)
+                        for label_value, series in self._series.items()]
+        for label_value, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                family.add(cumulative, "_bucket", **{self.label: label_value, "le": _format_value(bound)})
+            family.add(total, "_sum", **{self.label: label_value})
+            family.add(count, "_count", **{self.label: label_value})
+        return family
+
+    def get_series(self, label_value: str) -> Optional[Dict]:
+        """Get the count, sum and bucket counts recorded for one label value."""
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                return None
+            return {"count": series.count, "sum": series.total, "buckets": list(series.counts)}
+
+class _Timer:
+    """Times a block into a histogram; a slotted class is cheaper than a generator context manager."""
+
+    __slots__ = ("histogram", "label_value", "errors", "started")
+
+    def __init__(self, histogram: Histogram, label_value: str, errors: Optional["Counter"] = None):
+        self.histogram = histogram
+        self.label_value = label_value
+        self.errors = errors
+        self.started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        finished = time.perf_counter()
+        self.histogram.observe(self.label_value, finished - self.started)
+        if exc_type is not None and self.errors is not None:
+            self.errors.inc(self.label_value)
+        record_span(self.label_value, self.started, finished, exc_type is not None)
+
+class Counter:
+    """
+    Monotonic counter with one label.
+    """
+
+    def __init__(self, name: str, documentation: str, label: str):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "counter", self.documentation)
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_value, value in values:
+            family.add(value, **{self.label: label_value})
+        return family
+
+# Latency of every instrumented stage, labelled by stage name
+STAGE_LATENCY = Histogram("stage_duration_seconds", "Time spent in each processing stage.")
+
+# Stage calls that raised, labelled by stage name
+STAGE_ERRORS = Counter("stage_errors", "Processing stage calls that raised an exception.", "stage")
+
+def observe_stage(stage: str) -> _Timer:
+    """
+    Time a block as a processing stage, counting exceptions like timed() does:
+
+        with observe_stage("cross_modal.clip"):
+            ...
+    """
+    return _Timer(STAGE_LATENCY, stage, STAGE_ERRORS)
+
+def timed(stage: str) -> Callable:
+    """Decorator recording a function's latency (and exceptions) under a stage name, and as a trace span."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                failed = True
+                STAGE_ERRORS.inc(stage)
+                raise
+            finally:
+                finished = time.perf_counter()
+                STAGE_LATENCY.observe(stage, finished - started)
+                record_span(stage, started, finished, failed)
+        return wrapper
+    return decorator
+
+def _service_families() -> Iterable[MetricFamily]:
+    """Read queue depths, cache ratios, model state and verdict counts from the service's stats functions."""
+    from backend.detection.pipeline import (
+        get_cascade_stats, get_model_status, get_text_batching_stats, get_verdict_cache_stats
+    )
+    from backend.executor import get_inference_executor
+    from backend.logs.logger import get_log_writer_stats
+    from backend.logs.stream import get_broadcaster
+    from backend.startup import get_model_warmup
+
+    inference = get_inference_executor().get_stats()
+    log_writer = get_log_writer_stats()
+    batching = get_text_batching_stats()
+
+    queue_depth = MetricFamily("queue_depth", "gauge", "Items waiting in each internal queue.")
+    queue_depth.add(inference["waiting"] + inference["queued_in_pool"], queue="inference")
+    queue_depth.add(batching.get("queue_depth", 0), queue="text_batcher")
+    queue_depth.add(log_writer["queue_depth"], queue="log_writer")
+    yield queue_depth
+
+    yield MetricFamily("inference_active", "gauge", "Inference calls currently running.").add(inference["active"])
+    yield (MetricFamily("inference_calls", "counter", "Inference calls by outcome.")
+           .add(inference["completed"], outcome="completed")
+           .add(inference["rejected"], outcome="rejected"))
+
+    caches = {"verdict": get_verdict_cache_stats()}
+    # Only report the CLIP and transcript caches once cross-modal analysis has loaded them
+    embedding = sys.modules.get("backend.detection.embedding_engine")
+    if embedding is not None and embedding._engine_instance is not None:
+        stats = embedding._engine_instance.get_stats()
+        caches["clip_text"], caches["clip_image"] = stats["text_cache"], stats["image_cache"]
+    transcription = sys.modules.get("backend.detection.transcription")
+    if transcription is not None and transcription._transcriber_instance is not None:
+        caches["transcript"] = transcription._transcriber_instance.get_stats()
+
+    hit_ratio = MetricFamily("cache_hit_ratio", "gauge", "Hit ratio of each cache since startup.")
+    lookups = MetricFamily("cache_lookups", "counter", "Cache lookups by cache and result.")
+    for cache, stats in caches.items():
+        hit_ratio.add(stats.get("hit_ratio", 0.0), cache=cache)
+        lookups.add(stats.get("hits", 0), cache=cache, result="hit")
+        lookups.add(stats.get("misses", 0), cache=cache, result="miss")
+    yield hit_ratio
+    yield lookups
+
+    models = get_model_status()["models"]
+    loaded = MetricFamily("model_loaded", "gauge", "1 if the model is in memory.")
+    failed = MetricFamily("model_load_failed", "gauge", "1 if the model's last load failed.")
+    load_seconds = MetricFamily("model_load_seconds", "gauge", "Duration of the model's last load.")
+    for name, state in models.items():
+        loaded.add(state["state"] == "loaded", model=name)
+        failed.add(state["state"] == "failed", model=name)
+        load_seconds.add(state["load_seconds"], model=name)
+    yield loaded
+    yield failed
+    yield load_seconds
+
+    warmup = get_model_warmup()
+    yield MetricFamily("warmup_ready", "gauge", "1 once the background model warm-up has finished.").add(
+        warmup is None or warmup.ready)
+
+    verdicts = MetricFamily("verdicts", "counter",
+                            "Text verdicts by deciding stage (fallback and warmup mean no model verdict).")
+    for decided_by, count in get_cascade_stats()["decided_by"].items():
+        verdicts.add(count, decided_by=decided_by)
+    yield verdicts
+
+    yield MetricFamily("log_records_dropped", "counter", "Log records dropped because the queue was full.").add(
+        log_writer["dropped"])
+    yield MetricFamily("log_stream_subscribers", "gauge", "Connected /logs/stream clients.").add(
+        get_broadcaster().get_stats().get("subscribers", 0))
+    yield MetricFamily("worker_info", "gauge", "Always 1; the pid label names the worker process that answered.").add(
+        1, pid=os.getpid())
+
+def render_metrics() -> str:
+    """Render every metric in the Prometheus text exposition format (version 0.0.4)."""
+    families = [STAGE_LATENCY.collect(), STAGE_ERRORS.collect()]
+    families.extend(_service_families())
+    return "\n".join(family.render() for family in families) + "\n"
+
+class _MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves render_metrics() on GET /metrics."""
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+def serve_metrics(host: str, port: int) -> http.server.ThreadingHTTPServer:
+    """
+    Serve this process's metrics on a dedicated port from a background thread,
+    so a scraper can reach one particular prefork worker.
+
+    Args:
+        host (str): Bind address
+        port (int): Bind port (0 picks a free port)
+
+    Returns:
+        ThreadingHTTPServer: The running server (server_address holds the bound port)
+    """
+    server = http.server.ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,241 @@
+# backend/prefork.py
+"""
+Preforking production server.
+The parent process imports the app and loads the models once, freezes the
+garbage collector so collections in the workers never touch (and copy) the
+parent's objects, and only then binds the listening socket, so the port stays
+closed until the models are warm. It then forks the workers, which share the
+model weights copy-on-write and each run a uvicorn server on the inherited
+socket. Modules that own threads, pools or SQLite connections reset them in
+the child through os.register_at_fork.
+
+Whisper is shared the same way: unless TRANSCRIPTION_WORKERS is set, the
+workers transcribe in-process with the parent's preloaded model instead of
+each starting a transcription pool that loads its own copy.
+
+Per-worker state: the workers share the SQLite log store, the ID allocator
+and the transcript cache, so /logs pages (with a cursor), exports and IDs are
+the same whichever worker answers. Everything held in memory is split N ways:
+each worker has its own /logs/stream broadcaster, recent-log ring buffer and
+summary, /stats aggregates and /metrics counters, and sees only the
+detections it handled itself. Those payloads carry the answering worker's
+pid. Scrape every worker through METRICS_PORT_BASE, and run a single worker
+where the live stream or /stats must cover all traffic.
+"""
+
+import gc
+import importlib
+import os
+import signal
+import sys
+import time
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+import uvicorn
+
+from backend.config import TRANSCRIPTION_WORKERS
+from backend.detection.model_registry import get_model_registry, ModelLoadError
+from backend.detection.transcription import configure_transcription_workers, transcription_workers
+from backend.metrics import serve_metrics
+
+# A worker that exits sooner than this after starting is restarted with a delay
+_MIN_WORKER_LIFETIME_SECONDS = 5.0
+
+def worker_thread_count(workers: int, num_threads: int = 0) -> int:
+    """
+    Intra-op threads for each worker: the configured count, or the CPU cores
+    split evenly across the workers so they do not oversubscribe the machine.
+    """
+    if num_threads > 0:
+        return num_threads
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+def configure_torch_threads(num_threads: int, interop_threads: int = 0) -> bool:
+    """
+    Set torch's thread pools for this process.
+
+    Args:
+        num_threads (int): Intra-op threads
+        interop_threads (int): Inter-op threads (0 = leave unchanged)
+
+    Returns:
+        bool: False if torch is not installed
+    """
+    try:
+        import torch
+    except ImportError:
+        return False
+    torch.set_num_threads(num_threads)
+    if interop_threads > 0:
+        try:
+            torch.set_interop_threads(interop_threads)
+        except RuntimeError:
+            pass  # can only be set once, before any inter-op work has started
+    return True
+
+def configure_transcription(configured: int = TRANSCRIPTION_WORKERS) -> int:
+    """
+    Choose the Whisper worker processes for each forked worker. The automatic
+    setting (-1) transcribes in-process, so the workers share the Whisper
+    preloaded in the parent copy-on-write instead of each loading a copy.
+
+    Args:
+        configured (int): TRANSCRIPTION_WORKERS
+
+    Returns:
+        int: Transcription worker processes per server worker
+    """
+    workers = 0 if configured < 0 else configured
+    configure_transcription_workers(workers)
+    return workers
+
+def preload_models(names: List[str]) -> Dict[str, float]:
+    """
+    Load models through the shared registry before forking.
+
+    Args:
+        names (List[str]): Registered model names
+
+    Returns:
+        Dict[str, float]: Load seconds for each model that loaded
+    """
+    registry = get_model_registry()
+    timings = {}
+    for name in names:
+        if name == "whisper" and transcription_workers() > 0:
+            print("⏭️ Skipping Whisper preload: it runs in the transcription worker pool "
+                  "(unset TRANSCRIPTION_WORKERS or set it to 0 to share it across workers)")
+            continue
+        started = time.monotonic()
+        try:
+            registry.get(name)
+        except (KeyError, ModelLoadError) as e:
+            print(f"❌ Could not preload model '{name}': {e}")
+            continue
+        timings[name] = round(time.monotonic() - started, 2)
+    return timings
+
+class PreforkServer:
+    """
+    Loads the app and models in the parent, then forks and supervises the workers.
+    """
+
+    def __init__(self, app: str, host: str, port: int, workers: int = 2, models: Optional[List[str]] = None,
+                 num_threads: int = 0, interop_threads: int = 1, metrics_port_base: int = 0,
+                 log_level: str = "info"):
+        """
+        Initialize the server.
+
+        Args:
+            app (str): App import string ("module:attribute")
+            host (str): Bind address
+            port (int): Bind port
+            workers (int): Worker processes to fork
+            models (List[str], optional): Models to preload in the parent
+            num_threads (int): Torch intra-op threads per worker (0 = CPU cores / workers)
+            interop_threads (int): Torch inter-op threads per worker
+            metrics_port_base (int): Worker N also serves /metrics on this port + N (0 = off)
+            log_level (str): uvicorn log level
+        """
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.models = models or []
+        self.num_threads = worker_thread_count(self.workers, num_threads)
+        self.interop_threads = interop_threads
+        self.metrics_port_base = metrics_port_base
+        self.log_level = log_level
+
+        self._children: Dict[int, Tuple[float, int]] = {}   # pid -> (start time, worker slot)
+        self._stopping = False
+
+    def run(self) -> int:
+        """
+        Preload, bind, fork and supervise until stopped.
+
+        Returns:
+            int: Exit code for the launcher
+        """
+        # Keep the parent's heap compact and its objects untouched by the collector
+        gc.disable()
+        configure_torch_threads(self.num_threads, self.interop_threads)
+
+        started = time.monotonic()
+        configure_transcription()
+        importlib.import_module(self.app.split(":", 1)[0])
+        timings = preload_models(self.models)
+        print(f"🔥 Models warm in {time.monotonic() - started:.1f}s: "
+              + (", ".join(f"{name} {seconds}s" for name, seconds in timings.items()) or "none"))
+
+        gc.freeze()
+
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level=self.log_level)
+        sock = config.bind_socket()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for slot in range(self.workers):
+            self._spawn(config, sock, slot)
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            child = self._children.pop(pid, None)
+            if child is None or self._stopping:
+                continue
+
+            started_at, slot = child
+            print(f"⚠️ Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+            if time.monotonic() - started_at < _MIN_WORKER_LIFETIME_SECONDS:
+                time.sleep(1.0)
+            if not self._stopping:
+                self._spawn(config, sock, slot)
+
+        sock.close()
+        print("🛑 All workers stopped")
+        return 0
+
+    def _spawn(self, config: uvicorn.Config, sock, slot: int) -> None:
+        """Fork one worker serving on the shared socket; a restarted worker keeps its slot (and metrics port)."""
+        pid = os.fork()
+        if pid:
+            self._children[pid] = (time.monotonic(), slot)
+            return
+
+        # Child: uvicorn installs its own shutdown handlers
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        gc.enable()
+        configure_torch_threads(self.num_threads)
+
+        code = 0
+        try:
+            print(f"👷 Worker {os.getpid()} serving with {self.num_threads} torch threads")
+            if self.metrics_port_base:
+                serve_metrics(self.host, self.metrics_port_base + slot)
+                print(f"📈 Worker {os.getpid()} metrics on port {self.metrics_port_base + slot}")
+            uvicorn.Server(config).run(sockets=[sock])
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _handle_stop(self, signum, frame) -> None:
+        """Ask every worker to shut down gracefully."""
+        if self._stopping:
+            return
+        self._stopping = True
+        print(f"🛑 Received {signal.Signals(signum).name}, stopping {len(self._children)} workers...")
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
@@ -1,26 +1,65 @@
 #!/usr/bin/env python3
 """
 Simple script to run the FastAPI backend server.
+
+Development mode runs one auto-reloading process. Production mode loads the
+models once and forks SERVER_WORKERS workers that share them:
+
+    python backend/run.py --mode production --workers 4
+
+In-memory views (/logs/stream, /stats, /metrics) are per worker; see
+backend/prefork.py.
 """
 
+import argparse
 import sys
 import os
 import uvicorn
 
-# Add the backend directory to Python path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Add the repository root to Python path so `backend.` imports resolve from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 def main():
     """Start the FastAPI server."""
     try:
-        from backend.config import API_HOST, API_PORT, DEBUG
-        
+        from backend.config import (
+            API_HOST, API_PORT, DEBUG, SERVER_MODE, SERVER_WORKERS, PRELOAD_MODELS,
+            TORCH_NUM_THREADS, TORCH_INTEROP_THREADS, METRICS_PORT_BASE
+        )
+
+        parser = argparse.ArgumentParser(description="Run the misinformation detection API.")
+        parser.add_argument("--mode", choices=["development", "production"], default=SERVER_MODE,
+                            help="development: one reloading process; production: preloaded, forked workers")
+        parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Worker processes in production mode")
+        args = parser.parse_args()
+
         print("🚀 Starting Autonomous AI Misinformation Detection Engine")
         print(f"📍 Host: {API_HOST}")
         print(f"🔌 Port: {API_PORT}")
         print(f"🐛 Debug: {DEBUG}")
+        print(f"⚙️ Mode: {args.mode}" + (f" ({args.workers} workers)" if args.mode == "production" else ""))
         print("=" * 60)
-        
+
+        if args.mode == "production":
+            from backend.prefork import PreforkServer
+            from backend.detection.model_registry import parse_model_names
+
+            if not hasattr(os, "fork"):
+                print("❌ Production mode needs os.fork (Linux or macOS)")
+                sys.exit(1)
+
+            server = PreforkServer(
+                "backend.main:app",
+                host=API_HOST,
+                port=API_PORT,
+                workers=args.workers,
+                models=parse_model_names(PRELOAD_MODELS),
+                num_threads=TORCH_NUM_THREADS,
+                interop_threads=TORCH_INTEROP_THREADS,
+                metrics_port_base=METRICS_PORT_BASE
+            )
+            sys.exit(server.run())
+
         # Start the server
         uvicorn.run(
             "backend.main:app",
@@ -29,7 +68,7 @@ def main():
             reload=DEBUG,
             log_level="info"
         )
-        
+
     except ImportError as e:
         print(f"❌ Import error: {e}")
         print("💡 Make sure you have installed all dependencies:")
@@ -40,4 +79,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,218 @@
+# backend/startup.py
+"""
+Phased startup: import timings, background model warm-up and readiness.
+The app imports without loading any model library; once it has started,
+a background thread imports torch/transformers/whisper and loads the
+configured models through the shared registry, timing every phase. Until
+the warm-up finishes, requests are queued, answered with pre-screen
+verdicts, or rejected, according to WARMUP_POLICY.
+"""
+
+import asyncio
+import importlib
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Libraries each model needs, imported (and timed) before the model is loaded
+MODEL_IMPORTS = {
+    "bart": ("torch", "transformers"),
+    "clip": ("torch", "transformers", "PIL"),
+    "whisper": ("torch", "whisper")
+}
+
+WARMUP_POLICIES = ("queue", "fallback", "reject")
+
+class StartupProfile:
+    """
+    Records how long each startup phase took, relative to the first phase.
+    """
+
+    def __init__(self):
+        self._phases: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, name: str, started: float, finished: Optional[float] = None, status: str = "ok",
+               error: Optional[str] = None) -> None:
+        """
+        Record one phase.
+
+        Args:
+            name (str): Phase name, e.g. "import:app" or "load:bart"
+            started (float): time.perf_counter() when the phase began
+            finished (float, optional): time.perf_counter() when it ended (default: now)
+            status (str): "ok", "failed" or "skipped"
+            error (str, optional): Failure message
+        """
+        finished = time.perf_counter() if finished is None else finished
+        with self._lock:
+            self._phases.append({"name": name, "started": started, "finished": finished,
+                                 "status": status, "error": error})
+
+    def snapshot(self) -> Dict:
+        """Get every phase with its start offset and duration in seconds."""
+        with self._lock:
+            phases = list(self._phases)
+        if not phases:
+            return {"phases": [], "elapsed_seconds": 0.0}
+
+        origin = min(phase["started"] for phase in phases)
+        return {
+            "phases": [
+                {
+                    "name": phase["name"],
+                    "status": phase["status"],
+                    "start_offset_seconds": round(phase["started"] - origin, 4),
+                    "seconds": round(phase["finished"] - phase["started"], 4),
+                    **({"error": phase["error"]} if phase["error"] else {})
+                }
+                for phase in phases
+            ],
+            "elapsed_seconds": round(max(phase["finished"] for phase in phases) - origin, 4)
+        }
+
+class ModelWarmup:
+    """
+    Loads models on a background thread and tracks which are still pending.
+    """
+
+    def __init__(self, models: List[str], profile: StartupProfile):
+        """
+        Args:
+            models (List[str]): Registered model names to load, in order
+            profile (StartupProfile): Profile that receives the import and load phases
+        """
+        self.models = list(models)
+        self.profile = profile
+
+        self._pending = set(self.models)
+        self._failed: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready_event: Optional[asyncio.Event] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """True once every model has been loaded (or has failed to load)."""
+        return self._done.is_set()
+
+    def is_warming(self, name: str) -> bool:
+        """True while the named model is still waiting to be loaded by the warm-up."""
+        with self._lock:
+            return name in self._pending
+
+    def start(self) -> None:
+        """Start the warm-up thread. Call from the event loop so queued requests can await readiness."""
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._ready_event = asyncio.Event()
+        except RuntimeError:
+            self._loop = None
+        if not self.models:
+            self._finish()
+            return
+        self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+        self._thread.start()
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """
+        Wait for the warm-up to finish without blocking the event loop.
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if the warm-up finished in time
+        """
+        if self.ready:
+            return True
+        if self._ready_event is None:
+            return await asyncio.to_thread(self._done.wait, timeout)
+        try:
+            await asyncio.wait_for(self._ready_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def get_status(self) -> Dict:
+        """Get pending, loaded and failed models."""
+        with self._lock:
+            pending = [name for name in self.models if name in self._pending]
+            failed = dict(self._failed)
+        return {
+            "ready": self.ready,
+            "models": self.models,
+            "pending": pending,
+            "loaded": [name for name in self.models if name not in pending and name not in failed],
+            "failed": failed
+        }
+
+    def _run(self) -> None:
+        """Import each model's libraries, then load the model, recording every phase."""
+        from backend.detection.model_registry import get_model_registry
+
+        registry = get_model_registry()
+        imported = set()
+        for name in self.models:
+            for module in MODEL_IMPORTS.get(name, ()):
+                if module not in imported:
+                    imported.add(module)
+                    self._import(module)
+
+            started = time.perf_counter()
+            try:
+                registry.get(name)
+                self.profile.record(f"load:{name}", started)
+            except Exception as e:
+                self.profile.record(f"load:{name}", started, status="failed", error=str(e))
+                with self._lock:
+                    self._failed[name] = str(e)
+            finally:
+                with self._lock:
+                    self._pending.discard(name)
+        self._finish()
+
+    def _import(self, module: str) -> None:
+        """Import a library and time it; a missing library is recorded, not raised."""
+        started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+            self.profile.record(f"import:{module}", started)
+        except ImportError as e:
+            self.profile.record(f"import:{module}", started, status="failed", error=str(e))
+
+    def _finish(self) -> None:
+        """Mark the warm-up done and wake queued requests."""
+        self.profile.record("ready", time.perf_counter())
+        self._done.set()
+        if self._loop is not None and self._ready_event is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._ready_event.set)
+            except RuntimeError:
+                pass  # the loop has already closed
+
+# Global instances for reuse
+_startup_profile = StartupProfile()
+_model_warmup: Optional[ModelWarmup] = None
+
+def get_startup_profile() -> StartupProfile:
+    """Get the process-wide startup profile."""
+    return _startup_profile
+
+def start_model_warmup(models: List[str]) -> ModelWarmup:
+    """Start warming the given models in the background (once per process)."""
+    global _model_warmup
+    if _model_warmup is None:
+        _model_warmup = ModelWarmup(models, _startup_profile)
+        _model_warmup.start()
+    return _model_warmup
+
+def get_model_warmup() -> Optional[ModelWarmup]:
+    """Get the running warm-up, or None if none was started."""
+    return _model_warmup
+
+def is_warming_up(*names: str) -> bool:
+    """True while any of the named models is still pending in the background warm-up."""
+    return _model_warmup is not None and any(_model_warmup.is_warming(name) for name in names)
@@ -0,0 +1,230 @@
+# backend/tracing.py
+"""
+Per-request trace spans.
+A trace is bound to the current request through a context variable. While
+one is active, every stage timed with backend.metrics (timed / observe_stage)
+is also recorded as a span with its start, duration and thread; with no
+active trace, recording costs a single context variable lookup. Work handed
+to the inference executor runs in a copy of the request's context, so spans
+from worker threads land in the same trace. Micro-batches run once for several
+requests on the batcher's own thread; batch_trace records their spans into the
+trace of every profiled request in the batch.
+
+A finished trace can be summarized as a per-stage breakdown (returned with
+the response when profiling is requested) or exported as Chrome trace JSON
+for chrome://tracing or Perfetto.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import Context, ContextVar
+from typing import Dict, Iterable, List, Optional
+
+from backend.config import TRACE_HISTORY_SIZE
+
+class Trace:
+    """
+    Spans recorded for one request.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.finished: Optional[float] = None
+        # (name, start, end, thread id, thread name, failed); list.append is atomic, so
+        # spans from several threads need no lock
+        self._spans: List[tuple] = []
+
+    def add_span(self, name: str, started: float, finished: float, failed: bool = False) -> None:
+        """Record a span from perf_counter() start and end times."""
+        thread = threading.current_thread()
+        self._spans.append((name, started, finished, thread.ident, thread.name, failed))
+
+    def spans(self) -> List[tuple]:
+        """Spans in start order, enclosing spans before the spans they contain."""
+        return sorted(self._spans, key=lambda span: (span[1], -span[2]))
+
+    def finish(self) -> None:
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def breakdown(self) -> Dict:
+        """
+        Summarize the trace per stage, in order of first appearance. Stages
+        nest (e.g. pipeline.analyze_post inside agent.analyze_content), so
+        their times are not additive.
+
+        Returns:
+            Dict: Trace id, total time and calls/total/max milliseconds per stage
+        """
+        stages: "OrderedDict[str, Dict]" = OrderedDict()
+        for name, started, finished, _, _, failed in self.spans():
+            milliseconds = (finished - started) * 1000
+            stage = stages.setdefault(name, {"stage": name, "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+            stage["calls"] += 1
+            stage["total_ms"] += milliseconds
+            stage["max_ms"] = max(stage["max_ms"], milliseconds)
+            stage["errors"] += failed
+        for stage in stages.values():
+            stage["total_ms"] = round(stage["total_ms"], 3)
+            stage["max_ms"] = round(stage["max_ms"], 3)
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "total_ms": round(self.duration * 1000, 3),
+            "stages": list(stages.values()),
+            "chrome_trace": f"/traces/{self.trace_id}"
+        }
+
+    def to_chrome_trace(self) -> Dict:
+        """
+        Export the trace in the Chrome trace event format: one complete ("X")
+        event per span, plus the request itself, with microsecond timestamps.
+        """
+        pid = os.getpid()
+        spans = self.spans()
+        root_thread = spans[0][3] if spans else 0
+
+        def event(name, started, finished, tid, failed=False):
+            return {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": round((started - self.started) * 1e6, 3),
+                "dur": round((finished - started) * 1e6, 3),
+                "pid": pid,
+                "tid": tid,
+                **({"args": {"error": True}} if failed else {})
+            }
+
+        events = [event(self.name, self.started, self.finished or time.perf_counter(), root_thread)]
+        thread_names = {}
+        for name, started, finished, tid, thread_name, failed in spans:
+            events.append(event(name, started, finished, tid, failed))
+            thread_names[tid] = thread_name
+        for tid, thread_name in thread_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.trace_id, "request": self.name, "started_at": self.started_at}
+        }
+
+# The trace of the request being handled in this context, if it is being profiled
+_active_trace: ContextVar[Optional[Trace]] = ContextVar("active_trace", default=None)
+
+# Recently finished traces, for Chrome trace export
+_recent_traces: "OrderedDict[str, Trace]" = OrderedDict()
+_recent_lock = threading.Lock()
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace active in this context, or None."""
+    return _active_trace.get()
+
+def record_span(name: str, started: float, finished: float, failed: bool = False) -> None:
+    """Add a span to the active trace, if there is one."""
+    trace = _active_trace.get()
+    if trace is not None:
+        trace.add_span(name, started, finished, failed)
+
+class request_trace:
+    """
+    Context manager that traces the enclosed request handling when enabled:
+
+        with request_trace("POST /analyze", enabled=profiling) as trace:
+            ...
+        if trace:
+            response["profile"] = trace.breakdown()
+    """
+
+    __slots__ = ("name", "enabled", "trace", "_token")
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self.trace: Optional[Trace] = None
+        self._token = None
+
+    def __enter__(self) -> Optional[Trace]:
+        if self.enabled:
+            self.trace = Trace(self.name)
+            self._token = _active_trace.set(self.trace)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.trace is None:
+            return
+        _active_trace.reset(self._token)
+        self.trace.finish()
+        with _recent_lock:
+            _recent_traces[self.trace.trace_id] = self.trace
+            while len(_recent_traces) > max(1, TRACE_HISTORY_SIZE):
+                _recent_traces.popitem(last=False)
+
+class _TraceGroup:
+    """Stands in for the active trace while work is done on behalf of several traced requests."""
+
+    __slots__ = ("traces",)
+
+    def __init__(self, traces: List[Trace]):
+        self.traces = traces
+
+    def add_span(self, name: str, started: float, finished: float, failed: bool = False) -> None:
+        for trace in self.traces:
+            trace.add_span(name, started, finished, failed)
+
+class batch_trace:
+    """
+    Context manager for work done once for several requests, e.g. a
+    micro-batch: spans recorded inside are added to the trace of each request
+    whose captured context is being profiled.
+
+        with batch_trace(contexts):
+            results = batch_fn(items)
+    """
+
+    __slots__ = ("traces", "_token")
+
+    def __init__(self, contexts: Iterable[Context]):
+        traces = {}
+        for context in contexts:
+            trace = context.get(_active_trace)
+            if trace is not None:
+                traces[id(trace)] = trace
+        self.traces: List[Trace] = list(traces.values())
+        self._token = None
+
+    def __enter__(self) -> List[Trace]:
+        if self.traces:
+            self._token = _active_trace.set(self.traces[0] if len(self.traces) == 1 else _TraceGroup(self.traces))
+        return self.traces
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is not None:
+            _active_trace.reset(self._token)
+            self._token = None
+
+def get_trace(trace_id: str) -> Optional[Trace]:
+    """Get a recently finished trace by id."""
+    with _recent_lock:
+        return _recent_traces.get(trace_id)
+
+def list_traces() -> List[Dict]:
+    """List recently finished traces, newest first."""
+    with _recent_lock:
+        traces = list(_recent_traces.values())
+    return [
+        {"trace_id": trace.trace_id, "name": trace.name, "started_at": trace.started_at,
+         "total_ms": round(trace.duration * 1000, 3)}
+        for trace in reversed(traces)
+    ]
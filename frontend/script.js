@@ -11,6 +11,8 @@ let stories = [];
 let suggestions = [];
 let currentPage = 0;
 let isLoading = false;
+let detectionStream = null;
+let detectionSummary = {};
 
 // Backend API configuration
 const API_BASE_URL = 'http://localhost:8000';
@@ -81,6 +83,7 @@ function initializeApp() {
     setupInfiniteScroll();
     setupEventListeners();
     setupSearch();
+    connectDetectionStream();
     console.log('App initialization complete!');
 }
 
@@ -382,9 +385,10 @@ async function createPost() {
     
     if (previewImage && caption.trim()) {
         // Analyze the caption for misinformation before posting
+        let analysis = null;
         if (caption.trim() !== '') {
             showNotification('Analyzing content for misinformation...');
-            const analysis = await analyzeContentForMisinformation(caption, 'text');
+            analysis = await analyzeContentForMisinformation(caption, 'text');
             
             if (analysis.success) {
                 const trustScore = analysis.trust_score;
@@ -411,7 +415,7 @@ async function createPost() {
             liked: false,
             saved: false
         };
-
+        
         posts.unshift(newPost);
         renderPosts();
         closeModal('createPostModal');
@@ -584,6 +588,37 @@ function showMisinformationAlert(postId, trustScore, reason) {
     }
 }
 
+// Live detection summary (Server-Sent Events); the browser reconnects on its own.
+// Alerts for this client's posts come from the /analyze responses directly
+function connectDetectionStream() {
+    if (!window.EventSource || detectionStream) return;
+    
+    detectionStream = new EventSource(`${API_BASE_URL}/logs/stream`);
+    
+    // The first summary is complete; later ones only carry changed fields
+    detectionStream.addEventListener('summary', (event) => {
+        detectionSummary = { ...detectionSummary, ...JSON.parse(event.data) };
+        renderDetectionSummary();
+    });
+    
+    detectionStream.onerror = () => {
+        console.warn('Detection stream interrupted, reconnecting...');
+    };
+}
+
+function renderDetectionSummary() {
+    const panel = document.getElementById('detectionSummary');
+    if (!panel) return;
+    
+    document.getElementById('summaryTotal').textContent = detectionSummary.total_logs || 0;
+    document.getElementById('summaryAverage').textContent =
+        detectionSummary.total_logs ? `${detectionSummary.avg_trust_score}%` : '-';
+    document.getElementById('summaryHigh').textContent = detectionSummary.high_trust_count || 0;
+    document.getElementById('summaryMedium').textContent = detectionSummary.medium_trust_count || 0;
+    document.getElementById('summaryLow').textContent = detectionSummary.low_trust_count || 0;
+    panel.style.display = 'block';
+}
+
 async function analyzePostCaption(postId, caption) {
     if (!caption || caption.trim() === '') return;
     
@@ -0,0 +1,22 @@
+"""
+Shared test setup: point every on-disk store at a temporary directory, so
+importing the backend never creates or writes files in the repo's data/.
+"""
+
+import os
+import shutil
+import tempfile
+
+_DATA_DIR = tempfile.mkdtemp(prefix="hacksky-tests-")
+
+# Read by backend.config when it is first imported, which happens after this module loads
+for _name, _filename in (
+    ("LOG_STORE_PATH", "detection_logs.db"),
+    ("ID_ALLOCATOR_PATH", "ids.db"),
+    ("TRANSCRIPT_CACHE_PATH", "transcripts.db"),
+    ("LOG_FILE_PATH", os.path.join("logs", "detections.jsonl"))
+):
+    os.environ[_name] = os.path.join(_DATA_DIR, _filename)
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
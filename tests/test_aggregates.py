@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming time-windowed trust aggregates.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.logs.aggregates import TrustAggregator, histogram_quantile
+
+def test_quantiles_match_sorted_scores():
+    """Histogram quantiles should equal the nearest-rank quantile of the raw scores."""
+    scores = [(i * 37) % 101 for i in range(500)]
+    histogram = [0] * 101
+    for score in scores:
+        histogram[score] += 1
+
+    ordered = sorted(scores)
+    assert histogram_quantile(histogram, len(scores), 0.5) == ordered[249]
+    assert histogram_quantile(histogram, len(scores), 0.95) == ordered[474]
+    assert histogram_quantile([0] * 101, 0, 0.5) is None
+
+def test_windows_expire_old_detections():
+    """Detections should leave the 1m window after a minute but stay in 15m and 24h."""
+    start = 1_000_000.0
+    aggregator = TrustAggregator(started_at=start)
+    for i in range(30):
+        aggregator.record(20, "misinformation", now=start + i)
+    for i in range(10):
+        aggregator.record(90, "reliable", now=start + 120 + i)
+
+    stats = aggregator.snapshot(now=start + 130)
+    one_minute, fifteen_minutes = stats["windows"]["1m"], stats["windows"]["15m"]
+
+    assert one_minute["count"] == 10
+    assert one_minute["p50"] == 90
+    assert one_minute["detections_per_minute"] == 10.0
+    assert fifteen_minutes["count"] == 40
+    assert fifteen_minutes["classification_rates"] == {"misinformation": 0.75, "reliable": 0.25}
+    assert fifteen_minutes["p95"] == 90
+    assert stats["windows"]["24h"]["count"] == 40
+    assert stats["all_time"]["count"] == 40
+
+    later = aggregator.snapshot(now=start + 86_400 * 2)
+    assert later["windows"]["24h"]["count"] == 0
+    assert later["windows"]["24h"]["p50"] is None
+
+def test_rates_use_uptime_until_a_window_has_passed():
+    """Shortly after a restart, detections per minute should not be diluted by the unelapsed window."""
+    start = 1_000_000.0
+    aggregator = TrustAggregator(started_at=start)
+    for i in range(20):
+        aggregator.record(50, "opinion", now=start + i * 6)
+
+    windows = aggregator.snapshot(now=start + 120)["windows"]
+    assert windows["15m"]["detections_per_minute"] == 10.0
+    assert windows["24h"]["detections_per_minute"] == 10.0
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the micro-batching inference queue.
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.detection.batching import MicroBatcher
+
+def test_concurrent_submits_are_batched():
+    """Concurrent callers should share batches and get their own results."""
+    seen_batches = []
+
+    def batch_fn(items):
+        seen_batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=50)
+    results = {}
+
+    def worker(value):
+        results[value] = batcher.submit(value)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: i * 2 for i in range(8)}
+    assert all(len(batch) <= 4 for batch in seen_batches)
+    assert len(seen_batches) < 8
+
+    stats = batcher.get_stats()
+    assert stats["items_processed"] == 8
+    assert stats["batches_processed"] == len(seen_batches)
+
+def test_batch_errors_reach_every_caller():
+    """An exception in the batch function should propagate to each waiting caller."""
+    def failing_batch_fn(items):
+        raise ValueError("model exploded")
+
+    batcher = MicroBatcher(failing_batch_fn, max_batch_size=2, max_wait_ms=1)
+
+    try:
+        batcher.submit("text")
+    except ValueError as e:
+        assert "model exploded" in str(e)
+    else:
+        raise AssertionError("Expected ValueError")
+
+def test_global_batcher_is_created_once_under_concurrency(monkeypatch):
+    """Concurrent first callers should share one batcher (and one worker thread)."""
+    from backend.detection import huggingface_detector
+
+    created = []
+
+    class SlowBatcher:
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.05)
+            created.append(self)
+
+    monkeypatch.setattr(huggingface_detector, "_batcher_instance", None)
+    monkeypatch.setattr(huggingface_detector, "MicroBatcher", SlowBatcher)
+
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(huggingface_detector.get_batcher())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(batcher is created[0] for batcher in seen)
+
+def test_cancelled_future_does_not_stall_the_batcher():
+    """A caller cancelling while its item waits should not break the batch or later submissions."""
+    seen_batches = []
+
+    def batch_fn(items):
+        seen_batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait_ms=200)
+    first = batcher.submit_async(1)
+    cancelled = batcher.submit_async(2)
+    assert cancelled.cancel()
+    third = batcher.submit_async(3)
+
+    assert first.result(timeout=2) == 2
+    assert third.result(timeout=2) == 6
+    assert cancelled.cancelled()
+    assert seen_batches == [[1, 3]]
+
+    # The worker is still alive and serves the next batch
+    assert batcher.submit_async(4).result(timeout=2) == 8
+    assert batcher.get_stats()["items_processed"] == 3
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-screen and the detection cascade's routing between it and the zero-shot model.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.detection import pipeline
+from backend.detection.prescreen import prescreen_text
+from backend.detection.verdict_cache import VerdictCache
+
+CREDIBLE = "According to a peer-reviewed study, data shows the new treatment works; scientists say more research is needed."
+MISINFORMATION = "MIRACLE CURE they don't want you to know about! Government hiding the truth! Share before it's deleted!"
+UNCERTAIN = "The council meets on Tuesday to discuss the new bus timetable."
+
+@pytest.fixture
+def cascade(monkeypatch):
+    """Run the cascade with the default band, a fresh cache and counters, and a recording model stub."""
+    monkeypatch.setattr(pipeline, "CASCADE_ENABLED", True)
+    monkeypatch.setattr(pipeline, "CASCADE_UNCERTAIN_LOW", 0.15)
+    monkeypatch.setattr(pipeline, "CASCADE_UNCERTAIN_HIGH", 0.85)
+    monkeypatch.setattr(pipeline, "WARMUP_POLICY", "fallback")
+    monkeypatch.setattr(pipeline, "is_warming_up", lambda *names: False)
+    monkeypatch.setattr(pipeline, "_verdict_cache", VerdictCache(max_size=16, ttl_seconds=0))
+    monkeypatch.setattr(pipeline, "_cascade_stats", {"prescreen": 0, "zero_shot": 0, "fallback": 0, "warmup": 0})
+
+    classified = []
+
+    def classify(texts):
+        classified.extend(texts)
+        return [{"trust_score": 70, "classification": "credible information", "confidence": 80.0,
+                 "reason": "model", "all_scores": {"credible information": 80.0}} for _ in texts]
+
+    def analyze(*contents):
+        posts = [{"id": index, "content": content} for index, content in enumerate(contents)]
+        return pipeline._analyze_posts(posts, classify)
+
+    return analyze, classified
+
+def test_prescreen_probability_bands():
+    """Credible phrasing should score low, stacked misinformation signals high, and plain text in between."""
+    assert prescreen_text(CREDIBLE)["misinformation_probability"] < 0.15
+    assert prescreen_text(MISINFORMATION)["misinformation_probability"] > 0.85
+    assert 0.15 <= prescreen_text(UNCERTAIN)["misinformation_probability"] <= 0.85
+
+    credible, misinformation = prescreen_text(CREDIBLE), prescreen_text(MISINFORMATION)
+    assert credible["classification"] == "credible information" and credible["trust_score"] > 85
+    assert misinformation["classification"] == "misinformation" and misinformation["trust_score"] < 15
+
+def test_confident_posts_are_decided_by_the_prescreen(cascade):
+    """Posts outside the uncertainty band should never reach the model."""
+    analyze, classified = cascade
+    credible, misinformation = analyze(CREDIBLE, MISINFORMATION)
+
+    assert classified == []
+    assert credible["decided_by"] == misinformation["decided_by"] == "prescreen"
+    assert credible["trust_score"] > 85 and misinformation["trust_score"] < 15
+    assert pipeline.get_cascade_stats()["decided_by"]["prescreen"] == 2
+
+def test_uncertain_posts_are_escalated_to_the_model(cascade):
+    """Posts inside the band should go to the model, keeping the pre-screen probability for reference."""
+    analyze, classified = cascade
+    credible, uncertain = analyze(CREDIBLE, UNCERTAIN)
+
+    assert classified == [UNCERTAIN]
+    assert uncertain["decided_by"] == "zero_shot" and uncertain["reason"] == "model"
+    assert 0.15 <= uncertain["prescreen_probability"] <= 0.85
+    stats = pipeline.get_cascade_stats()
+    assert stats["decided_by"]["zero_shot"] == 1 and stats["prescreen_ratio"] == 0.5
+
+def test_model_verdicts_are_cached(cascade):
+    """A repeated uncertain post should be answered from the verdict cache."""
+    analyze, classified = cascade
+    analyze(UNCERTAIN)
+    repeat = analyze(UNCERTAIN)[0]
+
+    assert classified == [UNCERTAIN]
+    assert repeat["cached"] is True
+
+def test_decision_counts_are_not_lost_across_threads(cascade):
+    """Concurrent verdicts should all be counted."""
+    analyze, _ = cascade
+    threads = [threading.Thread(target=lambda: [analyze(CREDIBLE) for _ in range(200)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pipeline.get_cascade_stats()["decided_by"]["prescreen"] == 1600
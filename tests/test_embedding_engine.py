@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests for the CLIP embedding engine's caches and vectorized pair scoring, using stub encoders.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.detection import embedding_engine
+from backend.detection.embedding_engine import ClipEmbeddingEngine, EmbeddingCache, content_hash
+
+def _vector(data) -> np.ndarray:
+    """A deterministic unit vector per input, standing in for a CLIP tower."""
+    data = data.encode("utf-8") if isinstance(data, str) else data
+    seed = int.from_bytes(hashlib.sha256(data).digest()[:4], "little")
+    vector = np.random.default_rng(seed).standard_normal(16).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+@pytest.fixture
+def engine():
+    """An engine whose text and image towers are stubs that record every batch they encode."""
+    engine = ClipEmbeddingEngine(cache_size=8)
+    engine.embedded = {"text": [], "image": []}
+
+    def embed(kind):
+        def embed_batch(items):
+            engine.embedded[kind].append(list(items))
+            return np.stack([_vector(item) for item in items])
+        return embed_batch
+
+    engine._embed_texts = embed("text")
+    engine._embed_images = embed("image")
+    return engine
+
+def test_cache_counts_hits_misses_and_evictions():
+    cache = EmbeddingCache(max_size=2)
+    assert cache.get("a") is None
+    cache.put("a", np.ones(2))
+    cache.put("b", np.ones(2))
+    assert cache.get("a") is not None
+    cache.put("c", np.ones(2))  # evicts "b", the least recently used
+
+    assert cache.get("b") is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 2, 1, 2)
+
+def test_only_cache_misses_are_encoded(engine):
+    """A repeat encode should hit the cache, and a mixed batch should encode only the new items."""
+    engine.encode_texts(["a", "b"])
+    engine.encode_texts(["b", "c"])
+
+    assert engine.embedded["text"] == [["a", "b"], ["c"]]
+    assert engine.get_stats()["text_cache"]["hits"] == 1
+
+def test_pair_similarities_match_unbatched_scoring(engine):
+    """Batched pair scores should equal scoring each pair on its own, with repeats encoded once."""
+    pairs = [("cat", b"img-1"), ("dog", b"img-2"), ("cat", b"img-2"), ("dog", b"img-1")]
+    batched = engine.pair_similarities(pairs)
+
+    expected = [float(_vector(text) @ _vector(image)) for text, image in pairs]
+    assert batched == pytest.approx(expected, abs=1e-6)
+    assert engine.embedded["text"] == [["cat", "dog"]]
+    assert engine.embedded["image"] == [[b"img-1", b"img-2"]]
+
+    single = [float((engine.encode_texts([t]) @ engine.encode_images([i]).T)[0, 0]) for t, i in pairs]
+    assert batched == pytest.approx(single, abs=1e-6)
+
+def test_precomputed_image_keys_are_used_for_the_cache(engine):
+    """A MediaInput's hash should be the cache key, so the image is not hashed or encoded again."""
+    key = content_hash(b"img")
+    engine.pair_similarities([("a", b"img")], image_keys=[key])
+    engine.encode_images([b"ignored"], keys=[key])
+    assert engine.embedded["image"] == [[b"img"]]
+
+def test_concurrent_requests_share_a_pair_batch(engine, monkeypatch):
+    """Pairs submitted together should be scored in one vectorized batch, each caller getting its own score."""
+    monkeypatch.setattr(embedding_engine, "_engine_instance", engine)
+    monkeypatch.setattr(embedding_engine, "_pair_batcher_instance", None)
+    monkeypatch.setattr(embedding_engine, "CLIP_BATCH_MAX_WAIT_MS", 100)
+
+    pairs = [(f"text {i}", f"image {i}".encode(), None) for i in range(4)]
+    scores = {}
+
+    def request(index):
+        scores[index] = embedding_engine.get_pair_batcher().submit(pairs[index])
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [scores[i] for i in range(4)] == pytest.approx(
+        [float(_vector(text) @ _vector(image)) for text, image, _ in pairs], abs=1e-6)
+    assert len(engine.embedded["text"]) < 4
+
+def test_corrupt_image_only_fails_its_own_pair(monkeypatch):
+    """One undecodable image should give a NaN score for its pair while the rest of the batch is scored."""
+    import contextlib
+    import io
+    import types
+
+    Image = pytest.importorskip("PIL.Image")
+
+    class Features:
+        def __init__(self, array):
+            self.array = array
+
+        def cpu(self):
+            return self
+
+        def numpy(self):
+            return self.array
+
+    class FakeClip:
+        config = types.SimpleNamespace(projection_dim=16)
+
+        def get_image_features(self, images):
+            return Features(np.stack([_vector(image.tobytes()) for image in images]))
+
+    class FakeRegistry:
+        def get(self, name):
+            return FakeClip(), lambda images, return_tensors: {"images": images}
+
+    monkeypatch.setitem(sys.modules, "torch", types.SimpleNamespace(no_grad=contextlib.nullcontext))
+    monkeypatch.setattr(embedding_engine, "get_model_registry", lambda: FakeRegistry())
+
+    def png(color):
+        buffer = io.BytesIO()
+        Image.new("RGB", (4, 4), color).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    engine = ClipEmbeddingEngine(cache_size=8)
+    engine._embed_texts = lambda texts: np.stack([_vector(text) for text in texts])
+    monkeypatch.setattr(embedding_engine, "_engine_instance", engine)
+    monkeypatch.setattr(embedding_engine, "_pair_batcher_instance", None)
+    monkeypatch.setattr(embedding_engine, "CLIP_BATCH_MAX_WAIT_MS", 100)
+
+    images = [png("red"), b"not an image", png("blue")]
+    scores = {}
+
+    def request(index):
+        scores[index] = embedding_engine.get_pair_batcher().submit((f"text {index}", images[index], None))
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert np.isnan(scores[1])
+    for index in (0, 2):
+        pixels = Image.open(io.BytesIO(images[index])).convert("RGB").tobytes()
+        assert scores[index] == pytest.approx(float(_vector(f"text {index}") @ _vector(pixels)), abs=1e-6)
+    # The failed image is not cached, so a later request retries it
+    assert engine.get_stats()["image_cache"]["size"] == 2
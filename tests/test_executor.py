@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for the inference executor: concurrency slots, queue limit, stats and early slot release.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.executor import InferenceExecutor, InferenceOverloaded, release_inference_slot
+
+def test_concurrency_is_limited_to_the_slot_count():
+    """No more calls than max_concurrency should run at once, even with spare threads."""
+    executor = InferenceExecutor(max_workers=4, max_concurrency=2, max_queue=0)
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        threading.Event().wait(0.02)
+        with lock:
+            running[0] -= 1
+        return threading.get_ident()
+
+    async def run():
+        return await asyncio.gather(*(executor.run(work) for _ in range(6)))
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert peak[0] == 2
+    stats = executor.get_stats()
+    assert stats["completed"] == 6 and stats["active"] == 0 and stats["waiting"] == 0
+
+def test_full_queue_rejects_new_calls():
+    """Once max_queue calls are waiting for a slot, further calls should be rejected."""
+    executor = InferenceExecutor(max_workers=1, max_concurrency=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.02)
+        waiting = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0.02)
+        assert executor.get_stats()["active"] == 1 and executor.get_stats()["waiting"] == 1
+
+        with pytest.raises(InferenceOverloaded):
+            await executor.run(lambda: "rejected")
+
+        release.set()
+        return await running, await waiting
+
+    try:
+        assert asyncio.run(run()) == (True, "queued")
+    finally:
+        executor.shutdown()
+
+    stats = executor.get_stats()
+    assert stats["rejected"] == 1 and stats["completed"] == 2
+
+def test_released_slot_lets_other_calls_run():
+    """A call waiting on shared work should free its slot without freeing it twice."""
+    executor = InferenceExecutor(max_workers=4, max_concurrency=1, max_queue=0)
+    all_waiting = threading.Barrier(3, timeout=5)
+
+    def wait_on_batch():
+        release_inference_slot()
+        release_inference_slot()
+        # Only possible if every call got past the single slot
+        all_waiting.wait()
+        return True
+
+    async def run():
+        return await asyncio.gather(*(executor.run(wait_on_batch) for _ in range(3)))
+
+    try:
+        assert asyncio.run(run()) == [True, True, True]
+    finally:
+        executor.shutdown()
+
+    stats = executor.get_stats()
+    assert stats["active"] == 0 and stats["completed"] == 3
+    assert executor._semaphore._value == 1
+
+def test_calls_queued_behind_released_slots_are_bounded():
+    """Calls parked on shared work keep their threads, so calls queued behind them must hit the limit."""
+    executor = InferenceExecutor(max_workers=2, max_concurrency=2, max_queue=2)
+    release = threading.Event()
+
+    def wait_on_batch():
+        release_inference_slot()
+        return release.wait(5)
+
+    async def run():
+        admitted = [asyncio.ensure_future(executor.run(wait_on_batch)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        # The parked calls gave their slots to two more calls, which now wait for a thread
+        stats = executor.get_stats()
+        assert stats["waiting"] == 0 and stats["queued_in_pool"] == 2
+
+        with pytest.raises(InferenceOverloaded):
+            await executor.run(wait_on_batch)
+
+        release.set()
+        return await asyncio.gather(*admitted)
+
+    try:
+        assert asyncio.run(run()) == [True] * 4
+    finally:
+        executor.shutdown()
+
+    stats = executor.get_stats()
+    assert stats["rejected"] == 1 and stats["queued_in_pool"] == 0
+
+def test_release_outside_the_executor_is_a_no_op():
+    """Code paths that also run outside the executor should be able to call it safely."""
+    release_inference_slot()
+
+def test_text_batches_can_fill_beyond_the_slot_count(monkeypatch):
+    """Texts waiting on the micro-batcher should not hold slots, so a batch can exceed max_concurrency."""
+    from backend.detection import huggingface_detector
+    from backend.detection.batching import MicroBatcher
+
+    batches = []
+
+    def classify(texts):
+        batches.append(len(texts))
+        return [{"text": text} for text in texts]
+
+    batcher = MicroBatcher(classify, max_batch_size=8, max_wait_ms=200)
+    monkeypatch.setattr(huggingface_detector, "get_batcher", lambda: batcher)
+    executor = InferenceExecutor(max_workers=8, max_concurrency=2, max_queue=0)
+
+    async def run():
+        calls = (executor.run(huggingface_detector.analyze_text_with_huggingface, str(i)) for i in range(8))
+        return await asyncio.gather(*calls)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert [result["text"] for result in results] == [str(i) for i in range(8)]
+    assert max(batches) > 2
+
+def test_cancelled_call_keeps_its_slot_until_the_thread_finishes():
+    """Cancelling the awaiting request should not free the slot while the model call is still running."""
+    executor = InferenceExecutor(max_workers=2, max_concurrency=1, max_queue=0)
+    started = threading.Event()
+    finish = threading.Event()
+    order = []
+
+    def slow():
+        started.set()
+        finish.wait(2)
+        order.append("slow")
+
+    def quick():
+        order.append("quick")
+
+    async def run():
+        slow_task = asyncio.ensure_future(executor.run(slow))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        slow_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await slow_task
+
+        quick_task = asyncio.ensure_future(executor.run(quick))
+        await asyncio.sleep(0.05)
+        assert order == [] and executor.get_stats()["active"] == 1
+        finish.set()
+        await quick_task
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert order == ["slow", "quick"]
+    assert executor.get_stats()["active"] == 0
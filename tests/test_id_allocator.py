@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the block-reserving ID allocator.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.id_allocator import BlockIdAllocator
+
+def _allocate_in_process(path, count, queue):
+    allocator = BlockIdAllocator("post", path, block_size=7)
+    queue.put([allocator.next_id() for _ in range(count)])
+
+def test_ids_are_unique_and_monotonic_across_threads(tmp_path):
+    """Concurrent threads should never receive the same ID."""
+    allocator = BlockIdAllocator("post", str(tmp_path / "ids.db"), block_size=10)
+    results = [[] for _ in range(8)]
+
+    def worker(out):
+        for _ in range(250):
+            out.append(allocator.next_id())
+
+    threads = [threading.Thread(target=worker, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_ids = [value for out in results for value in out]
+    assert len(set(all_ids)) == 2000
+    assert all(out == sorted(out) for out in results)
+
+def test_ids_are_unique_across_processes(tmp_path):
+    """Separate processes sharing the database should get disjoint ID blocks."""
+    path = str(tmp_path / "ids.db")
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [context.Process(target=_allocate_in_process, args=(path, 50, queue)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    ids = [value for _ in processes for value in queue.get(timeout=60)]
+    for process in processes:
+        process.join()
+
+    assert len(set(ids)) == 150
+
+def test_advance_to_and_bulk_allocation(tmp_path):
+    """advance_to should skip existing IDs and next_ids should span blocks."""
+    path = str(tmp_path / "ids.db")
+    allocator = BlockIdAllocator("log_entry", path, block_size=4)
+    assert allocator.next_id() == 1
+
+    allocator.advance_to(100)
+    assert allocator.next_id() == 100
+    assert allocator.next_ids(10) == list(range(101, 111))
+
+    restarted = BlockIdAllocator("log_entry", path, block_size=4)
+    assert restarted.next_id() > 110
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for text classifier backend selection, the torch fallback and the parity report.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.detection import inference_backends
+from backend.detection.inference_backends import check_backend_parity, load_zero_shot_classifier, resolve_backend
+
+@pytest.fixture
+def loaders(monkeypatch):
+    """Replace the real model loaders with stubs that record which backend was loaded."""
+    loaded = []
+    for backend, attr in (("torch", "_load_torch"), ("torch-int8", "_load_torch_int8"), ("onnx", "_load_onnx")):
+        monkeypatch.setattr(inference_backends, attr, lambda model_name, backend=backend: loaded.append(backend) or backend)
+    return loaded
+
+def _installed(monkeypatch, *missing):
+    """Pretend optimum and onnxruntime are installed, except for the named packages."""
+    real_find_spec = importlib.util.find_spec
+
+    def find_spec(name, *args):
+        if name in ("optimum", "onnxruntime"):
+            return None if name in missing else object()
+        return real_find_spec(name, *args)
+
+    monkeypatch.setattr(importlib.util, "find_spec", find_spec)
+
+def test_backends_are_selected_by_name(monkeypatch, loaders):
+    """Each supported name should load its own backend."""
+    _installed(monkeypatch)
+    for backend in ("torch", "torch-int8", "onnx"):
+        assert load_zero_shot_classifier(backend, "model") == backend
+    assert loaders == ["torch", "torch-int8", "onnx"]
+
+@pytest.mark.parametrize("missing", ["optimum", "onnxruntime"])
+def test_onnx_falls_back_to_torch_without_its_packages(monkeypatch, loaders, missing):
+    """The onnx backend should load torch fp32 when optimum or onnxruntime is missing."""
+    _installed(monkeypatch, missing)
+    assert resolve_backend("onnx") == "torch"
+    assert load_zero_shot_classifier("onnx", "model") == "torch"
+    assert loaders == ["torch"]
+
+def test_unknown_backend_is_rejected(loaders):
+    with pytest.raises(ValueError):
+        load_zero_shot_classifier("tensorrt", "model")
+    assert loaders == []
+
+def test_parity_report_measures_drift_against_the_reference(monkeypatch):
+    """Drift and top-label agreement should be computed against the first backend."""
+    scores = {
+        "torch": [[0.7, 0.3], [0.4, 0.6]],
+        "torch-int8": [[0.6, 0.4], [0.45, 0.55]],
+        "onnx": [[0.4, 0.6], [0.4, 0.6]]
+    }
+
+    def load(backend):
+        if backend == "onnx":
+            raise ImportError("No module named 'optimum'")
+        return lambda texts, labels: [{"labels": labels, "scores": row} for row in scores[backend]]
+
+    _installed(monkeypatch)
+    monkeypatch.setattr(inference_backends, "load_zero_shot_classifier", load)
+    report = check_backend_parity(["torch", "torch-int8", "onnx"], texts=["a", "b"], labels=["x", "y"])
+
+    assert report["reference"] == "torch"
+    assert report["backends"]["torch"]["max_abs_drift"] == 0
+    int8 = report["backends"]["torch-int8"]
+    assert int8["max_abs_drift"] == pytest.approx(0.1) and int8["top_label_agreement"] == 1.0
+    assert "optimum" in report["backends"]["onnx"]["error"]
+
+def test_parity_skips_backends_that_fall_back_to_torch(monkeypatch, loaders):
+    """Without optimum the onnx row must be reported as skipped, not as torch scored against itself."""
+    _installed(monkeypatch, "optimum")
+    monkeypatch.setattr(
+        inference_backends, "_load_torch",
+        lambda model_name: loaders.append("torch") or (lambda texts, labels: [{"labels": labels, "scores": [0.7, 0.3]} for _ in texts])
+    )
+    report = check_backend_parity(["torch", "onnx"], texts=["a"], labels=["x", "y"])
+
+    assert report["backends"]["onnx"] == {"skipped": "fell back to torch"}
+    assert "max_abs_drift" in report["backends"]["torch"]
+    assert loaders == ["torch"]
+
+def test_model_status_reports_the_resolved_backend(monkeypatch):
+    """The status should show which backend was actually loaded, not just the configured one."""
+    from backend.detection import pipeline
+
+    _installed(monkeypatch, "optimum")
+    monkeypatch.setattr(pipeline, "TEXT_CLASSIFIER_BACKEND", "onnx")
+    status = pipeline.get_model_status()
+
+    assert status["text_classifier_backend"] == "onnx"
+    assert status["text_classifier_backend_resolved"] == "torch"
+
+def test_model_status_reports_an_unsupported_backend(monkeypatch):
+    """A backend typo should show up in the status instead of making /status and /metrics fail."""
+    from backend.detection import pipeline
+
+    monkeypatch.setattr(pipeline, "TEXT_CLASSIFIER_BACKEND", "tensorrt")
+    status = pipeline.get_model_status()
+
+    assert status["text_classifier_backend_resolved"] is None
+    assert "tensorrt" in status["text_classifier_backend_error"]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental parsing of /analyze/batch upload bodies.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.ingest import iter_bulk_items, item_to_post_fields, IngestError
+
+async def _chunks(body: bytes, size: int):
+    """Yield the body in fixed-size chunks, like a streamed request."""
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+def _collect(body: bytes, size: int = 3):
+    """Parse a body split into small chunks and return every item."""
+    async def run():
+        return [item async for item in iter_bulk_items(_chunks(body, size))]
+    return asyncio.run(run())
+
+def test_json_array_split_across_chunks():
+    """Array elements should be decoded even when split across chunk boundaries."""
+    body = b' [ "first post", {"content": "second \\u00e9 post", "id": 7} ] '
+    assert _collect(body) == ["first post", {"content": "second é post", "id": 7}]
+
+def test_ndjson_body():
+    """Each NDJSON line should be yielded, skipping blank lines."""
+    body = b'{"content": "a"}\n\n{"content": "b"}\n"c"'
+    assert _collect(body) == [{"content": "a"}, {"content": "b"}, "c"]
+
+def test_unterminated_array_is_rejected():
+    """A truncated JSON array should raise after yielding the complete items."""
+    items = []
+
+    async def run():
+        async for item in iter_bulk_items(_chunks(b'["a", "b', 2)):
+            items.append(item)
+
+    try:
+        asyncio.run(run())
+    except IngestError:
+        pass
+    else:
+        raise AssertionError("Expected IngestError")
+    assert items == ["a"]
+
+def test_item_normalization():
+    """Strings and objects map to post fields; other values are rejected."""
+    assert item_to_post_fields("hi") == {"content": "hi", "content_type": "text"}
+    assert item_to_post_fields({"content": "hi", "id": "x1"})["external_id"] == "x1"
+
+    try:
+        item_to_post_fields(42)
+    except IngestError:
+        pass
+    else:
+        raise AssertionError("Expected IngestError")
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact slotted detection log record.
+"""
+
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.logs.record import DetectionRecord, benchmark_memory
+
+def test_record_renders_message_and_dict_lazily():
+    """Rendering should match the logger's console format and dict fields."""
+    record = DetectionRecord.from_result(7, {
+        "post_id": 3, "trust_score": 12, "classification": "misinformation",
+        "reason": "Cross-modal mismatch", "timestamp": "2025-07-30T14:33:00Z"
+    }, logged_at_epoch=0.0)
+
+    assert not hasattr(record, "__dict__")
+    assert record.formatted_message == "[AI-Agent] Post #3 → Trust Score: 12% 🚨 → Reason: Cross-modal mismatch"
+    entry = record.to_dict()
+    assert entry["logged_at"] == "1970-01-01T00:00:00Z"
+    assert entry["formatted_message"] == record.formatted_message
+    assert json.loads(record.to_json())["id"] == 7
+    assert record["trust_score"] == record.get("trust_score") == 12
+    assert record.get("missing", "default") == "default"
+
+def test_slotted_layout_uses_less_memory():
+    """The benchmark should show the slotted layout below the dict layout."""
+    result = benchmark_memory(2000)
+    assert result["slotted"]["total_mb"] < result["dict"]["total_mb"]
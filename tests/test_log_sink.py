@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the asynchronous batched log writer and its sinks.
+"""
+
+import json
+import os
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.logs.sink import AsyncLogWriter, JsonLinesFileSink
+
+class _CollectingSink:
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+        self.closed = False
+
+    def write(self, records):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.batches.append(list(records))
+
+    def close(self):
+        self.closed = True
+
+def test_flush_waits_for_every_queued_record():
+    """Records should be written in order and in batches no larger than batch_size."""
+    sink = _CollectingSink()
+    writer = AsyncLogWriter([sink], batch_size=4)
+    for i in range(10):
+        assert writer.enqueue({"line": str(i)})
+
+    assert writer.flush()
+    written = [record["line"] for batch in sink.batches for record in batch]
+    assert written == [str(i) for i in range(10)]
+    assert all(len(batch) <= 4 for batch in sink.batches)
+
+    writer.close()
+    assert sink.closed
+    assert writer.get_stats()["written"] == 10
+
+def test_overflow_drops_and_counts_records():
+    """A full queue should drop new records instead of blocking."""
+    gate = threading.Event()
+    sink = _CollectingSink(gate)
+    writer = AsyncLogWriter([sink], max_queue=2, batch_size=1)
+
+    results = [writer.enqueue({"line": str(i)}) for i in range(20)]
+    gate.set()
+    writer.flush()
+
+    stats = writer.get_stats()
+    assert results.count(False) == stats["dropped"] > 0
+    assert stats["written"] + stats["dropped"] == 20
+    writer.close()
+
+def test_json_lines_file_rotates_by_size(tmp_path):
+    """The file sink should rotate once it passes max_bytes and keep backup_count files."""
+    path = str(tmp_path / "detections.jsonl")
+    sink = JsonLinesFileSink(path, max_bytes=200, backup_count=2)
+    for i in range(30):
+        sink.write([{"data": {"id": i, "reason": "x" * 20}}])
+    sink.close()
+
+    assert os.path.exists(path + ".1")
+    assert os.path.exists(path + ".2")
+    assert not os.path.exists(path + ".3")
+    with open(path + ".1", encoding="utf-8") as f:
+        assert all("id" in json.loads(line) for line in f)
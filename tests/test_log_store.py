@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite detection log store.
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.id_allocator import BlockIdAllocator
+from backend.logs.store import DetectionLogStore
+
+def _entry(log_id, trust_score):
+    return {"id": log_id, "post_id": log_id, "trust_score": trust_score, "reason": "test",
+            "timestamp": f"t{log_id}", "logged_at": f"t{log_id}"}
+
+def test_batched_inserts_are_visible_to_queries(tmp_path):
+    """Pending entries should be flushed before a query runs."""
+    store = DetectionLogStore(str(tmp_path / "logs.db"), batch_size=100, flush_interval=0)
+    for log_id in range(1, 6):
+        store.add(_entry(log_id, log_id * 10))
+
+    assert store.count() == 5
+    assert store.max_id() == 5
+    store.close()
+
+def test_failed_flush_keeps_entries_pending(tmp_path):
+    """A write that fails (e.g. a locked database) should be retried by the next flush, not lost."""
+    store = DetectionLogStore(str(tmp_path / "logs.db"), batch_size=100, flush_interval=0)
+    conn = store._conn
+
+    class LockedConnection:
+        def __enter__(self):
+            return conn.__enter__()
+
+        def __exit__(self, *exc):
+            return conn.__exit__(*exc)
+
+        def executemany(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    store.add(_entry(1, 10))
+    store.add(_entry(2, 20))
+    store._conn = LockedConnection()
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+
+    store._conn = conn
+    assert store.flush() == 2
+    assert store.count() == 2
+    store.close()
+
+def test_cursor_pagination_with_trust_filter(tmp_path):
+    """Pages should walk newest-first through the filtered range without overlap."""
+    store = DetectionLogStore(str(tmp_path / "logs.db"), flush_interval=0)
+    store.add_many([_entry(log_id, log_id % 100) for log_id in range(1, 201)])
+
+    seen, cursor = [], None
+    while True:
+        entries, cursor = store.query(min_trust=0, max_trust=29, before_seq=cursor, limit=7)
+        seen.extend(entry["id"] for entry in entries)
+        if cursor is None:
+            break
+
+    expected = [log_id for log_id in range(200, 0, -1) if log_id % 100 < 30]
+    assert seen == expected
+    store.close()
+
+def test_store_survives_reopen(tmp_path):
+    """Entries should persist across connections."""
+    path = str(tmp_path / "logs.db")
+    store = DetectionLogStore(path, flush_interval=0)
+    store.add(_entry(1, 42))
+    store.close()
+
+    reopened = DetectionLogStore(path, flush_interval=0)
+    entries, _ = reopened.query(post_id=1)
+    assert entries[0]["trust_score"] == 42
+    reopened.close()
+
+def test_interleaved_worker_ids_are_neither_skipped_nor_repeated(tmp_path):
+    """
+    Two workers allocate log IDs from separate blocks and commit them in a
+    different order; a lower ID committed after a reader passed it must still
+    be read once by the export iterator and by page walks.
+    """
+    ids_path = str(tmp_path / "ids.db")
+    worker_a = BlockIdAllocator("log_entry", ids_path, block_size=10)
+    worker_b = BlockIdAllocator("log_entry", ids_path, block_size=10)
+    low_ids = worker_a.next_ids(3)    # 1, 2, 3
+    high_ids = worker_b.next_ids(3)   # 11, 12, 13
+
+    store = DetectionLogStore(str(tmp_path / "logs.db"), flush_interval=0)
+    store.add_many([_entry(log_id, 10) for log_id in high_ids])
+
+    exported = [entry["id"] for chunk in store.iter_after(0) for entry in chunk]
+    watermark = max(entry["seq"] for chunk in store.iter_after(0) for entry in chunk)
+    first_page, cursor = store.query(limit=2)
+
+    # Worker A's slower writer commits its lower IDs after both readers moved on
+    store.add_many([_entry(log_id, 10) for log_id in low_ids])
+
+    exported += [entry["id"] for chunk in store.iter_after(watermark) for entry in chunk]
+    assert sorted(exported) == sorted(low_ids + high_ids)
+
+    rest_of_walk, _ = store.query(before_seq=cursor, limit=10)
+    walked = [entry["id"] for entry in first_page + rest_of_walk]
+    assert walked == [13, 12, 11]
+    newest, _ = store.query(limit=3)
+    assert [entry["id"] for entry in newest] == [3, 2, 1]
+    store.close()
+
+def test_store_without_seq_is_migrated(tmp_path):
+    """A store created before the seq column should be rebuilt with rows numbered in id order."""
+    path = str(tmp_path / "logs.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE detection_logs (id INTEGER PRIMARY KEY, post_id INTEGER, trust_score INTEGER, "
+                 "classification TEXT, reason TEXT, timestamp TEXT, logged_at TEXT)")
+    conn.executemany("INSERT INTO detection_logs (id, trust_score) VALUES (?, ?)", [(5, 50), (2, 20)])
+    conn.commit()
+    conn.close()
+
+    store = DetectionLogStore(path, flush_interval=0)
+    store.add(_entry(3, 30))
+    assert [(entry["seq"], entry["id"]) for entry in next(store.iter_after(0))] == [(1, 2), (2, 5), (3, 3)]
+    assert store.seq_for_id(2) == 1
+    store.close()
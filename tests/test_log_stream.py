@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the live detection stream (Server-Sent Events).
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.logs.stream import DetectionBroadcaster, sse_event_stream, summary_delta
+
+def test_resume_replays_events_after_last_event_id():
+    """A reconnecting subscriber should receive only events newer than its Last-Event-ID."""
+    async def scenario():
+        broadcaster = DetectionBroadcaster(replay_size=10)
+        for post_id in range(1, 6):
+            broadcaster.publish("detection", {"post_id": post_id})
+
+        subscriber = broadcaster.subscribe(last_event_id=3)
+        frames = await broadcaster.next_frames(subscriber, timeout=0.1)
+        broadcaster.unsubscribe(subscriber)
+        return frames
+
+    frames = asyncio.run(scenario())
+    assert [frame.split("\n")[0] for frame in frames] == ["id: 4", "id: 5"]
+
+def test_event_ids_are_log_record_ids():
+    """Detection events carry their log record ID, so resume points survive a restart."""
+    async def scenario():
+        # A restarted broadcaster has no replay window, only newer records
+        broadcaster = DetectionBroadcaster(replay_size=10)
+        for log_id in (1042, 1041, 1043):
+            broadcaster.publish("detection", {"id": log_id}, event_id=log_id)
+
+        resumed = broadcaster.subscribe(last_event_id=1042)
+        after_gap = broadcaster.subscribe(last_event_id=1000)
+        frames = [await broadcaster.next_frames(s, timeout=0.1) for s in (resumed, after_gap)]
+        broadcaster.unsubscribe(resumed)
+        broadcaster.unsubscribe(after_gap)
+        return frames
+
+    resumed, after_gap = asyncio.run(scenario())
+    # 1041 was published after 1042, so a client that saw 1042 has not seen it yet
+    assert [frame.split("\n")[0] for frame in resumed] == ["id: 1041", "id: 1043"]
+    assert len(after_gap) == 3
+
+def test_slow_subscriber_buffer_is_bounded():
+    """Undelivered events beyond the buffer size should be dropped oldest-first and counted."""
+    async def scenario():
+        broadcaster = DetectionBroadcaster(buffer_size=4)
+        subscriber = broadcaster.subscribe()
+        for post_id in range(10):
+            broadcaster.publish("detection", {"post_id": post_id})
+        frames = await broadcaster.next_frames(subscriber, timeout=0.1)
+        stats = broadcaster.get_stats()
+        broadcaster.unsubscribe(subscriber)
+        return frames, stats
+
+    frames, stats = asyncio.run(scenario())
+    assert len(frames) == 4
+    assert '"post_id": 9' in frames[-1]
+    assert stats["dropped"] == 6
+
+def test_stream_sends_summary_then_detections_then_deltas():
+    """The stream should start with a full summary and later send only changed fields."""
+    current = {"total_logs": 1, "avg_trust_score": 50.0}
+
+    async def scenario():
+        broadcaster = DetectionBroadcaster()
+        subscriber = broadcaster.subscribe()
+        stream = sse_event_stream(broadcaster, subscriber, lambda: dict(current), 0.05)
+        seen = []
+        seen.append(await stream.__anext__())
+        seen.append(await stream.__anext__())
+        broadcaster.publish("detection", {"post_id": 7})
+        current["total_logs"] = 2
+        seen.append(await stream.__anext__())
+        seen.append(await stream.__anext__())
+        await stream.aclose()
+        return seen, broadcaster.get_stats()
+
+    seen, stats = asyncio.run(scenario())
+    assert seen[0].startswith("retry:")
+    assert seen[1].startswith("event: summary")
+    assert "event: detection" in seen[2]
+    assert seen[3] == 'event: summary\ndata: {"total_logs": 2}\n\n'
+    assert stats["subscribers"] == 0
+    assert summary_delta({"a": 1}, {"a": 1, "b": 2}) == {"b": 2}
+
+def test_resume_outside_the_window_reads_history_without_duplicates():
+    """A Last-Event-ID this worker never published should be resumed from the store's history."""
+    history_calls = []
+
+    def history(last_event_id, limit):
+        history_calls.append(last_event_id)
+        # Committed after 1042 on other workers, plus one this worker has already published
+        return [(7, {"id": 7}), (1043, {"id": 1043})]
+
+    async def scenario():
+        broadcaster = DetectionBroadcaster(replay_size=10, history_fn=history)
+        broadcaster.publish("detection", {"id": 1043}, event_id=1043)
+
+        resumed = broadcaster.subscribe(last_event_id=1042)
+        broadcaster.publish("detection", {"id": 1044}, event_id=1044)
+        local = broadcaster.subscribe(last_event_id=1043)
+        frames = [await broadcaster.next_frames(s, timeout=0.1) for s in (resumed, local)]
+        broadcaster.unsubscribe(resumed)
+        broadcaster.unsubscribe(local)
+        return frames
+
+    resumed, local = asyncio.run(scenario())
+    assert [frame.split("\n")[0] for frame in resumed] == ["id: 7", "id: 1043", "id: 1044"]
+    # A resume point inside this worker's window does not touch the store
+    assert [frame.split("\n")[0] for frame in local] == ["id: 1044"]
+    assert history_calls == [1042]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the detection logger's reads across the in-memory ring buffer and the log store.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.logs import logger
+from backend.logs.record import DetectionRecord
+from backend.logs.ring_buffer import DetectionRingBuffer
+from backend.logs.store import DetectionLogStore
+
+@pytest.fixture
+def log_state(tmp_path, monkeypatch):
+    """A fresh ring buffer and log store for the logger; records are written through the store directly."""
+    store = DetectionLogStore(str(tmp_path / "logs.db"), flush_interval=0)
+    buffer = DetectionRingBuffer(2)
+    monkeypatch.setattr(logger, "_log_store", store)
+    monkeypatch.setattr(logger, "_log_buffer", buffer)
+
+    def log(log_id, trust_score):
+        record = DetectionRecord.from_result(log_id, {
+            "post_id": log_id, "trust_score": trust_score, "classification": "misinformation",
+            "reason": f"reason {log_id}", "timestamp": "2025-07-30T14:33:00Z"
+        }, logged_at_epoch=1_790_000_000.123456 + log_id)
+        buffer.append(record)
+        store.add(record.to_dict(include_message=False))
+        return record
+
+    yield log
+    store.close()
+
+def test_store_rows_round_trip_through_records():
+    record = DetectionRecord.from_result(5, {"post_id": 1, "trust_score": 40, "reason": "r"},
+                                         logged_at_epoch=1_790_000_000.123456)
+    assert DetectionRecord.from_row(record.to_dict(include_message=False)).to_dict() == record.to_dict()
+
+def test_store_and_buffer_entries_have_the_same_shape(log_state):
+    """Entries read from the store should carry the same fields, formatted_message included."""
+    for log_id in range(1, 6):
+        log_state(log_id, 10)
+
+    buffered = logger.get_logs(2)
+    merged = logger.get_logs_by_trust_range(0, 20, limit=5)
+    page = logger.get_logs_page(limit=5)["logs"]
+
+    assert len(merged) == len(page) == 5
+    for entry in merged + page:
+        assert set(entry) == set(buffered[0])
+        assert entry["formatted_message"].startswith(f"[AI-Agent] Post #{entry['post_id']} ")
+    assert page[-1] == merged[-1]
+
+def test_stream_history_follows_commit_order(log_state):
+    """Stream resumes read the store from the resume point's seq, not by comparing log IDs."""
+    # Two workers' ID blocks, committed interleaved
+    records = {log_id: log_state(log_id, 10) for log_id in (101, 1, 102, 2, 103)}
+
+    history = logger.get_detections_after(102, limit=10)
+    assert history == [(log_id, records[log_id].to_dict(include_message=False)) for log_id in (2, 103)]
+    assert logger.get_detections_after(999, limit=10) is None
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tests for in-memory upload handling and audio decoding.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import shutil
+import struct
+import subprocess
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.media import read_media, parse_media_form, MediaRejected, MediaWriter
+from backend.detection.transcription import decode_audio
+
+def test_small_uploads_stay_in_memory():
+    """Uploads under the threshold should be held as bytes with their hash."""
+    payload = b"\x89PNG" + os.urandom(3000)
+    with read_media(io.BytesIO(payload), "photo.png", spool_threshold=10_000) as media:
+        assert media.in_memory
+        assert media.source == payload
+        assert media.sha256 == hashlib.sha256(payload).hexdigest()
+
+def test_large_uploads_spool_and_are_removed():
+    """Uploads over the threshold should spool to disk and be deleted on close."""
+    payload = os.urandom(3 << 20)
+    with read_media(io.BytesIO(payload), "clip.mp3", spool_threshold=1 << 20) as media:
+        path = media.source
+        assert not media.in_memory and path.endswith(".mp3")
+        with open(path, "rb") as f:
+            assert f.read() == payload
+        assert media.size == len(payload)
+    assert not os.path.exists(path)
+
+def test_spool_is_removed_when_reading_fails():
+    """A failed read should not leave a spool file behind."""
+    class FailingStream:
+        def __init__(self):
+            self.calls = 0
+
+        def read(self, size):
+            self.calls += 1
+            if self.calls > 2:
+                raise IOError("connection reset")
+            return b"x" * size
+
+    before = set(os.listdir(os.environ.get("TMPDIR", "/tmp")))
+    with pytest.raises(IOError):
+        read_media(FailingStream(), "clip.wav", spool_threshold=1)
+    assert set(os.listdir(os.environ.get("TMPDIR", "/tmp"))) - before == set()
+
+def _wav(seconds: float, sample_rate: int = 8000) -> bytes:
+    """A silent 16-bit mono WAV file of the given length."""
+    data_size = int(seconds * sample_rate) * 2
+    header = (b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE"
+              + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+              + b"data" + struct.pack("<I", data_size))
+    return header + b"\x00" * data_size
+
+def _multipart(parts, boundary: str = "testboundary"):
+    """Encode (name, filename, data) parts as a multipart/form-data body."""
+    body = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename is not None else "")
+        body += f"--{boundary}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + data + b"\r\n"
+    body += f"--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+def _parse(body: bytes, content_type: str, consumed: dict = None, chunk_size: int = 1000, **kwargs):
+    """Run parse_media_form over the body in chunks, counting the chunks consumed."""
+    consumed = {} if consumed is None else consumed
+    consumed["chunks"] = 0
+
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            consumed["chunks"] += 1
+            yield body[start:start + chunk_size]
+
+    return asyncio.run(parse_media_form(chunks(), content_type, **kwargs))
+
+def test_unsupported_image_is_rejected_from_first_bytes():
+    """A file that is not a known image format should get 415 without reading the rest."""
+    with pytest.raises(MediaRejected) as error:
+        read_media(io.BytesIO(b"#!/bin/sh\n" + b"x" * 100), "photo.png", modality="image")
+    assert error.value.status_code == 415
+
+def test_oversized_upload_is_rejected_while_reading():
+    """Exceeding the byte cap should raise 413 at the chunk that crosses it."""
+    writer = MediaWriter("photo.png", "image", max_bytes=5000)
+    writer.write(b"\x89PNG\r\n\x1a\n" + b"\x00" * 4000)
+    with pytest.raises(MediaRejected) as error:
+        writer.write(b"\x00" * 2000)
+    assert error.value.status_code == 413
+    writer.abort()
+
+def test_long_wav_is_rejected_from_header():
+    """A WAV header declaring more than the allowed duration should be rejected."""
+    writer = MediaWriter("clip.wav", "audio", max_seconds=1.0)
+    with pytest.raises(MediaRejected) as error:
+        writer.write(_wav(2.0))
+    assert error.value.status_code == 413
+
+    with read_media(io.BytesIO(_wav(0.5)), "clip.wav", modality="audio") as media:
+        assert media.format == "wav" and media.duration == pytest.approx(0.5)
+
+def test_multipart_form_is_parsed_as_a_stream():
+    """Text fields and files should be parsed with hashes, skipping empty file inputs."""
+    image = b"\x89PNG\r\n\x1a\n" + os.urandom(5000)
+    body, content_type = _multipart([("text", None, "caption ✅".encode()), ("image", "photo.png", image),
+                                     ("audio", "", b"")])
+    with _parse(body, content_type) as form:
+        assert form.fields == {"text": "caption ✅"}
+        assert set(form.files) == {"image"}
+        assert form.files["image"].source == image
+        assert form.files["image"].sha256 == hashlib.sha256(image).hexdigest()
+        assert form.files["image"].format == "png"
+
+def test_multipart_rejects_bad_file_early():
+    """An unsupported file part should stop parsing before the rest of the body is read."""
+    body, content_type = _multipart([("text", None, b"hi"), ("image", "photo.png", b"not an image" * 10_000)])
+    consumed = {}
+    with pytest.raises(MediaRejected) as error:
+        _parse(body, content_type, consumed)
+    assert error.value.status_code == 415
+    assert consumed["chunks"] == 1
+
+def test_declared_content_length_over_limit_is_rejected():
+    """A Content-Length above the combined limits should be refused before reading the body."""
+    body, content_type = _multipart([("text", None, b"hi")])
+    with pytest.raises(MediaRejected) as error:
+        _parse(body, content_type, content_length=str(10 ** 12))
+    assert error.value.status_code == 413
+
+def test_duplicate_file_field_is_rejected_and_closed():
+    """A second part for the same file field should be refused, removing the first part's spool file."""
+    audio = _wav(180.0, sample_rate=48000)   # above the spool threshold
+    body, content_type = _multipart([("audio", "a.wav", audio), ("audio", "b.wav", _wav(1.0))])
+
+    before = set(os.listdir(os.environ.get("TMPDIR", "/tmp")))
+    with pytest.raises(MediaRejected) as error:
+        _parse(body, content_type, chunk_size=1 << 20)
+    assert error.value.status_code == 422
+    assert set(os.listdir(os.environ.get("TMPDIR", "/tmp"))) - before == set()
+
+def test_truncated_multipart_body_is_rejected():
+    """A body that ends inside a part should be refused, not parsed as a complete form."""
+    body, content_type = _multipart([("text", None, b"hi"), ("image", "photo.png", b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)])
+    with pytest.raises(MediaRejected) as error:
+        _parse(body[:-40], content_type)
+    assert error.value.status_code == 400
+
+def test_garbage_multipart_body_gets_400(monkeypatch):
+    """A body that is not valid multipart framing should be a client error, not a 500."""
+    from fastapi.testclient import TestClient
+
+    from backend import main
+
+    monkeypatch.setattr(main, "agent_instance", object())
+    response = TestClient(main.app).post(
+        "/detect-cross-modal", content=b"this is not multipart at all",
+        headers={"Content-Type": "multipart/form-data; boundary=testboundary"}
+    )
+    assert response.status_code == 400
+    assert response.json() == {"error": "Malformed multipart body"}
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_decode_audio_from_bytes():
+    """Audio bytes should decode to a 16 kHz mono float32 waveform."""
+    wav = subprocess.run(
+        ["ffmpeg", "-f", "lavfi", "-i", "sine=frequency=440:duration=1", "-f", "wav", "pipe:1"],
+        capture_output=True, check=True
+    ).stdout
+    samples = decode_audio(wav)
+    assert samples.dtype.name == "float32"
+    assert abs(len(samples) - 16000) < 200
+    assert 0.1 < abs(samples).max() <= 1.0
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics: histograms, stage timing and the exposition format.
+"""
+
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.metrics import (
+    Histogram, STAGE_ERRORS, STAGE_LATENCY, observe_stage, render_metrics, serve_metrics, timed
+)
+
+# name{labels} value, or name value
+SAMPLE_LINE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="[^"]*",?)*\})? [0-9.e+\-Inf]+$')
+
+def test_histogram_renders_cumulative_buckets():
+    """Bucket samples should be cumulative and end with +Inf equal to the count."""
+    histogram = Histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe("a", value)
+
+    rendered = histogram.collect().render()
+    assert 'hacksky_test_seconds_bucket{stage="a",le="0.1"} 1' in rendered
+    assert 'hacksky_test_seconds_bucket{stage="a",le="1.0"} 3' in rendered
+    assert 'hacksky_test_seconds_bucket{stage="a",le="+Inf"} 4' in rendered
+    assert 'hacksky_test_seconds_count{stage="a"} 4' in rendered
+    assert 'hacksky_test_seconds_sum{stage="a"} 6.25' in rendered
+
+def test_timed_records_latency_and_errors():
+    """Decorated calls should be observed, and exceptions counted, under their stage."""
+    @timed("test.stage")
+    def work(fail=False):
+        if fail:
+            raise ValueError("boom")
+        return 42
+
+    before = (STAGE_LATENCY.get_series("test.stage") or {"count": 0})["count"]
+    assert work() == 42
+    with pytest.raises(ValueError):
+        work(fail=True)
+    assert STAGE_LATENCY.get_series("test.stage")["count"] == before + 2
+    assert 'hacksky_stage_errors_total{stage="test.stage"}' in STAGE_ERRORS.collect().render()
+
+def test_observe_stage_counts_errors():
+    """Stages timed with the context manager should count exceptions like the decorator does."""
+    with pytest.raises(ValueError):
+        with observe_stage("test.block"):
+            raise ValueError("boom")
+    with observe_stage("test.block"):
+        pass
+
+    assert STAGE_LATENCY.get_series("test.block")["count"] == 2
+    assert 'hacksky_stage_errors_total{stage="test.block"} 1' in STAGE_ERRORS.collect().render()
+
+def test_timing_overhead_is_small():
+    """Timing a call should add only a few microseconds."""
+    @timed("test.overhead")
+    def noop():
+        pass
+
+    calls = 20_000
+    started = time.perf_counter()
+    for _ in range(calls):
+        noop()
+    assert (time.perf_counter() - started) / calls < 20e-6
+
+def test_render_metrics_is_valid_exposition_format():
+    """Every non-comment line should be a well-formed sample, and service gauges should be present."""
+    text = render_metrics()
+    for line in text.strip().splitlines():
+        if not line.startswith("#"):
+            assert SAMPLE_LINE.match(line), line
+    for name in ("hacksky_queue_depth", "hacksky_cache_hit_ratio", "hacksky_model_loaded", "hacksky_verdicts_total"):
+        assert name in text
+
+    # Every sample belongs to the family named on the preceding TYPE line (counters included)
+    family = None
+    for line in text.strip().splitlines():
+        if line.startswith("# TYPE "):
+            family, metric_type = line.split()[2:4]
+        elif not line.startswith("#"):
+            name = re.split(r"[{ ]", line, 1)[0]
+            suffixes = ("_bucket", "_sum", "_count") if metric_type == "histogram" else ("",)
+            assert name in {family + suffix for suffix in suffixes}, line
+    assert "# TYPE hacksky_verdicts_total counter" in text
+
+def test_worker_metrics_port_serves_this_process():
+    """A worker's dedicated metrics port should serve its own exposition, labelled with its pid."""
+    server = serve_metrics("127.0.0.1", 0)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert f'hacksky_worker_info{{pid="{os.getpid()}"}} 1' in body
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{base}/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
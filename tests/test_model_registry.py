@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared, lazily-loaded model registry.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.detection.model_registry import ModelRegistry, ModelLoadError
+
+def test_models_load_once_on_first_use():
+    """A model should only be loaded the first time it is requested."""
+    calls = []
+    registry = ModelRegistry()
+    registry.register("bart", lambda: calls.append("bart") or object())
+
+    assert not registry.is_loaded("bart")
+    first = registry.get("bart")
+    second = registry.get("bart")
+
+    assert first is second
+    assert calls == ["bart"]
+    assert registry.get_status()["models"]["bart"]["state"] == "loaded"
+
+def test_lru_limit_unloads_least_recently_used():
+    """Loading past the limit should unload the least recently used model."""
+    registry = ModelRegistry(max_loaded=2)
+    for name in ("bart", "clip", "whisper"):
+        registry.register(name, object)
+
+    registry.get("bart")
+    registry.get("clip")
+    registry.get("bart")
+    registry.get("whisper")
+
+    assert registry.is_loaded("bart")
+    assert registry.is_loaded("whisper")
+    assert not registry.is_loaded("clip")
+
+def test_failed_loads_are_remembered():
+    """A failing loader should not be retried on every request."""
+    calls = []
+
+    def broken_loader():
+        calls.append(1)
+        raise OSError("weights not found")
+
+    registry = ModelRegistry()
+    registry.register("clip", broken_loader)
+
+    for _ in range(3):
+        try:
+            registry.get("clip")
+        except ModelLoadError:
+            pass
+
+    assert len(calls) == 1
+    assert registry.get_status()["models"]["clip"]["state"] == "failed"
+
+def test_global_registry_is_created_once_under_concurrency(monkeypatch):
+    """The warm-up thread and request threads racing on first use should share one registry."""
+    import threading
+    import time
+
+    from backend.detection import model_registry
+
+    created = []
+
+    class SlowRegistry(ModelRegistry):
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(model_registry, "_registry_instance", None)
+    monkeypatch.setattr(model_registry, "ModelRegistry", SlowRegistry)
+
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(model_registry.get_model_registry())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(registry is created[0] for registry in seen)
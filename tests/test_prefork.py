@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the preforking launcher and the per-module fork resets.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend import id_allocator, executor, prefork
+from backend.detection import transcription
+from backend.detection.batching import MicroBatcher
+from backend.detection.model_registry import parse_model_names
+from backend.prefork import configure_transcription, preload_models, worker_thread_count
+
+def test_worker_threads_split_cores(monkeypatch):
+    """Unset thread counts should divide the CPU cores across workers."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    assert worker_thread_count(4) == 2
+    assert worker_thread_count(16) == 1
+    assert worker_thread_count(4, num_threads=3) == 3
+    assert parse_model_names(" BART, clip,,whisper ") == ["bart", "clip", "whisper"]
+
+def test_whisper_is_preloaded_and_shared_by_default(monkeypatch):
+    """Without TRANSCRIPTION_WORKERS, prefork should transcribe in-process with the parent's Whisper."""
+    class StubRegistry:
+        def __init__(self):
+            self.loaded = []
+
+        def get(self, name):
+            self.loaded.append(name)
+
+    registry = StubRegistry()
+    monkeypatch.setattr(prefork, "get_model_registry", lambda: registry)
+    monkeypatch.setattr(transcription, "_transcription_workers", -1)
+    assert transcription.transcription_workers() == 1   # development default
+
+    assert configure_transcription(-1) == 0
+    assert transcription.transcription_workers() == 0
+    assert set(preload_models(["bart", "whisper"])) == {"bart", "whisper"}
+
+    # An explicit pool keeps Whisper out of the parent
+    configure_transcription(2)
+    assert set(preload_models(["whisper"])) == set()
+    assert registry.loaded == ["bart", "whisper"]
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fork_resets_worker_state(tmp_path, monkeypatch):
+    """A forked child should start without the parent's ID block, executor or batcher queue."""
+    allocator = id_allocator.BlockIdAllocator("fork_test", str(tmp_path / "ids.db"), block_size=100)
+    monkeypatch.setitem(id_allocator._allocators, "fork_test", allocator)
+    parent_id = allocator.next_id()
+
+    executor.get_inference_executor()
+    batcher = MicroBatcher(lambda items: items, name="fork-test-batcher")
+    assert batcher.submit(1) == 1
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_fd)
+            state = {
+                "remaining": allocator.get_stats()["remaining_in_block"],
+                "child_id": allocator.next_id(),
+                "executor_reset": executor._executor_instance is None,
+                "batcher_worker": batcher._worker is None,
+                "batcher_result": batcher.submit(2)
+            }
+            os.write(write_fd, json.dumps(state).encode())
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        state = json.loads(pipe.read())
+    os.waitpid(pid, 0)
+
+    assert state["remaining"] == 0
+    assert state["child_id"] >= parent_id + 100
+    assert state["executor_reset"] and state["batcher_worker"]
+    assert state["batcher_result"] == 2
+    assert allocator.next_id() == parent_id + 1
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the fixed-capacity detection log ring buffer.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.logs.ring_buffer import DetectionRingBuffer
+
+def test_eviction_keeps_running_summary_in_sync():
+    """Counters should match a full recomputation after the buffer wraps."""
+    buffer = DetectionRingBuffer(capacity=3)
+    scores = [10, 80, 50, 20, 95]
+    for post_id, score in enumerate(scores, 1):
+        buffer.append({"post_id": post_id, "trust_score": score, "timestamp": f"t{post_id}"})
+
+    kept = scores[-3:]
+    summary = buffer.summary()
+
+    assert summary["count"] == 3
+    assert summary["trust_sum"] == sum(kept)
+    assert summary["high_trust_count"] == 1
+    assert summary["medium_trust_count"] == 1
+    assert summary["low_trust_count"] == 1
+    assert summary["latest"]["timestamp"] == "t5"
+    assert summary["total_evicted"] == 2
+
+def test_latest_returns_newest_first():
+    """latest() should return the most recent entries in reverse order."""
+    buffer = DetectionRingBuffer(capacity=4)
+    for post_id in range(1, 7):
+        buffer.append({"post_id": post_id, "trust_score": 50})
+
+    assert [entry["post_id"] for entry in buffer.latest(3)] == [6, 5, 4]
+    assert [entry["post_id"] for entry in buffer.iter_newest_first()] == [6, 5, 4, 3]
+    assert buffer.clear() == 4
+    assert buffer.latest() == []
+
+def test_trust_range_query_uses_newest_matches():
+    """Range queries should merge score buckets newest-first and respect evictions."""
+    buffer = DetectionRingBuffer(capacity=50)
+    entries = [{"id": i, "trust_score": (i * 37) % 101} for i in range(1, 201)]
+    for entry in entries:
+        buffer.append(entry)
+
+    buffered = entries[-50:]
+    for low, high, limit in [(0, 30, 10), (31, 69, 100), (0, 100, 5), (100, 100, 3), (70, 20, 5)]:
+        expected = [e for e in reversed(buffered) if low <= e["trust_score"] <= high][:limit]
+        assert buffer.latest_in_range(low, high, limit) == expected
+
+    assert buffer.oldest() is buffered[0]
+    buffer.clear()
+    assert buffer.latest_in_range(0, 100, 10) == []
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the startup profile, background model warm-up and warm-up fallback.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.detection import model_registry, pipeline
+from backend.detection.model_registry import ModelRegistry
+from backend.startup import ModelWarmup, StartupProfile
+
+def test_app_import_loads_no_model_libraries():
+    """Importing the app should not import numpy, torch, PIL, transformers or whisper."""
+    heavy = ("numpy", "torch", "PIL", "transformers", "whisper")
+    code = f"import sys, backend.main; print('loaded:' + ','.join(m for m in {heavy!r} if m in sys.modules))"
+    root = os.path.join(os.path.dirname(__file__), '..')
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert output.stdout.strip().splitlines()[-1] == "loaded:"
+
+def test_warmup_loads_models_and_records_phases(monkeypatch):
+    """The warm-up should load models in the background and time each one."""
+    release = threading.Event()
+    registry = ModelRegistry()
+    registry.register("slow", lambda: release.wait(5) and "model")
+    registry.register("broken", lambda: 1 / 0)
+    monkeypatch.setattr(model_registry, "get_model_registry", lambda: registry)
+
+    profile = StartupProfile()
+    warmup = ModelWarmup(["slow", "broken"], profile)
+
+    async def run():
+        warmup.start()
+        assert not await warmup.wait_ready(0.05)
+        assert warmup.is_warming("slow")
+        release.set()
+        return await warmup.wait_ready(5)
+
+    assert asyncio.run(run())
+    assert registry.is_loaded("slow")
+
+    status = warmup.get_status()
+    assert status["loaded"] == ["slow"] and "broken" in status["failed"] and status["pending"] == []
+
+    phases = {phase["name"]: phase for phase in profile.snapshot()["phases"]}
+    assert phases["load:slow"]["status"] == "ok"
+    assert phases["load:broken"]["status"] == "failed"
+    assert "ready" in phases
+
+def test_posts_fall_back_to_prescreen_while_warming(monkeypatch):
+    """Under the fallback policy, text posts should get pre-screen verdicts until BART is warm."""
+    monkeypatch.setattr(pipeline, "WARMUP_POLICY", "fallback")
+    monkeypatch.setattr(pipeline, "is_warming_up", lambda *names: "bart" in names)
+
+    def classify(texts):
+        raise AssertionError("the zero-shot model should not be called while warming up")
+
+    results = pipeline._analyze_posts([{"id": 1, "content": "Doctors don't want you to know this miracle cure!"}],
+                                      classify)
+    assert results[0]["decided_by"] == "warmup"
+    assert 0 <= results[0]["trust_score"] <= 100
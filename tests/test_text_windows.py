@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for long-text windowing, window aggregation and length bucketing in the zero-shot detector,
+using a stub tokenizer and classifier.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.detection import huggingface_detector
+from backend.detection.huggingface_detector import DEFAULT_LABELS, HuggingFaceDetector
+
+class StubTokenizer:
+    """One token per whitespace-separated word; 20-token windows once the hypothesis margin is taken off."""
+
+    model_max_length = 52
+
+    def __init__(self):
+        self.vocab = {}
+        self.words = []
+
+    def __call__(self, texts, add_special_tokens=False):
+        return {"input_ids": [[self._id(word) for word in text.split()] for text in texts]}
+
+    def _id(self, word):
+        if word not in self.vocab:
+            self.vocab[word] = len(self.words)
+            self.words.append(word)
+        return self.vocab[word]
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join(self.words[i] for i in ids)
+
+class StubClassifier:
+    """Scores the label starting with a sequence's first word highest, and records each call's sequences."""
+
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+        self.calls = []
+
+    def __call__(self, sequences, labels, batch_size=1):
+        self.calls.append(list(sequences))
+        results = []
+        for sequence in sequences:
+            top = next(label for label in labels if label.startswith(sequence.split()[0]))
+            ranked = [top] + [label for label in labels if label != top]
+            results.append({"labels": ranked, "scores": [0.9] + [0.1 / (len(labels) - 1)] * (len(labels) - 1)})
+        # Like the transformers pipeline, a single sequence comes back as a bare dict
+        return results[0] if len(results) == 1 else results
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setattr(huggingface_detector, "TEXT_WINDOW_TOKENS", 0)
+    monkeypatch.setattr(huggingface_detector, "TEXT_WINDOW_OVERLAP", 5)
+    monkeypatch.setattr(huggingface_detector, "TEXT_BATCH_MAX_SIZE", 2)
+    stub = StubClassifier()
+    monkeypatch.setattr(HuggingFaceDetector, "classifier", property(lambda self: stub))
+
+    detector = HuggingFaceDetector.__new__(HuggingFaceDetector)
+    detector.labels = list(DEFAULT_LABELS)
+    return detector, stub
+
+def _words(count, first="credible"):
+    return " ".join([first] + [f"w{i}" for i in range(1, count)])
+
+def test_short_texts_stay_whole(detector):
+    detector, stub = detector
+    segments = detector._split_into_windows(stub.tokenizer, ["one two three", ""])
+    assert segments == [(0, "one two three", 3), (1, "", 1)]
+
+def test_long_texts_are_split_with_overlap(detector):
+    """With a 20-token window and 5 tokens of overlap, windows start every 15 tokens."""
+    detector, stub = detector
+    segments = detector._split_into_windows(stub.tokenizer, [_words(50)])
+
+    assert [count for _, _, count in segments] == [20, 20, 20]
+    assert [text.split()[0] for _, text, _ in segments] == ["credible", "w15", "w30"]
+
+def test_final_window_ends_at_the_text(detector):
+    """A window that reaches the end of the text should be the last, with no trailing sliver."""
+    detector, stub = detector
+    segments = detector._split_into_windows(stub.tokenizer, [_words(35)])
+    assert [(text.split()[0], count) for _, text, count in segments] == [("credible", 20), ("w15", 20)]
+
+def test_overlap_is_capped_at_half_a_window(detector, monkeypatch):
+    """An overlap close to the window size should still advance by half a window."""
+    detector, stub = detector
+    monkeypatch.setattr(huggingface_detector, "TEXT_WINDOW_OVERLAP", 18)
+    segments = detector._split_into_windows(stub.tokenizer, [_words(50)])
+    assert [text.split()[0] for _, text, _ in segments] == ["credible", "w10", "w20", "w30"]
+
+def test_window_scores_are_token_weighted(detector):
+    """Longer windows should count for more in the combined verdict."""
+    detector, _ = detector
+    detector.labels = ["a", "b"]
+    combined = detector._aggregate_windows([
+        (10, {"labels": ["a", "b"], "scores": [0.9, 0.1]}),
+        (30, {"labels": ["b", "a"], "scores": [0.8, 0.2]})
+    ])
+
+    assert combined["labels"] == ["b", "a"]
+    assert combined["scores"] == pytest.approx([0.625, 0.375])
+
+def test_bucketed_results_come_back_in_input_order(detector):
+    """Windows are classified shortest first in buckets, but results follow the input order."""
+    detector, stub = detector
+    texts = [" ".join([word] * count) for word, count in
+             (("misinformation", 12), ("clickbait", 2), ("credible", 45), ("satire", 6))]
+    results = detector.analyze_texts(texts)
+
+    assert [result["classification"] for result in results] == ["misinformation", "clickbait",
+                                                                "credible information", "satire or humor"]
+    assert [result["window_count"] for result in results] == [1, 1, 3, 1]
+
+    # Six segments in buckets of at most two, in ascending token length
+    lengths = [len(sequence.split()) for call in stub.calls for sequence in call]
+    assert all(len(call) <= 2 for call in stub.calls)
+    assert lengths == sorted(lengths)
+    assert 0 < results[0]["padding_efficiency"] <= 1
+
+def test_analyze_endpoint_reports_windowing(monkeypatch):
+    """/analyze should pass the window count and padding efficiency through to single-post callers."""
+    from fastapi.testclient import TestClient
+
+    from backend import main
+
+    class FakeAgent:
+        def analyze_content(self, content, content_type):
+            return {"post_id": 1, "trust_score": 40, "reason": "r", "timestamp": "t",
+                    "window_count": 3, "padding_efficiency": 0.875}
+
+    monkeypatch.setattr(main, "agent_instance", FakeAgent())
+    response = TestClient(main.app).post("/analyze", data={"content": "a long article"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["window_count"] == 3 and body["padding_efficiency"] == 0.875
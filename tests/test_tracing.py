@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for per-request trace spans, the profile breakdown and Chrome trace export.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend import main
+from backend.detection.batching import MicroBatcher
+from backend.executor import InferenceExecutor
+from backend.metrics import observe_stage, timed
+from backend.tracing import current_trace, get_trace, request_trace
+
+@timed("test.outer")
+def outer():
+    with observe_stage("test.inner"):
+        pass
+    return threading.get_ident()
+
+def test_stages_are_recorded_only_inside_a_trace():
+    """Timed stages should become spans of the active trace, and nothing should be recorded without one."""
+    outer()
+    with request_trace("test", enabled=False) as trace:
+        assert trace is None and current_trace() is None
+        outer()
+
+    with request_trace("test") as trace:
+        outer()
+        outer()
+    assert current_trace() is None
+
+    stages = {stage["stage"]: stage for stage in trace.breakdown()["stages"]}
+    assert list(stages) == ["test.outer", "test.inner"]
+    assert stages["test.outer"]["calls"] == 2 and stages["test.inner"]["calls"] == 2
+    assert get_trace(trace.trace_id) is trace
+
+def test_trace_follows_work_into_the_inference_executor():
+    """Spans recorded on executor threads should land in the caller's trace."""
+    executor = InferenceExecutor(max_workers=2, max_concurrency=2, max_queue=4)
+
+    async def run():
+        with request_trace("test") as trace:
+            thread_ids = await asyncio.gather(executor.run(outer), executor.run(outer))
+        return trace, thread_ids
+
+    try:
+        trace, thread_ids = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert threading.get_ident() not in thread_ids
+    stages = {stage["stage"]: stage["calls"] for stage in trace.breakdown()["stages"]}
+    assert stages["test.outer"] == 2 and stages["inference.queue_wait"] == 2
+
+def test_batch_spans_reach_every_waiting_request():
+    """Work on the batcher thread should be recorded into each profiled caller's trace, and no other."""
+    @timed("test.model")
+    def model(items):
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(model, max_batch_size=3, max_wait_ms=2000, name="test-batcher")
+    barrier = threading.Barrier(3)
+    traces, results = {}, {}
+
+    def request(index, profiled):
+        with request_trace(f"request {index}", enabled=profiled) as trace:
+            barrier.wait()
+            results[index] = batcher.submit(index)
+        traces[index] = trace
+
+    threads = [threading.Thread(target=request, args=(i, i < 2)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {0: 0, 1: 2, 2: 4}
+    assert batcher.get_stats()["batches_processed"] == 1
+    assert traces[2] is None
+    for index in (0, 1):
+        stages = {stage["stage"]: stage["calls"] for stage in traces[index].breakdown()["stages"]}
+        assert stages == {"test-batcher.queue_wait": 1, "test-batcher.batch": 1, "test.model": 1}
+
+def test_chrome_trace_export():
+    """The export should be JSON with one complete event per span, timed in microseconds from the request start."""
+    with request_trace("POST /test") as trace:
+        outer()
+
+    exported = json.loads(json.dumps(trace.to_chrome_trace()))
+    events = [event for event in exported["traceEvents"] if event["ph"] == "X"]
+    assert [event["name"] for event in events] == ["POST /test", "test.outer", "test.inner"]
+    request, span = events[0], events[1]
+    assert request["ts"] == 0 and request["dur"] >= span["dur"] >= 0
+    assert 0 <= span["ts"] <= request["dur"]
+    assert any(event["ph"] == "M" and event["name"] == "thread_name" for event in exported["traceEvents"])
+
+def test_profiling_is_requested_by_query_or_header():
+    """Profiling should be opt-in through ?profile=1 or the trace header."""
+    class FakeRequest:
+        def __init__(self, query=None, headers=None):
+            self.query_params = query or {}
+            self.headers = headers or {}
+
+    assert not main._profiling_requested(FakeRequest())
+    assert main._profiling_requested(FakeRequest(query={"profile": "1"}))
+    assert main._profiling_requested(FakeRequest(headers={main.TRACE_HEADER: "true"}))
+    assert not main._profiling_requested(FakeRequest(query={"profile": "0"}))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent Whisper transcript cache.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.detection.transcription import Transcriber, TranscriptCache
+
+def test_transcripts_are_cached_by_audio_hash():
+    """The same clip should only be transcribed once, even across restarts."""
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_path = os.path.join(tmp, "clip.wav")
+        with open(audio_path, "wb") as f:
+            f.write(b"RIFF fake audio bytes")
+
+        calls = []
+        cache_path = os.path.join(tmp, "transcripts.db")
+        transcriber = Transcriber(TranscriptCache(cache_path), workers=0, model_size="base")
+        transcriber._run = lambda path: calls.append(path) or "hello world"
+
+        assert transcriber.transcribe(audio_path) == "hello world"
+        assert transcriber.transcribe(audio_path) == "hello world"
+        assert len(calls) == 1
+
+        # A new transcriber on the same file sees the persisted transcript
+        restarted = Transcriber(TranscriptCache(cache_path), workers=0, model_size="base")
+        restarted._run = lambda path: calls.append(path) or "different"
+        assert restarted.transcribe(audio_path) == "hello world"
+        assert len(calls) == 1
+        assert restarted.get_stats()["hits"] == 1
+
+def test_in_memory_audio_shares_cache_with_file():
+    """Audio bytes should hit the transcript cached for the same file contents."""
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_bytes = b"RIFF other fake audio"
+        audio_path = os.path.join(tmp, "clip.wav")
+        with open(audio_path, "wb") as f:
+            f.write(audio_bytes)
+
+        calls = []
+        transcriber = Transcriber(TranscriptCache(os.path.join(tmp, "transcripts.db")), workers=0)
+        transcriber._run = lambda audio: calls.append(audio) or "from bytes"
+
+        assert transcriber.transcribe(audio_bytes) == "from bytes"
+        assert transcriber.transcribe(audio_path) == "from bytes"
+        assert calls == [audio_bytes]
+
+def test_in_process_transcriptions_are_serialized(monkeypatch):
+    """Concurrent in-process transcriptions must not decode on the shared model at once."""
+    import threading
+    import time
+
+    from backend.detection import model_registry
+
+    state = {"active": 0, "peak": 0}
+    guard = threading.Lock()
+
+    class FakeWhisper:
+        def transcribe(self, audio):
+            with guard:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with guard:
+                state["active"] -= 1
+            return {"text": f" {audio} "}
+
+    class FakeRegistry:
+        def get(self, name):
+            assert name == "whisper"
+            return FakeWhisper()
+
+    monkeypatch.setattr(model_registry, "get_model_registry", lambda: FakeRegistry())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        transcriber = Transcriber(TranscriptCache(os.path.join(tmp, "transcripts.db")), workers=0)
+        results = {}
+        threads = [
+            threading.Thread(target=lambda p=path: results.__setitem__(p, transcriber._run(p)))
+            for path in ("a.wav", "b.wav")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results == {"a.wav": "a.wav", "b.wav": "b.wav"}
+    assert state["peak"] == 1
+
+def test_global_transcriber_is_created_once_under_concurrency(monkeypatch):
+    """Concurrent first uploads should share one transcriber (one cache connection, one pool)."""
+    import threading
+    import time
+
+    from backend.detection import transcription
+
+    created = []
+
+    class SlowTranscriber:
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.05)
+            created.append(self)
+
+    monkeypatch.setattr(transcription, "_transcriber_instance", None)
+    monkeypatch.setattr(transcription, "Transcriber", SlowTranscriber)
+    monkeypatch.setattr(transcription, "TranscriptCache", lambda path: None)
+
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(transcription.get_transcriber())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(transcriber is created[0] for transcriber in seen)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-hash verdict cache.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.detection.verdict_cache import VerdictCache, make_cache_key
+
+def test_near_identical_posts_share_a_key():
+    """Case and whitespace differences should not change the cache key."""
+    key_a = make_cache_key("5G towers cause   COVID!", "bart", "v1")
+    key_b = make_cache_key("  5g towers cause covid!\n", "bart", "v1")
+    key_other_labels = make_cache_key("5G towers cause COVID!", "bart", "v2")
+
+    assert key_a == key_b
+    assert key_a != key_other_labels
+
+def test_hits_misses_and_evictions_are_counted():
+    """The cache should evict least recently used entries and count lookups."""
+    cache = VerdictCache(max_size=2, ttl_seconds=0)
+    cache.put("a", {"classification": "misinformation"})
+    cache.put("b", {"classification": "factual news"})
+    assert cache.get("a")["classification"] == "misinformation"
+
+    cache.put("c", {"classification": "clickbait"})
+
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1